@@ -0,0 +1,271 @@
+"""
+Barnes-Hut 八叉树引力计算
+用扁平数组存储的八叉树以 O(N log N) 近似直接求和：远处的节点按其质心与总质量整体作用，
+由张角阈值 θ 控制精度（θ=0 退化为直接求和）
+"""
+
+import numpy as np
+import math
+
+# Numba 为可选依赖：缺失时退回到纯 Python 实现（仅适合小规模天体）
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Numba 不可用时的空装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Barnes-Hut 八叉树的最大深度：位置重合（或极近）的天体在此深度共用一个叶节点
+BH_MAX_DEPTH = 48
+
+
+@njit(cache=True)
+def _bh_build(pos, gm, root_center, root_half, max_nodes):
+    """
+    构建扁平数组形式的 Barnes-Hut 八叉树（Numba 编译）
+
+    子节点总是在父节点之后创建，因此逆序遍历节点即可自底向上汇总质量与质心。
+    节点数超过 max_nodes 时返回 -1，由调用方扩容后重建。
+
+    Returns:
+        (节点数, child, leaf_head, next_body, half, node_gm, com)
+    """
+    n = pos.shape[0]
+    child = np.full((max_nodes, 8), -1, dtype=np.int64)
+    leaf_head = np.full(max_nodes, -1, dtype=np.int64)  # 叶节点的天体链表头，内部节点为 -2
+    next_body = np.full(n, -1, dtype=np.int64)          # 同一叶节点中的下一个天体
+    center = np.empty((max_nodes, 3))
+    half = np.empty(max_nodes)
+    depth = np.zeros(max_nodes, dtype=np.int64)
+    node_gm = np.zeros(max_nodes)
+    com = np.zeros((max_nodes, 3))
+
+    center[0] = root_center
+    half[0] = root_half
+    count = 1
+
+    for b in range(n):
+        node = 0
+        while True:
+            head = leaf_head[node]
+            if head == -1:
+                leaf_head[node] = b
+                break
+            if head >= 0:
+                if depth[node] >= BH_MAX_DEPTH:
+                    # 已达最大深度：挂到叶节点的链表上
+                    next_body[b] = head
+                    leaf_head[node] = b
+                    break
+                # 叶节点分裂：原有天体（连同链表）下移到对应子节点
+                leaf_head[node] = -2
+                octant = 0
+                for k in range(3):
+                    if pos[head, k] >= center[node, k]:
+                        octant |= 1 << k
+                if count >= max_nodes:
+                    return -1, child, leaf_head, next_body, half, node_gm, com
+                c = count
+                count += 1
+                child[node, octant] = c
+                half[c] = 0.5 * half[node]
+                depth[c] = depth[node] + 1
+                for k in range(3):
+                    offset = half[c] if (octant >> k) & 1 else -half[c]
+                    center[c, k] = center[node, k] + offset
+                leaf_head[c] = head
+            # 内部节点：进入 b 所在的子节点，必要时创建
+            octant = 0
+            for k in range(3):
+                if pos[b, k] >= center[node, k]:
+                    octant |= 1 << k
+            c = child[node, octant]
+            if c == -1:
+                if count >= max_nodes:
+                    return -1, child, leaf_head, next_body, half, node_gm, com
+                c = count
+                count += 1
+                child[node, octant] = c
+                half[c] = 0.5 * half[node]
+                depth[c] = depth[node] + 1
+                for k in range(3):
+                    offset = half[c] if (octant >> k) & 1 else -half[c]
+                    center[c, k] = center[node, k] + offset
+                leaf_head[c] = b
+                break
+            node = c
+
+    # 自底向上汇总 G·m 与质心
+    for node in range(count - 1, -1, -1):
+        m = 0.0
+        cx = 0.0
+        cy = 0.0
+        cz = 0.0
+        if leaf_head[node] >= 0:
+            b = leaf_head[node]
+            while b != -1:
+                m += gm[b]
+                cx += gm[b] * pos[b, 0]
+                cy += gm[b] * pos[b, 1]
+                cz += gm[b] * pos[b, 2]
+                b = next_body[b]
+        else:
+            for k in range(8):
+                c = child[node, k]
+                if c != -1:
+                    m += node_gm[c]
+                    cx += node_gm[c] * com[c, 0]
+                    cy += node_gm[c] * com[c, 1]
+                    cz += node_gm[c] * com[c, 2]
+        node_gm[node] = m
+        if m != 0.0:
+            com[node, 0] = cx / m
+            com[node, 1] = cy / m
+            com[node, 2] = cz / m
+        else:
+            com[node] = center[node]
+    return count, child, leaf_head, next_body, half, node_gm, com
+
+
+@njit(cache=True)
+def _bh_order(child, leaf_head, next_body, n):
+    """
+    按八叉树深度优先（叶节点）顺序列出天体编号（Numba 编译）
+
+    相邻编号的天体在空间上也相邻，按此顺序遍历目标天体时，连续的遍历会访问几乎相同的
+    树节点，节点数据得以留在缓存中（相当于把目标天体按空间分块）。
+    """
+    order = np.empty(n, dtype=np.int64)
+    stack = np.empty(8 * (BH_MAX_DEPTH + 2), dtype=np.int64)
+    stack[0] = 0
+    top = 1
+    k = 0
+    while top > 0:
+        top -= 1
+        node = stack[top]
+        head = leaf_head[node]
+        if head >= 0:
+            b = head
+            while b != -1:
+                order[k] = b
+                k += 1
+                b = next_body[b]
+            continue
+        for octant in range(7, -1, -1):
+            c = child[node, octant]
+            if c != -1:
+                stack[top] = c
+                top += 1
+    return order[:k]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _bh_accel_kernel(order, pos, gm, child, leaf_head, next_body, half, node_gm, com, theta2, eps2, out):
+    """
+    遍历八叉树计算加速度（Numba 编译）
+
+    节点边长 s 与到质心距离 d 满足 s² < θ² d² 时把整个节点当作一个质点，否则展开子节点。
+    目标天体按 order（树的叶节点顺序）遍历，使相继的遍历命中同一批缓存中的节点。
+    """
+    n = order.shape[0]
+    for q in prange(n):
+        i = order[q]
+        stack = np.empty(8 * (BH_MAX_DEPTH + 2), dtype=np.int64)
+        stack[0] = 0
+        top = 1
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        zi = pos[i, 2]
+        ax = 0.0
+        ay = 0.0
+        az = 0.0
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            head = leaf_head[node]
+            if head >= 0:
+                # 叶节点：逐个天体直接求和
+                b = head
+                while b != -1:
+                    if b != i:
+                        dx = pos[b, 0] - xi
+                        dy = pos[b, 1] - yi
+                        dz = pos[b, 2] - zi
+                        r2 = dx * dx + dy * dy + dz * dz + eps2
+                        if r2 > 0.0:
+                            inv_r = 1.0 / math.sqrt(r2)
+                            s = gm[b] * inv_r * inv_r * inv_r
+                            ax += dx * s
+                            ay += dy * s
+                            az += dz * s
+                    b = next_body[b]
+                continue
+
+            dx = com[node, 0] - xi
+            dy = com[node, 1] - yi
+            dz = com[node, 2] - zi
+            r2 = dx * dx + dy * dy + dz * dz
+            size = 2.0 * half[node]
+            if size * size < theta2 * r2:
+                r2 += eps2
+                inv_r = 1.0 / math.sqrt(r2)
+                s = node_gm[node] * inv_r * inv_r * inv_r
+                ax += dx * s
+                ay += dy * s
+                az += dz * s
+            else:
+                for k in range(8):
+                    c = child[node, k]
+                    if c != -1:
+                        stack[top] = c
+                        top += 1
+        out[i, 0] = ax
+        out[i, 1] = ay
+        out[i, 2] = az
+
+
+def accelerations_bh_gm(pos: np.ndarray, gm: np.ndarray, theta: float = 0.5, eps2: float = 0.0,
+                        out: np.ndarray = None) -> np.ndarray:
+    """
+    由 G·m 数组用 Barnes-Hut 八叉树近似计算引力加速度，O(N log N)
+
+    Args:
+        pos: 位置数组 [N, 3] (m)
+        gm: G·m 数组 [N]
+        theta: 张角阈值，越小越精确（θ=0 退化为直接求和）
+        eps2: 软化长度的平方
+        out: 可选的输出数组 [N, 3]
+    """
+    if out is None:
+        out = np.empty_like(pos)
+    if len(pos) == 0:
+        return out
+
+    # 根节点为包围全部天体的立方体
+    lo = pos.min(axis=0)
+    hi = pos.max(axis=0)
+    root_center = 0.5 * (lo + hi)
+    root_half = 0.5 * (hi - lo).max() * 1.0001 + 1e-12
+
+    max_nodes = 4 * len(pos) + 64
+    while True:
+        count, child, leaf_head, next_body, half, node_gm, com = _bh_build(pos, gm, root_center, root_half, max_nodes)
+        if count >= 0:
+            break
+        max_nodes *= 2
+    order = _bh_order(child, leaf_head, next_body, len(pos))
+    _bh_accel_kernel(order, pos, gm, child, leaf_head, next_body, half, node_gm, com, theta * theta, eps2, out)
+    return out
+
+
+def accelerations_bh(pos: np.ndarray, mass: np.ndarray, G: float, theta: float = 0.5, eps2: float = 0.0,
+                     out: np.ndarray = None) -> np.ndarray:
+    """用 Barnes-Hut 八叉树近似计算引力加速度（质量与引力常数分开给出）"""
+    return accelerations_bh_gm(pos, G * mass, theta, eps2, out)
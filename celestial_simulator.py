@@ -12,18 +12,24 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
 import math
-import json
 from datetime import datetime
 import threading
 import time
+import logging
 
 # 导入自定义模块
-from physics_engine import GravityEngine, CelestialBody
+from physics_engine import GravityEngine, CelestialBody, BodyTable, warmup_kernels, kernel_simd_info
+from physics_engine_cuda import CUDA_AVAILABLE, CudaGravityEngine
 from renderer import OpenGLRenderer
 from ui_manager import UIManager
 from scene_manager import SceneManager
 from config import *
 
+logger = logging.getLogger(__name__)
+
+# 主循环实际处理的事件类型；其余事件在 SDL 层直接丢弃，不再进入队列
+HANDLED_EVENT_TYPES = [QUIT, VIDEORESIZE, MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION, KEYDOWN]
+
 class CelestialSimulator:
     """主模拟器类"""
     
@@ -36,6 +42,9 @@ class CelestialSimulator:
         # 初始化Pygame
         pygame.init()
         pygame.display.set_caption(self.title)
+        # 只让需要处理的事件进入队列，减少每帧 event.get() 生成的事件对象
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(HANDLED_EVENT_TYPES)
         
         # 设置OpenGL显示模式
         self.screen = pygame.display.set_mode((self.width, self.height), 
@@ -46,14 +55,29 @@ class CelestialSimulator:
         
         # 初始化组件
         self.renderer = OpenGLRenderer(self.width, self.height)
+        self.setup_projection()
         # 默认开启真实物理半径显示（可切换），并设置一个合理的缩放倍率以便可见
         try:
             self.renderer.use_true_radii = True
             self.renderer.radius_scale_multiplier = 50.0
-            print(f"Renderer: use_true_radii={self.renderer.use_true_radii} radius_scale_multiplier={self.renderer.radius_scale_multiplier}")
+            if DEBUG_MODE:
+                logger.debug("Renderer: use_true_radii=%s radius_scale_multiplier=%s",
+                             self.renderer.use_true_radii, self.renderer.radius_scale_multiplier)
         except Exception:
             pass
         self.physics_engine = GravityEngine()
+        self.physics_engine.integrator = INTEGRATION_METHOD
+        self.physics_engine.use_barnes_hut = USE_BARNES_HUT
+        self.physics_engine.barnes_hut_threshold = BARNES_HUT_THRESHOLD
+        self.physics_engine.barnes_hut_theta = BARNES_HUT_THETA
+        self.physics_engine.dtype = np.float32 if SINGLE_PRECISION_FORCES else np.float64
+        # 可选的 CUDA 后端（需 config.USE_CUDA 且 PyCUDA 可用）
+        self.cuda_engine = None
+        if USE_CUDA and CUDA_AVAILABLE:
+            try:
+                self.cuda_engine = CudaGravityEngine(self.physics_engine.G)
+            except Exception as e:
+                logger.warning("CUDA 初始化失败，使用 CPU 计算: %s", e)
         self.ui_manager = UIManager(self.width, self.height)
         self.scene_manager = SceneManager()
 
@@ -64,15 +88,14 @@ class CelestialSimulator:
             'clear': self.clear_all_bodies,
             'save': self.save_scene,
             'load': self.load_scene,
-            'show_orbits': self.renderer.toggle_orbits,
-            'show_labels': self.renderer.toggle_labels,
-            'show_grid': self.renderer.toggle_grid,
-            # 状态 getter，供 UI 用于显示当前开关状态
-            'get_show_orbits': (lambda r=self.renderer: r.show_orbits),
-            'get_show_labels': (lambda r=self.renderer: r.show_labels),
-            'get_show_grid': (lambda r=self.renderer: r.show_grid),
+            # 显示选项切换后由 toggle_display 把新状态推送给 UI，UI 渲染时不再逐帧查询
+            'show_orbits': (lambda: self.toggle_display('orbits')),
+            'show_labels': (lambda: self.toggle_display('labels')),
+            'show_grid': (lambda: self.toggle_display('grid')),
             'set_time_speed': self.set_time_speed
         })
+        for name in ('orbits', 'labels', 'grid'):
+            self.ui_manager.on_toggle_changed(name, getattr(self.renderer, f'show_{name}'))
         
         # 模拟状态
         self.is_running = True
@@ -86,6 +109,21 @@ class CelestialSimulator:
         
         # 天体列表
         self.celestial_bodies = dict()
+
+        # 天体 SoA 表（仅在天体成员变化时重建），供物理与渲染批量访问
+        self.body_table = BodyTable()
+
+        # 物理线程（ENABLE_MULTITHREADING）：主线程修改天体前持有 physics_lock；
+        # 物理线程每步发布一份 (表, 天体字典, 位置副本) 快照，渲染只读快照
+        self.physics_lock = threading.Lock()
+        self._physics_thread = None
+        self._snapshot = None
+
+        # 上一帧的渲染结果（视图状态, 缩放后的位置, 标签），暂停时复用
+        self._render_cache = None
+
+        # 尚未推进的帧时间（秒），按 PHYSICS_TIME_STEP 切分为固定子步
+        self._physics_accumulator = 0.0
         
         # 鼠标控制
         self.mouse_down = False
@@ -93,6 +131,16 @@ class CelestialSimulator:
         self.last_mouse_pos = [0, 0]
         # 待处理的点击（在下一帧渲染时进行拾取，以确保矩阵正确）
         self.pending_click_pos = None
+
+        # 事件类型 -> 处理函数（与 HANDLED_EVENT_TYPES 对应）
+        self._event_handlers = {
+            QUIT: self._on_quit,
+            VIDEORESIZE: self._on_resize,
+            MOUSEBUTTONDOWN: self._on_mouse_down,
+            MOUSEBUTTONUP: self._on_mouse_up,
+            MOUSEMOTION: self._on_mouse_motion,
+            KEYDOWN: self._on_key_down,
+        }
         
         # 性能监控
         self.frame_count = 0
@@ -101,6 +149,10 @@ class CelestialSimulator:
         
         # 初始化默认场景
         self.load_default_scene()
+
+        # 预编译引力核（Numba 可用时），避免第一帧因 JIT 编译而卡顿
+        warmup_kernels()
+        logger.info("引力核编译目标: CPU=%s, SIMD=%s", *kernel_simd_info())
         
     def init_opengl(self):
         """初始化OpenGL设置"""
@@ -121,15 +173,9 @@ class CelestialSimulator:
         # 设置背景色
         glClearColor(0.02, 0.02, 0.05, 1.0)
         
-        # 设置投影矩阵
-        self.setup_projection()
-        
     def setup_projection(self):
-        """设置投影矩阵"""
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        gluPerspective(60, self.width / self.height, 0.1, 10000.0)
-        glMatrixMode(GL_MODELVIEW)
+        """设置投影矩阵（由渲染器计算并缓存，供标签投影和拾取复用）"""
+        self.renderer.setup_projection(self.width, self.height)
         
     def load_default_scene(self):
         """加载默认场景"""
@@ -144,92 +190,96 @@ class CelestialSimulator:
             pass
         
     def handle_events(self):
-        """处理事件"""
+        """处理事件：每帧一次取出队列中的全部事件，按事件类型查表分发，未消费的事件整批交给 UI"""
+        get_handler = self._event_handlers.get
+        ui_events = []
         for event in pygame.event.get():
-            if event.type == QUIT:
-                self.is_running = False
-                
-            elif event.type == VIDEORESIZE:
-                self.width, self.height = event.size
-                self.screen = pygame.display.set_mode((self.width, self.height), 
-                                                    DOUBLEBUF | OPENGL | RESIZABLE)
-                self.setup_projection()
-                self.renderer.resize(self.width, self.height)
-                self.ui_manager.resize(self.width, self.height)
-                
-            elif event.type == MOUSEBUTTONDOWN:
-                self.mouse_down = True
-                self.mouse_button = event.button
-                self.last_mouse_pos = event.pos
-                # print(f"MOUSEBUTTONDOWN button={event.button} pos={event.pos}")
-                # 处理滚轮（按钮4/5）用于缩放相机距离
-                if event.button == 4:  # 滚轮上
-                    self.camera_distance = max(1e3, self.camera_distance * 0.9)
-                    print(f"wheel up: camera_distance={self.camera_distance}")
-                elif event.button == 5:  # 滚轮下
-                    self.camera_distance = min(1e14, self.camera_distance * 1.1)
-                    print(f"wheel down: camera_distance={self.camera_distance}")
-                
-                if event.button == 1:  # 左键
-                    # 延迟拾取到下一渲染帧（此时 OpenGL 矩阵已设置）
-                    self.pending_click_pos = event.pos
-                        
-            elif event.type == MOUSEBUTTONUP:
-                self.mouse_down = False
+            handler = get_handler(event.type)
+            # 处理函数返回 True 表示事件已被消费，不再交给 UI
+            if handler is not None and handler(event):
+                continue
+            ui_events.append(event)
+        # UI事件处理
+        if ui_events:
+            self.ui_manager.handle_events_batch(ui_events)
+
+    def _on_quit(self, event):
+        self.is_running = False
+
+    def _on_resize(self, event):
+        self.width, self.height = event.size
+        self.screen = pygame.display.set_mode((self.width, self.height), 
+                                            DOUBLEBUF | OPENGL | RESIZABLE)
+        self.setup_projection()
+        self.renderer.resize(self.width, self.height)
+        self.ui_manager.resize(self.width, self.height)
+
+    def _on_mouse_down(self, event):
+        button = event.button
+        self.mouse_down = True
+        self.mouse_button = button
+        self.last_mouse_pos = event.pos
+        # 处理滚轮（按钮4/5）用于缩放相机距离
+        if button == 4:  # 滚轮上
+            self.camera_distance = max(1e3, self.camera_distance * 0.9)
+            if DEBUG_MODE:
+                logger.debug("wheel up: camera_distance=%s", self.camera_distance)
+        elif button == 5:  # 滚轮下
+            self.camera_distance = min(1e14, self.camera_distance * 1.1)
+            if DEBUG_MODE:
+                logger.debug("wheel down: camera_distance=%s", self.camera_distance)
+        elif button == 1:  # 左键
+            # 延迟拾取到下一渲染帧（此时 OpenGL 矩阵已设置）
+            self.pending_click_pos = event.pos
+
+    def _on_mouse_up(self, event):
+        self.mouse_down = False
+
+    def _on_mouse_motion(self, event):
+        if self.mouse_down:
+            pos = event.pos
+            dx = pos[0] - self.last_mouse_pos[0]
+            dy = pos[1] - self.last_mouse_pos[1]
+            
+            if self.mouse_button == 1:  # 左键 - 旋转相机
+                rotation = self.camera_rotation
+                rotation[0] = max(-85, min(85, rotation[0] + dy * 0.5))
+                rotation[1] += dx * 0.5
                 
-            elif event.type == MOUSEMOTION:
-                if self.mouse_down:
-                    dx = event.pos[0] - self.last_mouse_pos[0]
-                    dy = event.pos[1] - self.last_mouse_pos[1]
-                    # print(f"MOUSEMOTION dx={dx} dy={dy} button={self.mouse_button}")
-                    
-                    if self.mouse_button == 1:  # 左键 - 旋转相机
-                        self.camera_rotation[0] += dy * 0.5
-                        self.camera_rotation[1] += dx * 0.5
-                        self.camera_rotation[0] = max(-85, min(85, self.camera_rotation[0]))
-                        
-                    elif self.mouse_button == 3:  # 右键 - 平移相机目标（改变旋转中心）
-                        # 将屏幕偏移转换为世界偏移（近似）
-                        # 偏移比例与相机距离成正比
-                        factor = self.camera_distance * 0.002
-                        right = np.array([math.sin(math.radians(self.camera_rotation[1]-90)), 0.0, math.cos(math.radians(self.camera_rotation[1]-90))])
-                        up = np.array([0.0, 1.0, 0.0])
-                        move = -dx * factor * right + dy * factor * up
-                        try:
-                            self.renderer.camera_target = self.renderer.camera_target + move
-                        except Exception:
-                            self.renderer.camera_target = np.array(self.renderer.camera_target) + move
-                        
-                    self.last_mouse_pos = event.pos
-                    
-                # 鼠标滚轮缩放
-                if event.buttons[1]:  # 中键
-                    dz = event.rel[1]
-                    self.camera_distance += dz * 0.5
-                    self.camera_distance = max(10, min(5000, self.camera_distance))
-                    
-            elif event.type == KEYDOWN:
-                print(f"KEYDOWN key={event.key} unicode={getattr(event, 'unicode', None)}")
-                # 支持使用字符来检测 '[' ']'，兼容不同键盘/系统
-                if getattr(event, 'unicode', None) == '[':
-                    try:
-                        self.renderer.change_scale(0.5)
-                        print(f"render scale multiplier: {self.renderer.scale_multiplier}")
-                    except Exception:
-                        pass
-                    continue
-                elif getattr(event, 'unicode', None) == ']':
-                    try:
-                        self.renderer.change_scale(2.0)
-                        print(f"render scale multiplier: {self.renderer.scale_multiplier}")
-                    except Exception:
-                        pass
-                    continue
-                print(f"KEYDOWN key={event.key}")
-                self.handle_keydown(event)
+            elif self.mouse_button == 3:  # 右键 - 平移相机目标（改变旋转中心）
+                # 将屏幕偏移转换为世界偏移（近似）
+                # 偏移比例与相机距离成正比
+                factor = self.camera_distance * 0.002
+                right = np.array([math.sin(math.radians(self.camera_rotation[1]-90)), 0.0, math.cos(math.radians(self.camera_rotation[1]-90))])
+                up = np.array([0.0, 1.0, 0.0])
+                move = -dx * factor * right + dy * factor * up
+                try:
+                    self.renderer.camera_target = self.renderer.camera_target + move
+                except Exception:
+                    self.renderer.camera_target = np.array(self.renderer.camera_target) + move
                 
-            # UI事件处理
-            self.ui_manager.handle_event(event)
+            self.last_mouse_pos = pos
+            
+        # 鼠标滚轮缩放
+        if event.buttons[1]:  # 中键
+            dz = event.rel[1]
+            self.camera_distance += dz * 0.5
+            self.camera_distance = max(10, min(5000, self.camera_distance))
+
+    def _on_key_down(self, event):
+        unicode = getattr(event, 'unicode', None)
+        if DEBUG_MODE:
+            logger.debug("KEYDOWN key=%s unicode=%s", event.key, unicode)
+        # 支持使用字符来检测 '[' ']'，兼容不同键盘/系统
+        if unicode == '[' or unicode == ']':
+            try:
+                self.renderer.change_scale(0.5 if unicode == '[' else 2.0)
+                if DEBUG_MODE:
+                    logger.debug("render scale multiplier: %s", self.renderer.scale_multiplier)
+            except Exception:
+                pass
+            return True
+        self.handle_keydown(event)
             
     def handle_keydown(self, event):
         """处理键盘按键"""
@@ -268,32 +318,37 @@ class CelestialSimulator:
         elif event.key == K_LEFTBRACKET:  # '[' 减小渲染尺度
             try:
                 self.renderer.change_scale(0.5)
-                print(f"render scale multiplier: {self.renderer.scale_multiplier}")
+                if DEBUG_MODE:
+                    logger.debug("render scale multiplier: %s", self.renderer.scale_multiplier)
             except Exception:
                 pass
         elif event.key == K_RIGHTBRACKET:  # ']' 增大渲染尺度
             try:
                 self.renderer.change_scale(2.0)
-                print(f"render scale multiplier: {self.renderer.scale_multiplier}")
+                if DEBUG_MODE:
+                    logger.debug("render scale multiplier: %s", self.renderer.scale_multiplier)
             except Exception:
                 pass
         # 切换真实物理半径显示（T），并用 ',' '.' 调整半径缩放倍率
         elif event.key == K_t:
             try:
                 self.renderer.use_true_radii = not self.renderer.use_true_radii
-                print(f"use_true_radii -> {self.renderer.use_true_radii}")
+                if DEBUG_MODE:
+                    logger.debug("use_true_radii -> %s", self.renderer.use_true_radii)
             except Exception:
                 pass
         elif event.key == K_COMMA:  # 缩小半径缩放倍数
             try:
                 self.renderer.radius_scale_multiplier = max(0.001, self.renderer.radius_scale_multiplier * 0.5)
-                print(f"radius_scale_multiplier -> {self.renderer.radius_scale_multiplier}")
+                if DEBUG_MODE:
+                    logger.debug("radius_scale_multiplier -> %s", self.renderer.radius_scale_multiplier)
             except Exception:
                 pass
         elif event.key == K_PERIOD:  # 增大半径缩放倍数
             try:
                 self.renderer.radius_scale_multiplier = self.renderer.radius_scale_multiplier * 2.0
-                print(f"radius_scale_multiplier -> {self.renderer.radius_scale_multiplier}")
+                if DEBUG_MODE:
+                    logger.debug("radius_scale_multiplier -> %s", self.renderer.radius_scale_multiplier)
             except Exception:
                 pass
             
@@ -301,7 +356,12 @@ class CelestialSimulator:
         """重置相机位置"""
         self.camera_rotation = [0.0, 0.0]
         self.camera_distance = 500.0
-        self.renderer.camera_pos = [0.0, 0.0, 500.0]
+        self.renderer.camera_pos = np.array([0.0, 0.0, 500.0])
+
+    def toggle_display(self, name: str):
+        """由 UI 回调触发：切换渲染器的显示选项（'orbits' / 'labels' / 'grid'）并同步 UI 开关状态"""
+        getattr(self.renderer, f'toggle_{name}')()
+        self.ui_manager.on_toggle_changed(name, getattr(self.renderer, f'show_{name}'))
 
     def toggle_pause(self):
         """由 UI 回调触发：切换模拟暂停状态并同步 UI 标志"""
@@ -323,76 +383,189 @@ class CelestialSimulator:
         self.celestial_bodies.clear()
         self.selected_body = None
         
+    def sync_body_table(self) -> BodyTable:
+        """天体成员变化时重建 SoA 表，返回当前的表"""
+        if not self.body_table.matches(self.celestial_bodies):
+            self.body_table = BodyTable.from_bodies(self.celestial_bodies)
+            # CUDA 后端的数据常驻显存，只在成员变化时重新上传
+            if self.cuda_engine is not None:
+                table = self.body_table
+                self.cuda_engine.upload(table.pos, table.vel, table.mass)
+        return self.body_table
+
+    def publish_snapshot(self):
+        """发布当前状态快照；位置为副本，渲染线程持有期间不会被物理线程改写"""
+        table = self.sync_body_table()
+        if self._snapshot is not None and self._snapshot[0] is table:
+            bodies = self._snapshot[1]
+        else:
+            bodies = dict(zip(table.keys, table.bodies))
+        # 元组引用赋值是原子的，渲染线程总能读到一致的一组数据
+        self._snapshot = (table, bodies, table.pos.copy())
+
+    def start_physics_thread(self):
+        """启动物理线程，使物理计算与渲染并行"""
+        if self.cuda_engine is not None:
+            # PyCUDA 上下文绑定在主线程
+            logger.warning("CUDA 后端不支持物理线程，物理计算保留在主线程")
+            return
+        self.publish_snapshot()
+        self._physics_thread = threading.Thread(target=self._physics_loop, name='physics', daemon=True)
+        self._physics_thread.start()
+
+    def _physics_loop(self):
+        """物理线程主循环：按目标帧率推进模拟并发布快照"""
+        interval = 1.0 / TARGET_FPS
+        last_time = time.perf_counter()
+        while self.is_running:
+            now = time.perf_counter()
+            dt = now - last_time
+            last_time = now
+            with self.physics_lock:
+                if self.is_simulation_paused:
+                    # 暂停时位置不变，天体集合未变化就不必重新复制快照
+                    if self._snapshot is None or not self.body_table.matches(self.celestial_bodies):
+                        self.publish_snapshot()
+                else:
+                    self.update_physics(dt)
+                    self.publish_snapshot()
+            remaining = interval - (time.perf_counter() - now)
+            if remaining > 0:
+                time.sleep(remaining)
+
     def update_physics(self, dt):
-        """更新物理模拟"""
+        """更新物理模拟
+
+        帧间隔 dt（秒）先累积，再以固定步长 PHYSICS_TIME_STEP 推进若干子步，
+        物理结果不受帧率波动影响；每帧最多 MAX_PHYSICS_STEPS_PER_FRAME 步，
+        卡顿时丢弃积压的时间，避免单步过大导致能量发散或追赶计算越积越多。
+        """
         if not self.is_simulation_paused and self.celestial_bodies:
-            # 计算时间步长（考虑时间加速）
-            time_step = dt * self.time_speed * 86400.0  # dt 已为秒
+            self._physics_accumulator += dt
+            steps = min(int(self._physics_accumulator / PHYSICS_TIME_STEP), MAX_PHYSICS_STEPS_PER_FRAME)
+            if steps == MAX_PHYSICS_STEPS_PER_FRAME:
+                self._physics_accumulator = 0.0
+            else:
+                self._physics_accumulator -= steps * PHYSICS_TIME_STEP
+            if steps == 0:
+                return
+
+            # 每个子步的模拟时间步长（考虑时间加速）
+            time_step = PHYSICS_TIME_STEP * self.time_speed * 86400.0
             
-            # 更新物理
-            self.physics_engine.update_positions(self.celestial_bodies, time_step)
+            # 更新物理：在连续的 SoA 数组上整体积分
+            table = self.sync_body_table()
+            # 显存中的状态在每次成员变化时重新上传，天体数不变时 CPU/GPU 路径不会交替使用
+            # GPU 只实现了部分积分方法，其余方法即使天体很多也留在 CPU 上，保证积分方法不随天体数改变
+            integrator = self.physics_engine.integrator
+            if (self.cuda_engine is not None and len(table) >= CUDA_MIN_BODIES
+                    and integrator in CudaGravityEngine.INTEGRATORS):
+                for _ in range(steps):
+                    self.cuda_engine.step(time_step, integrator)
+                self.cuda_engine.download(table.pos, table.vel)
+            else:
+                step_arrays = self.physics_engine.step_arrays
+                for _ in range(steps):
+                    step_arrays(table.pos, table.vel, table.mass, time_step)
+            # 每帧为每个天体记录一个轨迹点（天体位置是表中的行视图，已是子步推进后的状态）
+            for body in table.bodies:
+                body.record_trail_point()
+            self.physics_engine.handle_collisions(self.celestial_bodies, table)
             
             # 更新模拟时间
-            self.simulation_time += time_step
+            self.simulation_time += steps * time_step
             
+    def resolve_pending_click(self, table: BodyTable, bodies: dict):
+        """拾取待处理点击处的天体并更新选中天体（须在本帧天体实例绘制之后调用）
+
+        先读 GPU 颜色 ID（球形天体），未命中时退回 CPU 射线检测（含小行星与屏幕空间回退）；
+        两者都未命中时保留原来的选中天体。
+        """
+        renderer = self.renderer
+        selected_body = renderer.pick_body_gpu(self.pending_click_pos, table)
+        if selected_body is None:
+            selected_body = renderer.pick_body(self.pending_click_pos, bodies,
+                                               self.camera_distance, self.camera_rotation, table)
+        if selected_body:
+            self.selected_body = selected_body
+        if DEBUG_MODE:
+            logger.debug("SELECTED: %s", getattr(selected_body, 'name', None))
+        self.pending_click_pos = None
+
     def render(self):
         """渲染场景"""
         # 清除缓冲区
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
         
+        # 物理线程运行时只读取其发布的快照
+        if self._physics_thread is not None:
+            table, bodies, positions = self._snapshot
+        else:
+            table = self.sync_body_table()
+            bodies = self.celestial_bodies
+            positions = table.pos
+
         # 设置相机
         # 传入以米为单位的相机距离，渲染器会应用 RENDER_SCALE
         self.renderer.setup_camera(self.camera_distance, self.camera_rotation)
-        # 如有待处理点击，则在相机/矩阵已设置的情况下执行拾取
-        if getattr(self, 'pending_click_pos', None) is not None:
-            selected_body = self.renderer.pick_body(self.pending_click_pos, self.celestial_bodies,
-                                                   self.camera_distance, self.camera_rotation)
-            if selected_body:
-                self.selected_body = selected_body
-                try:
-                    print(f"SELECTED: {selected_body.name}")
-                except Exception:
-                    print("SELECTED a body")
-            else:
-                print("SELECTED: none")
-            self.pending_click_pos = None
         
+        # 暂停且视图未变化时，天体位置、实例缓冲区和标签都与上一帧相同，直接复用
+        renderer = self.renderer
+        render_key = (table, self.camera_distance, tuple(self.camera_rotation), tuple(renderer.camera_target),
+                      renderer.render_scale, renderer.use_true_radii, renderer.radius_scale_multiplier,
+                      renderer.show_labels, self.width, self.height)
+        reuse = (self.is_simulation_paused and self._render_cache is not None
+                 and self._render_cache[0] == render_key)
+
         # 渲染天体
-        self.renderer.render_celestial_bodies(self.celestial_bodies, self.selected_body)
+        if reuse:
+            scaled_positions, world_labels = self._render_cache[1:]
+        else:
+            # 渲染坐标每帧只缩放一次（float32），天体绘制与标签投影共用
+            scaled_positions = renderer.scale_positions(positions)
+        renderer.render_celestial_bodies(bodies, self.selected_body, table, scaled_positions,
+                                         reuse_instances=reuse)
+
+        # 如有待处理点击，在本帧实例数据就绪后拾取
+        if self.pending_click_pos is not None:
+            self.resolve_pending_click(table, bodies)
         
         # 渲染星空背景
-        self.renderer.render_star_field()
+        renderer.render_star_field()
         
         # 生成世界坐标标签（在 3D 渲染完成且矩阵就绪时）并传给 UI 渲染
-        world_labels = None
-        try:
-            if self.renderer.show_labels:
-                world_labels = []
-                for body_key, body in self.celestial_bodies.items():
-                    # 使用与渲染一致的缩放单位
-                    scaled_pos = body.position * RENDER_SCALE * self.renderer.scale_multiplier
-                    winx, winy, winz = self.renderer.world_to_screen(scaled_pos)
-                    if winx is not None:
-                        # UI 的坐标系在 draw_text 中假设 y 向下，从 0 到 height
-                        screen_x = int(winx)
-                        screen_y = int(self.height - winy)
-                        world_labels.append((body.name, screen_x, screen_y))
-                # 调试打印：显示标签数量与前几个样例
-                try:
-                    print(f"world_labels count={len(world_labels)} samples={world_labels[:6]}")
-                except Exception:
-                    pass
-        except Exception:
-            world_labels = None
+        if not reuse:
+            world_labels = self.build_world_labels(table, scaled_positions)
+            self._render_cache = (render_key, scaled_positions, world_labels)
 
         # 渲染UI（传入屏幕标签）
-        self.ui_manager.render(self.celestial_bodies, self.selected_body, 
-                             self.simulation_time, self.time_speed, self.fps, world_labels)
+        self.ui_manager.render(bodies, self.selected_body, 
+                             self.simulation_time, self.time_speed, self.fps, world_labels, table)
         
         # 交换缓冲区
         pygame.display.flip()
         
+    def build_world_labels(self, table: BodyTable, scaled_positions: np.ndarray):
+        """投影天体位置并剔除屏幕外的标签，返回 [(名称, x, y)]；不显示标签时返回 None"""
+        if not self.renderer.show_labels:
+            return None
+        try:
+            # 一次矩阵乘法投影全部天体，得到窗口坐标
+            win = self.renderer.world_to_screen_batch(scaled_positions)
+            # UI 的坐标系在 draw_text 中假设 y 向下，从 0 到 height
+            screen_x = win[:, 0]
+            screen_y = self.height - win[:, 1]
+            # 屏幕外与远平面之外的标签整体剔除（相机后方的点为 NaN，比较结果为 False）
+            visible = ((screen_x >= 0) & (screen_x < self.width) &
+                       (screen_y >= 0) & (screen_y < self.height) & (win[:, 2] < 1.0))
+            rows = np.flatnonzero(visible)
+            screen_xy = np.column_stack((screen_x[rows], screen_y[rows])).astype(np.int32).tolist()
+            names = table.names
+            return [(names[i], x, y) for i, (x, y) in zip(rows.tolist(), screen_xy)]
+        except Exception:
+            return None
+
     def update_fps(self):
         """更新FPS计数"""
         self.frame_count += 1
@@ -405,28 +578,13 @@ class CelestialSimulator:
             
     def save_scene(self):
         """保存当前场景"""
-        scene_data = {
-            'timestamp': datetime.now().isoformat(),
-            'bodies': []
-        }
-        
-        for body in self.celestial_bodies:
-            body_data = {
-                'name': body.name,
-                'type': body.type,
-                'mass': body.mass,
-                'radius': body.radius,
-                'position': [body.position.x, body.position.y, body.position.z],
-                'velocity': [body.velocity.x, body.velocity.y, body.velocity.z],
-                'color': body.color
-            }
-            scene_data['bodies'].append(body_data)
-            
+        # 位置与速度直接取 SoA 表的数组
+        # （由事件处理调用，多线程模式下调用方已持有 physics_lock）
+        table = self.sync_body_table()
         filename = f"scene_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(scene_data, f, indent=2, ensure_ascii=False)
+        self.scene_manager.save_scene(dict(zip(table.keys, table.bodies)), filename, table)
             
-        print(f"场景已保存到: {filename}")
+        logger.info("场景已保存到: %s", filename)
         
     def load_scene(self):
         """加载场景"""
@@ -434,27 +592,14 @@ class CelestialSimulator:
         filename = "scene_20231201_120000.json"  # 示例文件名
         
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                scene_data = json.load(f)
-                
-            self.clear_all_bodies()
-            
-            for body_data in scene_data['bodies']:
-                body = CelestialBody(
-                    name=body_data['name'],
-                    type=body_data['type'],
-                    mass=body_data['mass'],
-                    radius=body_data['radius'],
-                    position=body_data['position'],
-                    velocity=body_data['velocity'],
-                    color=body_data['color']
-                )
-                self.celestial_bodies.append(body)
+            # 读取成功后才会清空并替换现有天体
+            self.scene_manager.load_scene(self.celestial_bodies, filename)
+            self.selected_body = None
                 
-            print(f"场景已从 {filename} 加载")
+            logger.info("场景已从 %s 加载", filename)
             
         except FileNotFoundError:
-            print(f"文件 {filename} 不存在")
+            logger.warning("文件 %s 不存在", filename)
             
     def load_solar_system(self):
         """加载太阳系"""
@@ -474,14 +619,21 @@ class CelestialSimulator:
     def run(self):
         """主循环"""
         clock = pygame.time.Clock()
+        if ENABLE_MULTITHREADING:
+            self.start_physics_thread()
         
         while self.is_running:
-            # 处理事件
-            self.handle_events()
-            
-            # 更新物理
             dt = clock.tick(60) / 1000.0  # 转换为秒
-            self.update_physics(dt)
+            if self._physics_thread is not None:
+                # 事件处理可能增删天体，需与物理线程互斥
+                with self.physics_lock:
+                    self.handle_events()
+            else:
+                # 处理事件
+                self.handle_events()
+                
+                # 更新物理
+                self.update_physics(dt)
             
             # 渲染
             self.render()
@@ -490,10 +642,14 @@ class CelestialSimulator:
             self.update_fps()
             
         # 清理
+        if self._physics_thread is not None:
+            self._physics_thread.join()
+        self.ui_manager.release_gl_resources()
         pygame.quit()
         sys.exit()
         
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     # 创建并运行模拟器
     simulator = CelestialSimulator()
     simulator.run()
\ No newline at end of file
@@ -105,15 +105,21 @@ CAMERA_SENSITIVITY = 0.5
 ZOOM_SENSITIVITY = 0.1
 
 # 物理计算配置
-USE_RK4_INTEGRATION = True  # 是否使用RK4积分方法
+INTEGRATION_METHOD = 'verlet'  # 积分方法：'verlet'（辛积分，每步 1 次引力计算）、'rk4'（每步 4 次）、'dopri5'（自适应步长）或 'euler'
 ENABLE_COLLISION_DETECTION = True  # 是否启用碰撞检测
 ENABLE_RELATIVISTIC_CORRECTIONS = False  # 是否启用相对论修正
+USE_BARNES_HUT = True  # 天体较多时是否使用 Barnes-Hut 八叉树（False 始终直接求和）
+BARNES_HUT_THRESHOLD = 8000  # 天体数不少于该值时使用 Barnes-Hut 八叉树计算引力
+BARNES_HUT_THETA = 0.5  # Barnes-Hut 张角阈值（越小越精确）
+SINGLE_PRECISION_FORCES = False  # 引力计算是否使用单精度（约快一倍，相对误差约 1e-6；积分状态仍为双精度）
 
 # 性能配置
 TARGET_FPS = 60
+PHYSICS_TIME_STEP = 1.0 / 60.0  # 物理子步对应的真实时间（秒），与帧率无关
 MAX_PHYSICS_STEPS_PER_FRAME = 10
 ENABLE_MULTITHREADING = False  # 是否启用多线程
 USE_CUDA = False  # 是否使用CUDA加速
+CUDA_MIN_BODIES = 2048  # 天体数不少于该值时才交给 GPU（较少时数据传输与启动开销大于收益）
 
 # 数据保存配置
 AUTO_SAVE_INTERVAL = 300  # 自动保存间隔（秒）
@@ -5,10 +5,387 @@
 
 import numpy as np
 import math
+import functools
+from dataclasses import dataclass, field
 from typing import List, Tuple, Dict
 
+# Numba 为可选依赖：缺失时退回到纯 NumPy 实现
+try:
+    from numba import njit, prange, get_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def get_num_threads():
+        """Numba 不可用时按单线程处理"""
+        return 1
+
+    def njit(*args, **kwargs):
+        """Numba 不可用时的空装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+from barnes_hut import accelerations_bh_gm, accelerations_bh
+
+G_CONST = 6.67430e-11  # 引力常数 (N·m²/kg²)
+
+# math.cbrt 自 Python 3.11 起提供，较早版本退回到幂运算
+_cbrt = getattr(math, 'cbrt', lambda x: x ** (1.0 / 3.0))
+
+
+# NumPy 直接求和按行分块时，每块 [B, N] 临时数组的目标元素数（约 1 MB 的 float64，[B, N, 3] 约 3 MB），
+# 使中间结果留在缓存中，且临时内存不随 N² 增长
+_NUMPY_BLOCK_ELEMENTS = 1 << 17
+
+
+def numpy_block_rows(n: int) -> int:
+    """NumPy 直接求和每块处理的行数"""
+    return max(1, min(n, _NUMPY_BLOCK_ELEMENTS // max(n, 1)))
+
+
+def compute_accelerations(pos: np.ndarray, mass: np.ndarray, G: float, eps2: float = 0.0,
+                          out: np.ndarray = None, work: tuple = None, phi: np.ndarray = None) -> np.ndarray:
+    """
+    向量化计算所有天体受到的引力加速度（直接求和，O(N²)；Numba 不可用时的实现）
+
+    按 B 行一块处理：每块的 [B, N] 临时数组留在缓存中，内存占用为 O(B·N) 而不是 O(N²)。
+
+    Args:
+        pos: 位置数组 [N, 3] (m)
+        mass: 质量数组 [N] (kg)
+        G: 引力常数
+        eps2: 软化长度的平方，避免两天体过近时加速度发散
+        out: 可选的输出数组 [N, 3]
+        work: 可选的预分配临时数组 (r_ij [B, N, 3], r2 [B, N])，B 为分块行数，逐步复用以免每次分配
+        phi: 可选的输出数组 [N]，写入每个天体处的引力势 -Σ_j G m_j / r_ij
+
+    Returns:
+        加速度数组 [N, 3] (m/s²)
+    """
+    n = len(pos)
+    if work is None:
+        block = numpy_block_rows(n)
+        work = (np.empty((block, n, 3)), np.empty((block, n)))
+    r_ij_buf, r2_buf = work
+    block = len(r2_buf)
+    if out is None:
+        out = np.empty((n, 3))
+    gm = mass * G if G != 1.0 else mass
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        r_ij = r_ij_buf[:stop - start]
+        r2 = r2_buf[:stop - start]
+        # r_ij[i, j] = pos[j] - pos[i]，指向施力天体
+        np.subtract(pos[None, :, :], pos[start:stop, None, :], out=r_ij)
+        np.einsum('ijk,ijk->ij', r_ij, r_ij, out=r2)
+        r2 += eps2
+        # 自身（本块中第 k 行的第 start+k 列）置为 inf，1/√inf = 0，无需分支或整块掩码即可去掉自作用
+        # （含软化时的自身势能 -Gm_i/ε）
+        r2.reshape(-1)[start::n + 1] = np.inf
+        # 原地得到 1/r，再得到 1/r³
+        with np.errstate(divide='ignore'):
+            np.sqrt(r2, out=r2)
+            np.divide(1.0, r2, out=r2)
+        # 无软化时位置重合的不同天体同样不产生作用（有软化时 r² ≥ ε² > 0，不会出现 inf）
+        if eps2 <= 0.0:
+            r2[np.isinf(r2)] = 0.0
+        if phi is not None:
+            np.dot(r2, gm, out=phi[start:stop])
+            phi[start:stop] *= -1.0
+        np.power(r2, 3, out=r2)
+        r2 *= gm[None, :]
+        np.einsum('ijk,ij->ik', r_ij, r2, out=out[start:stop])
+    return out
+
+
+# 直接求和核的浮点优化选项：允许重结合与近似倒数/开方以便向量化，
+# 但不假设没有 inf（r² = 0 的配对用 1/√inf = 0 无分支地屏蔽）
+_KERNEL_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+# 天体数少于该值时使用单线程编译核：N² 的计算量只有几十微秒，唤醒线程池与分配
+# 每线程局部数组的开销反而更大
+PARALLEL_MIN_BODIES = 256
+
+
+def _make_accel_kernel(signature: str, ftype, parallel: bool = True):
+    """按浮点类型 ftype（np.float64 或 np.float32）生成直接求和核，签名固定、导入时即编译
+
+    parallel=False 时生成单线程版本（prange 退化为普通循环），n_threads 固定按 1 处理。
+    """
+    zero = ftype(0.0)
+    one = ftype(1.0)
+    inf = ftype(np.inf)
+    # 核体读取该闭包值：Numba 的磁盘缓存键不含 parallel 标志，但包含闭包变量，
+    # 由此并行与单线程版本各占一个缓存条目，单线程版本不会加载并行版本的机器码
+    threaded = bool(parallel)
+
+    @njit(signature, parallel=parallel, fastmath=_KERNEL_FASTMATH, cache=True)
+    def kernel(x, y, z, gm, eps2, n_threads, out, phi):
+        """
+        直接求和引力核（Numba 编译）：out[i] = Σ_j Gm_j (r_j - r_i) / |r_j - r_i|³，
+        同时顺带求出引力势 phi[i] = -Σ_j Gm_j / |r_j - r_i|（复用已算出的 1/r，几乎没有额外开销）
+
+        gm 为预先乘好引力常数的 G·m 数组。利用作用力与反作用力对称，每对 (i, j>i) 只计算一次距离，
+        同时累加到 i 和 j。对 j 的累加会跨线程冲突，因此每个线程（共 n_threads 个）写入自己的局部数组，
+        最后再归约；线程 t 处理第 t, t+T, t+2T... 行，使三角形工作量在线程间均匀分布。
+
+        坐标以 x, y, z 三个连续数组传入，内层循环无分支、用无符号下标（省去负下标回绕检查），
+        LLVM 可将其自动向量化为 SIMD 指令（宿主 CPU 支持的 AVX2/AVX-512）。
+        全部运算保持 ftype 精度，float32 版每条 SIMD 指令处理的配对数翻倍。
+        """
+        n = x.shape[0]
+        if not threaded:
+            n_threads = 1
+        local_x = np.zeros((n_threads, n), dtype=ftype)
+        local_y = np.zeros((n_threads, n), dtype=ftype)
+        local_z = np.zeros((n_threads, n), dtype=ftype)
+        local_phi = np.zeros((n_threads, n), dtype=ftype)
+        rows = (n + n_threads - 1) // n_threads
+        for t in prange(n_threads):
+            acc_x = local_x[t]
+            acc_y = local_y[t]
+            acc_z = local_z[t]
+            acc_phi = local_phi[t]
+            for k in range(rows):
+                i = t + k * n_threads
+                if i >= n:
+                    break
+                xi = x[i]
+                yi = y[i]
+                zi = z[i]
+                gm_i = gm[i]
+                ax = zero
+                ay = zero
+                az = zero
+                p = zero
+                for j in range(np.uint64(i + 1), np.uint64(n)):
+                    dx = x[j] - xi
+                    dy = y[j] - yi
+                    dz = z[j] - zi
+                    r2 = dx * dx + dy * dy + dz * dz + eps2
+                    # 位置重合的天体不产生作用
+                    r2 = r2 if r2 > zero else inf
+                    inv_r = one / np.sqrt(r2)
+                    inv_r3 = inv_r * inv_r * inv_r
+                    s_j = gm[j] * inv_r3
+                    s_i = gm_i * inv_r3
+                    ax += dx * s_j
+                    ay += dy * s_j
+                    az += dz * s_j
+                    p -= gm[j] * inv_r
+                    acc_x[j] -= dx * s_i
+                    acc_y[j] -= dy * s_i
+                    acc_z[j] -= dz * s_i
+                    acc_phi[j] -= gm_i * inv_r
+                acc_x[i] += ax
+                acc_y[i] += ay
+                acc_z[i] += az
+                acc_phi[i] += p
+        for i in prange(n):
+            sx = zero
+            sy = zero
+            sz = zero
+            sp = zero
+            for t in range(n_threads):
+                sx += local_x[t, i]
+                sy += local_y[t, i]
+                sz += local_z[t, i]
+                sp += local_phi[t, i]
+            out[i, 0] = sx
+            out[i, 1] = sy
+            out[i, 2] = sz
+            phi[i] = sp
+
+    return kernel
+
+
+_KERNEL_SIG_F64 = 'void(f8[::1], f8[::1], f8[::1], f8[::1], f8, i8, f8[:, ::1], f8[::1])'
+_KERNEL_SIG_F32 = 'void(f4[::1], f4[::1], f4[::1], f4[::1], f4, i8, f4[:, ::1], f4[::1])'
+_accel_kernel = _make_accel_kernel(_KERNEL_SIG_F64, np.float64)
+_accel_kernel_serial = _make_accel_kernel(_KERNEL_SIG_F64, np.float64, parallel=False)
+# 单精度核：只用于引力计算，位置/速度状态仍以 float64 积分
+_accel_kernel_f32 = _make_accel_kernel(_KERNEL_SIG_F32, np.float32)
+_accel_kernel_f32_serial = _make_accel_kernel(_KERNEL_SIG_F32, np.float32, parallel=False)
+
+
+def _select_kernel(n: int, single: bool) -> tuple:
+    """按天体数选择并行或单线程编译核，返回 (核, 线程数)"""
+    if n < PARALLEL_MIN_BODIES:
+        return (_accel_kernel_f32_serial if single else _accel_kernel_serial), 1
+    return (_accel_kernel_f32 if single else _accel_kernel), get_num_threads()
+
+
+def accelerations_gm(pos: np.ndarray, gm: np.ndarray, eps2: float = 0.0,
+                     out: np.ndarray = None, work: tuple = None, phi: np.ndarray = None,
+                     dtype=np.float64) -> np.ndarray:
+    """由 G·m 数组计算引力加速度：Numba 可用时使用编译核，否则使用 NumPy 广播实现
+
+    work 为 NumPy 实现所需的分块临时数组（见 compute_accelerations），编译核不需要。
+    给出 phi（[N]）时同时写入各天体处的引力势，与加速度在同一遍计算中得到。
+    dtype 为 np.float32 时用单精度核计算，结果仍以 float64 返回；NumPy 实现始终使用双精度。
+    """
+    if not NUMBA_AVAILABLE:
+        return compute_accelerations(pos, gm, 1.0, eps2, out, work, phi)
+
+    n = len(gm)
+    if dtype == np.float32:
+        # 坐标平移到平均位置并按范围 L 缩放到 O(1)，避免大坐标吞掉天体间距离、r³ 超出单精度范围；
+        # 取 gm' = gm / L²、eps2' = eps2 / L² 时加速度不变，引力势为 phi' · L
+        rel = pos - pos.mean(axis=0) if n else pos
+        scale = float(np.abs(rel).max()) if n else 0.0
+        scale = scale if scale > 0.0 else 1.0
+        xyz = np.ascontiguousarray(rel.T / scale, dtype=np.float32)
+        gm32 = np.ascontiguousarray(gm / (scale * scale), dtype=np.float32)
+        acc32 = np.empty((n, 3), dtype=np.float32)
+        phi32 = np.empty(n, dtype=np.float32)
+        kernel, n_threads = _select_kernel(n, single=True)
+        kernel(xyz[0], xyz[1], xyz[2], gm32, np.float32(eps2 / (scale * scale)),
+               n_threads, acc32, phi32)
+        if phi is not None:
+            np.multiply(phi32, scale, out=phi)
+        if out is None:
+            return acc32.astype(np.float64)
+        out[:] = acc32
+        return out
+
+    # 编译核按分量读取坐标：转置为 [3, N] 的连续数组（O(N) 拷贝，相对 O(N²) 计算可忽略）
+    xyz = np.ascontiguousarray(pos.T, dtype=np.float64)
+    gm = np.ascontiguousarray(gm, dtype=np.float64)
+    phi_out = phi if phi is not None and phi.flags.c_contiguous else np.empty(n)
+    acc_out = out if out is not None and out.flags.c_contiguous else np.empty((n, 3))
+    kernel, n_threads = _select_kernel(n, single=False)
+    kernel(xyz[0], xyz[1], xyz[2], gm, float(eps2), n_threads, acc_out, phi_out)
+    if phi is not None and phi is not phi_out:
+        phi[:] = phi_out
+    if out is None:
+        return acc_out
+    if out is not acc_out:
+        out[:] = acc_out
+    return out
+
+
+def accelerations(pos: np.ndarray, mass: np.ndarray, G: float, eps2: float = 0.0,
+                  out: np.ndarray = None) -> np.ndarray:
+    """计算引力加速度（质量与引力常数分开给出）"""
+    return accelerations_gm(pos, G * mass, eps2, out)
+
+
+# 由宽到窄排列的 SIMD 指令集等级及其对应的 LLVM CPU 特性
+_SIMD_LEVELS = (('AVX-512', 'avx512f'), ('AVX2', 'avx2'), ('AVX', 'avx'), ('SSE4.2', 'sse4.2'), ('SSE2', 'sse2'))
+
+
+def kernel_simd_info() -> Tuple[str, str]:
+    """返回 (CPU 型号, 最宽 SIMD 等级)，即引力核实际编译所针对的目标
+
+    Numba 在运行时按本机 CPU 生成机器码（磁盘缓存也按 CPU 型号与特性区分），
+    因此同一份代码在不同机器上会各自得到 SSE/AVX2/AVX-512 版本，无需预编译多个变体。
+    """
+    if not NUMBA_AVAILABLE:
+        return 'numpy', 'numpy'
+    from llvmlite import binding as llvm
+    cpu = llvm.get_host_cpu_name()
+    features = llvm.get_host_cpu_features()
+    for level, flag in _SIMD_LEVELS:
+        if features.get(flag, False):
+            return cpu, level
+    return cpu, 'scalar'
+
+
+def warmup_kernels():
+    """用两个天体的小系统预先触发 JIT 编译，避免首帧卡顿"""
+    pos = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    mass = np.ones(2)
+    accelerations(pos, mass, 1.0)
+    accelerations_bh(pos, mass, 1.0)
+
+# 相邻 27 个网格（含自身）的整数偏移
+_NEIGHBOR_OFFSETS = np.array([(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)],
+                             dtype=np.int64)
+
+
+def _cell_hash(cells: np.ndarray) -> np.ndarray:
+    """将整数网格坐标散列为 int64 键（溢出回绕无妨，散列冲突只会多出候选对）"""
+    return (cells[:, 0] * 73856093) ^ (cells[:, 1] * 19349663) ^ (cells[:, 2] * 83492791)
+
+
+# 天体数低于该值时碰撞检测直接计算全部配对的距离矩阵（比网格的排序与二分查找更快）
+COLLISION_GRID_THRESHOLD = 64
+
+
+def find_collision_pairs(pos: np.ndarray, radius: np.ndarray) -> np.ndarray:
+    """
+    查找相互接触的天体对：天体较少时计算全配对距离矩阵，否则用均匀网格（cell list）
+
+    网格边长取 2*max(radius)，相撞两天体的距离小于 r_i + r_j <= 网格边长，
+    因此只需检查各自所在网格及其相邻的 27 个网格。按网格键排序后用二分查找
+    取出相邻网格中的天体，整体为 O(N log N + 候选对数)。
+
+    Args:
+        pos: 位置数组 [N, 3] (m)
+        radius: 半径数组 [N] (m)
+
+    Returns:
+        np.ndarray: 碰撞天体对的行号 [K, 2]，每行 i < j，按 (i, j) 升序排列
+    """
+    n = len(pos)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    if n < COLLISION_GRID_THRESHOLD:
+        delta = pos[:, None, :] - pos[None, :, :]
+        reach = radius[:, None] + radius[None, :]
+        touching = np.einsum('ijk,ijk->ij', delta, delta) < reach * reach
+        return np.argwhere(np.triu(touching, k=1))
+
+    cell_size = 2.0 * float(radius.max())
+    if not cell_size > 0.0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    cells = np.floor(pos / cell_size).astype(np.int64)
+    keys = _cell_hash(cells)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    # 每个天体在 27 个相邻网格中的候选区间 [lo, hi)
+    neighbor_keys = _cell_hash((cells[:, None, :] + _NEIGHBOR_OFFSETS).reshape(-1, 3))
+    lo = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+    counts = np.searchsorted(sorted_keys, neighbor_keys, side='right') - lo
+
+    # 展开为候选对 (i, j)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    i = np.repeat(np.arange(n).repeat(len(_NEIGHBOR_OFFSETS)), counts)
+    j = order[np.repeat(lo - starts, counts) + np.arange(total)]
+
+    keep = i < j
+    i, j = i[keep], j[keep]
+    delta = pos[i] - pos[j]
+    reach = radius[i] + radius[j]
+    hit = np.einsum('ij,ij->i', delta, delta) < reach * reach
+    # 散列冲突可能使同一对出现多次
+    pair_ids = np.unique(i[hit] * n + j[hit])
+    return np.stack((pair_ids // n, pair_ids % n), axis=1)
+
+
+def _cross3(ax: float, ay: float, az: float, bx: float, by: float, bz: float) -> Tuple[float, float, float]:
+    """标量形式的 3 维叉积，供逐天体的 Python 路径使用"""
+    return ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx
+
+
 class CelestialBody:
     """天体类 - 表示宇宙中的各种天体"""
+
+    # 固定属性槽：没有每实例的 __dict__，属性读写为固定偏移的查找，内存占用更小
+    # （has_atmosphere 为可选属性，未设置时渲染器按 False 处理）
+    __slots__ = ('name', 'type', 'mass', 'radius', 'position', 'velocity', 'color',
+                 'trail', 'max_trail_length', '_trail_head', '_trail_len',
+                 'orbit_calculated', 'semi_major_axis', 'eccentricity', 'period',
+                 'display_list', 'label_texture', 'force', 'acceleration', 'has_atmosphere')
     
     def __init__(self, name: str, body_type: str, mass: float, radius: float, 
                  position: List[float], velocity: List[float], color: Tuple[float, float, float]):
@@ -28,13 +405,20 @@ class CelestialBody:
         self.type = body_type
         self.mass = mass
         self.radius = radius
-        self.position = np.array(position, dtype=np.float64)
-        self.velocity = np.array(velocity, dtype=np.float64)
+        # 构造时一次性转换为独立的 float64 [3] 数组（列表或数组输入均复制），之后的运算都走 NumPy 路径；
+        # 形状不符的输入在此处即报错，不会在 SoA 收集时才暴露
+        self.position = np.array(position, dtype=np.float64).reshape(3)
+        self.velocity = np.array(velocity, dtype=np.float64).reshape(3)
         self.color = color
         
         # 轨道相关
-        self.trail = []  # 轨道轨迹点
+        # 轨道轨迹点：预分配的 float32 环形缓冲区 [2 * max_trail_length, 3]（仅供显示，单精度足够，
+        # 可直接作为 GL_FLOAT 顶点数组），首次记录时分配；每个点同时写入前后两半，
+        # 按时间先后的全部轨迹点总是缓冲区中一段连续的切片
+        self.trail = None
         self.max_trail_length = 1000
+        self._trail_head = 0  # 下一个写入位置
+        self._trail_len = 0  # 有效点数
         self.orbit_calculated = False
         self.semi_major_axis = 0.0
         self.eccentricity = 0.0
@@ -47,6 +431,48 @@ class CelestialBody:
         # 物理属性
         self.force = np.zeros(3, dtype=np.float64)
         self.acceleration = np.zeros(3, dtype=np.float64)
+
+    @classmethod
+    def from_soa(cls, names: List[str], body_types: List[str], masses: np.ndarray, radii: np.ndarray,
+                 positions: np.ndarray, velocities: np.ndarray, colors: List[Tuple[float, float, float]]) -> List['CelestialBody']:
+        """由按列存放的数组批量构建天体，返回列表
+
+        位置/速度各复制为一块 [N, 3] 数组，每个天体持有其中一行的视图（与 BodyTable 相同的布局）；
+        不经过 __init__ 的参数解析与逐个 np.array 转换，其余属性取与 __init__ 相同的初始值。
+        """
+        n = len(names)
+        pos = np.array(positions, dtype=np.float64).reshape(n, 3)
+        vel = np.array(velocities, dtype=np.float64).reshape(n, 3)
+        force = np.zeros((n, 3), dtype=np.float64)
+        acceleration = np.zeros((n, 3), dtype=np.float64)
+        masses = np.asarray(masses, dtype=np.float64).tolist()
+        radii = np.asarray(radii, dtype=np.float64).tolist()
+
+        bodies = []
+        new = cls.__new__
+        for i in range(n):
+            body = new(cls)
+            body.name = names[i]
+            body.type = body_types[i]
+            body.mass = masses[i]
+            body.radius = radii[i]
+            body.position = pos[i]
+            body.velocity = vel[i]
+            body.color = colors[i]
+            body.trail = None
+            body.max_trail_length = 1000
+            body._trail_head = 0
+            body._trail_len = 0
+            body.orbit_calculated = False
+            body.semi_major_axis = 0.0
+            body.eccentricity = 0.0
+            body.period = 0.0
+            body.display_list = None
+            body.label_texture = None
+            body.force = force[i]
+            body.acceleration = acceleration[i]
+            bodies.append(body)
+        return bodies
         
     def update_position(self, dt: float):
         """更新天体位置"""
@@ -54,9 +480,27 @@ class CelestialBody:
         self.position += self.velocity * dt
         
         # 更新轨迹
-        self.trail.append(self.position.copy())
-        if len(self.trail) > self.max_trail_length:
-            self.trail.pop(0)
+        self.record_trail_point()
+
+    def record_trail_point(self):
+        """把当前位置写入轨迹环形缓冲区（O(1)，不分配内存），满后覆盖最旧的点"""
+        if self.trail is None:
+            self.trail = np.empty((2 * self.max_trail_length, 3), dtype=np.float32)
+        self.trail[self._trail_head] = self.position
+        self.trail[self._trail_head + self.max_trail_length] = self.position
+        self._trail_head = (self._trail_head + 1) % self.max_trail_length
+        self._trail_len = min(self._trail_len + 1, self.max_trail_length)
+
+    def trail_points(self) -> np.ndarray:
+        """按时间先后返回轨迹点 [M, 3] 的连续视图（不复制，下一次记录前有效，只读使用）"""
+        if self._trail_len == 0:
+            return np.empty((0, 3), dtype=np.float32)
+        start = self._trail_head if self._trail_len == self.max_trail_length else 0
+        return self.trail[start:start + self._trail_len]
+
+    def get_trail(self) -> np.ndarray:
+        """按时间先后返回轨迹点 [M, 3] 的副本"""
+        return self.trail_points().copy()
             
     def update_velocity(self, dt: float):
         """更新天体速度"""
@@ -64,43 +508,42 @@ class CelestialBody:
         
     def get_kinetic_energy(self) -> float:
         """计算动能"""
-        speed = np.linalg.norm(self.velocity)
-        return 0.5 * self.mass * speed * speed
+        vx, vy, vz = self.velocity.tolist()
+        return 0.5 * self.mass * (vx * vx + vy * vy + vz * vz)
         
     def get_potential_energy(self, other_bodies: List['CelestialBody']) -> float:
-        """计算引力势能"""
-        G = 6.67430e-11  # 引力常数
-        potential_energy = 0.0
-        
-        for other in other_bodies:
-            if other is not self:
-                distance = np.linalg.norm(self.position - other.position)
-                if distance > 0:
-                    potential_energy -= G * self.mass * other.mass / distance
-                    
-        return potential_energy
+        """计算引力势能（与其他天体的距离一次性按数组计算）"""
+        others = [other for other in other_bodies if other is not self]
+        if not others:
+            return 0.0
+        pos = np.array([other.position for other in others], dtype=np.float64).reshape(-1, 3)
+        mass = np.fromiter((other.mass for other in others), dtype=np.float64, count=len(others))
+        pos -= self.position
+        distance = np.sqrt(np.einsum('ij,ij->i', pos, pos))
+        # 位置重合的天体不计入
+        overlap = distance > 0
+        return float(-G_CONST * self.mass * np.sum(mass[overlap] / distance[overlap]))
         
     def calculate_orbit_parameters(self, central_body: 'CelestialBody'):
         """计算轨道参数（相对于中心天体）"""
         if central_body is None or central_body is self:
             return
             
-        # 相对位置和速度
-        r_vec = self.position - central_body.position
-        v_vec = self.velocity - central_body.velocity
+        # 相对位置和速度（3 维向量按分量用 Python 浮点计算，避开 np.cross 等的调用开销）
+        rx, ry, rz = (self.position - central_body.position).tolist()
+        vx, vy, vz = (self.velocity - central_body.velocity).tolist()
         
-        r = np.linalg.norm(r_vec)
-        v = np.linalg.norm(v_vec)
+        r = math.sqrt(rx * rx + ry * ry + rz * rz)
+        v = math.sqrt(vx * vx + vy * vy + vz * vz)
         
         if r == 0 or v == 0:
             return
             
-        G = 6.67430e-11
-        mu = G * (self.mass + central_body.mass)
+        mu = G_CONST * (self.mass + central_body.mass)
         
-        # 比角动量
-        h_vec = np.cross(r_vec, v_vec)
-        h = np.linalg.norm(h_vec)
+        # 比角动量 h = r × v
+        hx, hy, hz = _cross3(rx, ry, rz, vx, vy, vz)
+        h = math.sqrt(hx * hx + hy * hy + hz * hz)
         
         if h == 0:
             return
@@ -114,9 +557,10 @@ class CelestialBody:
         else:
             self.semi_major_axis = float('inf')
             
-        # 偏心率
-        e_vec = np.cross(v_vec, h_vec) / mu - r_vec / r
-        self.eccentricity = np.linalg.norm(e_vec)
+        # 偏心率 e = (v × h) / mu - r / |r|
+        cx, cy, cz = _cross3(vx, vy, vz, hx, hy, hz)
+        ex, ey, ez = cx / mu - rx / r, cy / mu - ry / r, cz / mu - rz / r
+        self.eccentricity = math.sqrt(ex * ex + ey * ey + ez * ez)
         
         # 轨道周期（开普勒第三定律）
         if self.semi_major_axis > 0 and self.semi_major_axis != float('inf'):
@@ -128,23 +572,26 @@ class CelestialBody:
         
     def is_collision_with(self, other: 'CelestialBody') -> bool:
         """检测与另一天体的碰撞"""
-        distance = np.linalg.norm(self.position - other.position)
-        return distance < (self.radius + other.radius)
+        # 比较距离平方，省去开方；3 维向量逐分量用 Python 浮点计算，避开 NumPy 调用开销
+        x1, y1, z1 = self.position.tolist()
+        x2, y2, z2 = other.position.tolist()
+        dx, dy, dz = x1 - x2, y1 - y2, z1 - z2
+        reach = self.radius + other.radius
+        return dx * dx + dy * dy + dz * dz < reach * reach
         
     def merge_with(self, other: 'CelestialBody'):
         """与另一天体合并（碰撞后）"""
-        # 动量守恒
-        total_mass = self.mass + other.mass
-        self.velocity = (self.mass * self.velocity + other.mass * other.velocity) / total_mass
+        old_mass = self.mass
+        total_mass = old_mass + other.mass
+        # 动量守恒；位置调整到合并前两者的质心（都用合并前的质量加权）。
+        # 原地写入，天体若是 BodyTable 的行视图仍保持绑定
+        self.velocity[:] = (old_mass * self.velocity + other.mass * other.velocity) / total_mass
+        self.position[:] = (old_mass * self.position + other.mass * other.position) / total_mass
         
         # 更新质量和半径（假设密度不变）
         self.mass = total_mass
-        # 体积相加，重新计算半径
-        total_volume = (4/3) * math.pi * (self.radius**3 + other.radius**3)
-        self.radius = (total_volume * 3 / (4 * math.pi))**(1/3)
-        
-        # 位置调整到质心
-        self.position = (self.mass * self.position + other.mass * other.position) / total_mass
+        # 体积相加，重新计算半径（4π/3 因子约去）
+        self.radius = _cbrt(self.radius**3 + other.radius**3)
         
     def __str__(self):
         return f"{self.name} ({self.type}) - 质量: {self.mass:.2e}kg, 位置: {self.position}, 速度: {self.velocity}m/s, 半径: {self.radius}m"
@@ -152,249 +599,630 @@ class CelestialBody:
     def __repr__(self):
         return self.__str__()
 
+# 天体类型的 uint8 编码（BodyTable.type_code），便于按类型做数组掩码；未知类型编码为 255
+BODY_TYPE_CODES = {'star': 0, 'planet': 1, 'moon': 2, 'asteroid': 3}
+
+
+@dataclass(eq=False)
+class BodyTable:
+    """天体 SoA 表 - 将天体属性存放在按行对齐的连续数组中
+
+    由天体字典构建，构建后各天体的 position/velocity 成为 pos/vel 数组行的视图，
+    因此对数组的原地积分会直接反映到天体对象上。
+    表之间按对象身份比较（渲染缓存键与快照据此判断表是否已重建），不逐字段比较数组。
+    """
+
+    keys: List[str] = field(default_factory=list)
+    bodies: List[CelestialBody] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)
+    pos: np.ndarray = field(default_factory=lambda: np.empty((0, 3), dtype=np.float64))
+    vel: np.ndarray = field(default_factory=lambda: np.empty((0, 3), dtype=np.float64))
+    mass: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    radius: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    color: np.ndarray = field(default_factory=lambda: np.empty((0, 3), dtype=np.float32))
+    type_code: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint8))
+    total_mass: float = 0.0  # 成员不变时质量守恒（合并会改变成员并重建表）
+    index: Dict[str, int] = field(default_factory=dict)
+    _ids: tuple = ()
+
+    @classmethod
+    def from_bodies(cls, bodies: dict) -> 'BodyTable':
+        """从天体字典构建 SoA 表，并将天体的位置/速度绑定为数组行视图"""
+        keys = list(bodies.keys())
+        body_list = list(bodies.values())
+        n = len(body_list)
+
+        # 各列一次性堆叠成连续数组，之后只需逐个把天体的位置/速度改绑为行视图
+        pos = np.array([body.position for body in body_list], dtype=np.float64).reshape(n, 3)
+        vel = np.array([body.velocity for body in body_list], dtype=np.float64).reshape(n, 3)
+        color = np.array([body.color[:3] for body in body_list], dtype=np.float32).reshape(n, 3)
+        mass = np.fromiter((body.mass for body in body_list), dtype=np.float64, count=n)
+        for body, p, v in zip(body_list, pos, vel):
+            body.position = p
+            body.velocity = v
+
+        return cls(
+            keys=keys,
+            bodies=body_list,
+            names=[body.name for body in body_list],
+            types=[body.type for body in body_list],
+            pos=pos,
+            vel=vel,
+            mass=mass,
+            radius=np.fromiter((body.radius for body in body_list), dtype=np.float64, count=n),
+            color=color,
+            type_code=np.fromiter((BODY_TYPE_CODES.get(body.type, 255) for body in body_list),
+                                  dtype=np.uint8, count=n),
+            total_mass=float(mass.sum()),
+            index={key: i for i, key in enumerate(keys)},
+            _ids=tuple(map(id, body_list)),
+        )
+
+    def matches(self, bodies: dict) -> bool:
+        """天体成员是否与构建时一致（表持有天体引用，id 不会被复用）"""
+        return tuple(map(id, bodies.values())) == self._ids
+
+    def __len__(self) -> int:
+        return len(self.bodies)
+
+# Dormand-Prince 5(4) 嵌入式 Runge-Kutta 系数（FSAL：第 7 级即下一步的第 1 级）
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# 5 阶解与嵌入 4 阶解之差的系数，用于估计局部误差
+_DP_E = np.array([71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+
+
 class GravityEngine:
     """引力引擎 - 处理天体间的引力相互作用"""
     
-    def __init__(self):
-        self.G = 6.67430e-11  # 引力常数
-        self.use_rk4 = True  # 使用RK4积分方法
+    def __init__(self, dtype=np.float64):
+        self.G = G_CONST  # 引力常数
+        # 引力计算精度：np.float32 时直接求和核用单精度（SIMD 宽度翻倍），
+        # 位置/速度状态与积分始终为 float64，误差不会在状态中累积
+        self.dtype = dtype
+        # 积分方法：'verlet'（默认；辛积分，能量误差有界，每步 1 次引力计算）、'rk4'（每步 4 次）、
+        # 'euler' 或 'dopri5'（Dormand-Prince 5(4) 自适应步长，按 rtol/atol 控制误差）
+        self.integrator = 'verlet'
+        self.rtol = 1e-8
+        self.atol = 1e-10
+        # 自适应积分上一次建议的步长（秒），下次调用从这里开始
+        self._dopri_h = None
+        # 天体数不少于该阈值时改用 Barnes-Hut 八叉树（O(N log N)）计算引力；
+        # 阈值以下树的构建与遍历开销超过直接求和（向量化的 Numba 直接求和核约在 N≈8000 时持平）
+        self.use_barnes_hut = True
+        self.barnes_hut_threshold = 8000
+        self.barnes_hut_theta = 0.5
+        # 字典接口（calculate_gravitational_forces）每次收集的连续数组
+        self._pos = np.empty((0, 3))
+        self._mass = np.empty(0)
+        # G·m 缓存：按质量数组对象缓存，天体成员变化（SoA 表重建）时自动失效
+        self._gm = None
+        self._gm_source = None
+        # 1/m 缓存：同样按质量数组对象缓存，只在成员变化（合并、增删天体）后重新计算
+        self._inv_mass = None
+        self._inv_mass_source = None
+        # calculate_gravitational_forces 最近一次返回的字典及其底层 [N, 3] 合力数组（预分配缓冲区 'force'），
+        # update_accelerations 收到同一字典时直接在数组上整体换算，不再逐键查找
+        self._forces = None
+        self._force = np.empty((0, 3))
+        # Verlet 上一步末尾的加速度保存在 self._buf['acc']，按 (位置数组, G·m 数组) 对象判断能否在下一步开头复用
+        self._acc_source = (None, None)
+        # Dormand-Prince 的 FSAL 加速度同样按 (位置数组, G·m 数组) 跨调用复用
+        self._dp_source = (None, None)
+        # 字典接口上一次积分所用的 (位置数组, G·m 数组)：下一次收集到的状态与之相同时沿用这两个数组对象，
+        # 使上述按对象判断的加速度缓存在字典接口下同样生效（每步只需 1 次引力计算）
+        self._dict_state = (None, None)
+        # 积分用的预分配数组（加速度、中间位置/速度及 NumPy 实现的分块临时数组），
+        # 只在天体数变化时重新分配，逐步复用
+        self._buf = {}
+        self._buf_size = -1
+
+    def _ensure(self, n: int) -> dict:
+        """返回容纳 n 个天体的工作数组，天体数变化时才重新分配"""
+        if n != self._buf_size:
+            self._buf = {name: np.empty((n, 3)) for name in ('acc', 'a1', 'a2', 'a3', 'a4', 'tmp', 'v2', 'v3', 'force')}
+            if not NUMBA_AVAILABLE:
+                block = numpy_block_rows(n)
+                self._buf['work'] = (np.empty((block, n, 3)), np.empty((block, n)))
+            self._buf_size = n
+            # Verlet / Dormand-Prince 缓存的加速度在旧数组中，随之失效
+            self._acc_source = (None, None)
+            self._dp_source = (None, None)
+        return self._buf
         
-    def calculate_gravitational_forces(self, bodies: List[CelestialBody]) -> List[np.ndarray]:
+    def _sync_arrays(self, bodies: dict):
+        """把字典中天体的位置与质量收集为连续数组 self._pos [N, 3]、self._mass [N]（每次计算一次）"""
+        values = bodies.values()
+        self._pos = np.array([body.position for body in values], dtype=np.float64).reshape(-1, 3)
+        self._mass = np.array([body.mass for body in values], dtype=np.float64)
+
+    def calculate_gravitational_forces(self, bodies: dict) -> Dict[str, np.ndarray]:
         """
         计算所有天体间的引力
         
         Returns:
-            每个天体受到的合力列表
+            天体键 -> 该天体受到的合力（预分配的 [N, 3] 合力数组中的一行视图，下次调用时被覆盖）
         """
-        forces = {body: np.zeros(3) for body in bodies}
-        
-        body_list = list(bodies.values())  # 获取天体对象列表
-        body_keys = list(bodies.keys())  # 获取天体键（如 'earth', 'sun' 等）
-        
-        for i in range(len(body_list)):
-            for j in range(i + 1, len(body_list)):
-                body1, body2 = body_list[i], body_list[j]
-                
-                # 计算距离向量
-                r_vec = body2.position - body1.position
-                r = np.linalg.norm(r_vec)
-                
-                if r == 0:
-                    continue  # 如果两个天体位置相同，则跳过（避免除零错误）
-                    
-                # 计算引力大小
-                force_magnitude = self.G * body1.mass * body2.mass / (r * r)
-                
-                # 计算引力方向
-                force_direction = r_vec / r
-                
-                # 应用引力（作用力与反作用力）
-                forces[body_keys[i]] += force_direction * force_magnitude
-                forces[body_keys[j]] -= force_direction * force_magnitude  # 反作用力
-        
-        return forces
+        self._sync_arrays(bodies)
+        # 一次向量化/编译核计算全部加速度（核内按牛顿第三定律成对累加到连续数组），F_i = m_i · a_i
+        force = self._ensure(len(self._mass))['force']
+        self.accelerations(self._pos, self.G * self._mass, out=force)
+        force *= self._mass[:, None]
+        self._force = force
+        self._forces = dict(zip(bodies.keys(), force))
+        return self._forces
         
     def update_accelerations(self, bodies: dict, forces: dict):
-        """更新天体的加速度"""
-        for body_key, body in bodies.items():
-            if body.mass > 0:
-                body.acceleration = forces[body_key] / body.mass
+        """更新天体的加速度（a = F · (1/m)，整体乘以缓存的质量倒数）"""
+        if forces is self._forces and len(self._mass) == len(bodies):
+            mass, force = self._mass, self._force
+        else:
+            mass = np.fromiter((body.mass for body in bodies.values()), dtype=np.float64, count=len(bodies))
+            force = np.array([forces[body_key] for body_key in bodies], dtype=np.float64).reshape(-1, 3)
+        acc = force * self.inverse_masses(mass)[:, None]
+        for body, f, a, m in zip(bodies.values(), force, acc, mass):
+            body.force = f
+            if m > 0:
+                body.acceleration = a
                 
     def euler_integration(self, bodies: dict, dt: float):
-        """欧拉积分方法"""
-        # 计算力
-        forces = self.calculate_gravitational_forces(bodies)
-        
-        # 更新加速度
-        self.update_accelerations(bodies, forces)
-        
-        # 更新速度和位置
-        for body in bodies.values():
-            body.update_velocity(dt)
-            body.update_position(dt)
+        """欧拉积分方法（半隐式：先更新速度，再用新速度更新位置）"""
+        values, mass = self._integrate_bodies(bodies, dt, self._euler_arrays)
+        self._store_accelerations(values, mass)
             
     def rk4_integration(self, bodies: dict, dt: float):
         """Runge-Kutta 4阶积分方法"""
-        # 保存初始状态
-        initial_positions = {body_key: body.position.copy() for body_key, body in bodies.items()}
-        initial_velocities = {body_key: body.velocity.copy() for body_key, body in bodies.items()}
-        
-        # RK4积分步骤
-        k1_pos, k1_vel = self._rk4_step(bodies, dt, 0)
-        
-        # 应用k1
-        for body_key, body in bodies.items():
-            body.position = initial_positions[body_key] + 0.5 * k1_pos[body_key] * dt
-            body.velocity = initial_velocities[body_key] + 0.5 * k1_vel[body_key] * dt
-            
-        k2_pos, k2_vel = self._rk4_step(bodies, dt, 0.5 * dt)
-        
-        # 应用k2
-        for body_key, body in bodies.items():
-            body.position = initial_positions[body_key] + 0.5 * k2_pos[body_key] * dt
-            body.velocity = initial_velocities[body_key] + 0.5 * k2_vel[body_key] * dt
-            
-        k3_pos, k3_vel = self._rk4_step(bodies, dt, 0.5 * dt)
-        
-        # 应用k3
-        for body_key, body in bodies.items():
-            body.position = initial_positions[body_key] + k3_pos[body_key] * dt
-            body.velocity = initial_velocities[body_key] + k3_vel[body_key] * dt
-            
-        k4_pos, k4_vel = self._rk4_step(bodies, dt, dt)
-        
-        # 最终更新
-        for body_key, body in bodies.items():
-            body.position = initial_positions[body_key] + (k1_pos[body_key] + 2*k2_pos[body_key] + 2*k3_pos[body_key] + k4_pos[body_key]) * dt / 6
-            body.velocity = initial_velocities[body_key] + (k1_vel[body_key] + 2*k2_vel[body_key] + 2*k3_vel[body_key] + k4_vel[body_key]) * dt / 6
+        self._integrate_bodies(bodies, dt, self._rk4_arrays)
 
-    def _rk4_step(self, bodies: dict, dt: float, t: float) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
-        """RK4积分的一个步骤"""
-        # 计算当前状态的力
-        forces = self.calculate_gravitational_forces(bodies)
-        
-        positions = {}
-        velocities = {}
-        
-        for body_key, body in bodies.items():
-            # 位置变化率 = 当前速度
-            positions[body_key] = body.velocity.copy()
-            
-            # 速度变化率 = 当前加速度
-            if body.mass > 0:
-                acceleration = forces[body_key] / body.mass
+    def dopri5_integration(self, bodies: dict, dt: float):
+        """Dormand-Prince 5(4) 自适应步长积分方法"""
+        self._integrate_bodies(bodies, dt, self._dopri5_arrays)
+
+    def _integrate_bodies(self, bodies: dict, dt: float, step):
+        """字典接口的数组积分
+
+        天体状态收集为连续数组后由 step（如 _rk4_arrays）在预分配缓冲区上整体积分，
+        结果原地写回各天体（不重新绑定数组，天体若是 BodyTable 的行视图仍保持绑定），并各记录一个轨迹点。
+        若天体位置与质量自上一次积分以来未被外部修改，则沿用上一次的数组对象，
+        Verlet / Dormand-Prince 得以复用上一步末尾的加速度。
+        返回 (天体列表, 质量数组)。
+        """
+        values = list(bodies.values())
+        if not values:
+            return values, np.empty(0)
+        pos = np.array([body.position for body in values], dtype=np.float64)
+        vel = np.array([body.velocity for body in values], dtype=np.float64)
+        mass = np.array([body.mass for body in values], dtype=np.float64)
+        gm = self.G * mass
+
+        self._ensure(len(values))
+        # 与 step_arrays 相同：其他方法会改写位置，切换回来时不能复用缓存的加速度
+        if step != self._verlet_arrays:
+            self._acc_source = (None, None)
+        if step != self._dopri5_arrays:
+            self._dp_source = (None, None)
+        last_pos, last_gm = self._dict_state
+        if (last_pos is not None and last_pos.shape == pos.shape
+                and np.array_equal(last_pos, pos) and np.array_equal(last_gm, gm)):
+            pos, gm = last_pos, last_gm
+        else:
+            self._dict_state = (pos, gm)
+        step(pos, vel, gm, dt)
+
+        # 写回后每个天体记录一个轨迹点（每次积分调用一个，与原先逐天体 update_position 一致）
+        for body, p, v in zip(values, pos, vel):
+            body.position[:] = p
+            body.velocity[:] = v
+            body.record_trail_point()
+        return values, mass
+
+    def _store_accelerations(self, values: list, mass: np.ndarray):
+        """把积分末尾位置处的加速度（Verlet / 欧拉留在 self._buf['acc']）及合力写回各天体"""
+        if not values:
+            return
+        acc = self._buf['acc'].copy()
+        force = acc * mass[:, None]
+        for body, f, a in zip(values, force, acc):
+            body.force = f
+            body.acceleration = a
+
+    def gravitational_parameters(self, mass: np.ndarray) -> np.ndarray:
+        """返回 G·m 数组；同一个质量数组只计算一次（原地修改质量后需传入新数组）"""
+        if mass is not self._gm_source:
+            self._gm = self.G * mass
+            self._gm_source = mass
+        return self._gm
+
+    def inverse_masses(self, mass: np.ndarray) -> np.ndarray:
+        """返回 1/m 数组（质量为零处取 0）；同一个质量数组只计算一次"""
+        if mass is not self._inv_mass_source:
+            self._inv_mass = np.divide(1.0, mass, out=np.zeros_like(mass), where=mass > 0)
+            self._inv_mass_source = mass
+        return self._inv_mass
+
+    def accelerations(self, pos: np.ndarray, gm: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """按天体数选择直接求和或 Barnes-Hut 计算加速度（可写入预分配的 out）"""
+        if self.use_barnes_hut and len(pos) >= self.barnes_hut_threshold:
+            return accelerations_bh_gm(pos, gm, self.barnes_hut_theta, out=out)
+        # NumPy 实现的分块临时数组只在天体数与预分配一致时复用
+        work = self._buf.get('work') if len(pos) == self._buf_size else None
+        return accelerations_gm(pos, gm, out=out, work=work, dtype=self.dtype)
+
+    def step_arrays(self, pos: np.ndarray, vel: np.ndarray, mass: np.ndarray, dt: float):
+        """
+        在 SoA 数组上原地推进一步积分（方法由 self.integrator 决定）
+
+        Args:
+            pos: 位置数组 [N, 3]，原地更新
+            vel: 速度数组 [N, 3]，原地更新
+            mass: 质量数组 [N]
+            dt: 时间步长 (s)
+        """
+        gm = self.gravitational_parameters(mass)
+        buf = self._ensure(len(pos))
+        # 其他积分方法会改写 pos/vel，切换回来时不能复用之前缓存的加速度
+        if self.integrator != 'verlet':
+            self._acc_source = (None, None)
+        if self.integrator != 'dopri5':
+            self._dp_source = (None, None)
+        if self.integrator == 'verlet':
+            self._verlet_arrays(pos, vel, gm, dt)
+        elif self.integrator == 'dopri5':
+            self._dopri5_arrays(pos, vel, gm, dt)
+        elif self.integrator == 'euler':
+            self._euler_arrays(pos, vel, gm, dt)
+        else:
+            self._rk4_arrays(pos, vel, gm, dt)
+
+    def _euler_arrays(self, pos: np.ndarray, vel: np.ndarray, gm: np.ndarray, dt: float):
+        """半隐式欧拉：每步 1 次引力计算，加速度保留在 self._buf['acc']"""
+        buf = self._buf
+        # 覆盖了 Verlet 缓存的加速度
+        self._acc_source = (None, None)
+        acc = self.accelerations(pos, gm, out=buf['acc'])
+        step = buf['tmp']
+        np.multiply(acc, dt, out=step)
+        vel += step
+        np.multiply(vel, dt, out=step)
+        pos += step
+
+    def _rk4_arrays(self, pos: np.ndarray, vel: np.ndarray, gm: np.ndarray, dt: float):
+        """RK4：每步 4 次引力计算，中间量全部写入预分配数组"""
+        buf = self._buf
+        tmp, v2, v3 = buf['tmp'], buf['v2'], buf['v3']
+        half = 0.5 * dt
+
+        a1 = self.accelerations(pos, gm, out=buf['a1'])
+        np.multiply(vel, half, out=tmp)
+        tmp += pos
+        a2 = self.accelerations(tmp, gm, out=buf['a2'])
+        np.multiply(a1, half, out=v2)
+        v2 += vel
+        np.multiply(v2, half, out=tmp)
+        tmp += pos
+        a3 = self.accelerations(tmp, gm, out=buf['a3'])
+        np.multiply(a2, half, out=v3)
+        v3 += vel
+        np.multiply(v3, dt, out=tmp)
+        tmp += pos
+        a4 = self.accelerations(tmp, gm, out=buf['a4'])
+        # v4 = vel + dt·a3
+        np.multiply(a3, dt, out=tmp)
+        tmp += vel
+
+        # pos += (vel + 2·v2 + 2·v3 + v4)·dt/6
+        v2 += v3
+        v2 *= 2.0
+        v2 += vel
+        v2 += tmp
+        v2 *= dt / 6
+        pos += v2
+        # vel += (a1 + 2·a2 + 2·a3 + a4)·dt/6
+        a2 += a3
+        a2 *= 2.0
+        a2 += a1
+        a2 += a4
+        a2 *= dt / 6
+        vel += a2
+
+    def integrate(self, pos: np.ndarray, vel: np.ndarray, mass: np.ndarray, duration: float,
+                  rtol: float = None, atol: float = None) -> int:
+        """
+        用 Dormand-Prince 5(4) 自适应步长把 SoA 状态原地推进 duration 秒
+
+        Args:
+            pos: 位置数组 [N, 3]，原地更新
+            vel: 速度数组 [N, 3]，原地更新
+            mass: 质量数组 [N]
+            duration: 积分时长 (s)
+            rtol, atol: 本次调用的相对/绝对误差容限，缺省使用 self.rtol / self.atol（不修改引擎设置）
+
+        Returns:
+            接受的步数
+        """
+        gm = self.gravitational_parameters(mass)
+        self._ensure(len(pos))
+        return self._dopri5_arrays(pos, vel, gm, duration, rtol, atol)
+
+    def _dopri5_arrays(self, pos: np.ndarray, vel: np.ndarray, gm: np.ndarray, duration: float,
+                       rtol: float = None, atol: float = None) -> int:
+        """Dormand-Prince 5(4)：每个接受的步 6 次引力计算（FSAL），步长按嵌入误差估计自动调整
+
+        rtol / atol 缺省使用 self.rtol / self.atol。
+        """
+        n = len(pos)
+        if n == 0 or duration <= 0.0:
+            return 0
+        buf = self._buf
+        if 'dp_kx' not in buf:
+            buf['dp_kx'] = np.empty((7, n, 3))  # 各级的 dx/dt（即速度）
+            buf['dp_kv'] = np.empty((7, n, 3))  # 各级的 dv/dt（即加速度）
+            buf['dp_pos'] = np.empty((n, 3))
+            buf['dp_vel'] = np.empty((n, 3))
+        kx, kv = buf['dp_kx'], buf['dp_kv']
+        new_pos, new_vel = buf['dp_pos'], buf['dp_vel']
+        rtol = self.rtol if rtol is None else rtol
+        atol = self.atol if atol is None else atol
+
+        kx[0] = vel
+        if not (self._dp_source[0] is pos and self._dp_source[1] is gm):
+            self.accelerations(pos, gm, out=kv[0])
+
+        t = 0.0
+        h = min(self._dopri_h or duration, duration)
+        steps = 0
+        while duration - t > 1e-12 * duration:
+            h_step = min(h, duration - t)
+            for i in range(1, 7):
+                a = _DP_A[i]
+                np.multiply(kx[0], h_step * a[0], out=new_pos)
+                np.multiply(kv[0], h_step * a[0], out=new_vel)
+                for j in range(1, i):
+                    if a[j] != 0.0:
+                        new_pos += (h_step * a[j]) * kx[j]
+                        new_vel += (h_step * a[j]) * kv[j]
+                new_pos += pos
+                new_vel += vel
+                kx[i] = new_vel
+                self.accelerations(new_pos, gm, out=kv[i])
+            # 第 7 级的状态即 5 阶解 (new_pos, new_vel)
+
+            err_x = np.tensordot(_DP_E, kx, axes=1)
+            err_v = np.tensordot(_DP_E, kv, axes=1)
+            err_x *= h_step / (atol + rtol * np.maximum(np.abs(pos), np.abs(new_pos)))
+            err_v *= h_step / (atol + rtol * np.maximum(np.abs(vel), np.abs(new_vel)))
+            err = math.sqrt((np.vdot(err_x, err_x) + np.vdot(err_v, err_v)) / (6 * n))
+
+            if err <= 1.0:
+                t += h_step
+                pos[:] = new_pos
+                vel[:] = new_vel
+                kx[0] = kx[6]
+                kv[0] = kv[6]
+                steps += 1
+                factor = min(5.0, 0.9 * err ** -0.2) if err > 0.0 else 5.0
             else:
-                acceleration = np.zeros(3)
-            velocities[body_key] = acceleration
-            
-        return positions, velocities
-        
+                factor = max(0.2, 0.9 * err ** -0.2)
+            # 被积分区间末端截短的步不代表误差允许的步长，只在完整步后更新
+            if h_step == h or err > 1.0:
+                h = h_step * factor
+
+        self._dopri_h = h
+        self._dp_source = (pos, gm)
+        return steps
+
+    def _verlet_arrays(self, pos: np.ndarray, vel: np.ndarray, gm: np.ndarray, dt: float):
+        """速度 Verlet（kick-drift-kick）：辛积分，长期能量守恒好，每步只需 1 次引力计算"""
+        buf = self._buf
+        acc = buf['acc']
+        if not (self._acc_source[0] is pos and self._acc_source[1] is gm):
+            self.accelerations(pos, gm, out=acc)
+
+        kick = buf['tmp']
+        np.multiply(acc, 0.5 * dt, out=kick)
+        vel += kick
+        np.multiply(vel, dt, out=kick)
+        pos += kick
+        self.accelerations(pos, gm, out=acc)
+        np.multiply(acc, 0.5 * dt, out=kick)
+        vel += kick
+
+        self._acc_source = (pos, gm)
+
+    def verlet_integration(self, bodies: dict, dt: float):
+        """速度 Verlet 积分方法（收集为数组后整体积分，末尾加速度与合力写回各天体）"""
+        values, mass = self._integrate_bodies(bodies, dt, self._verlet_arrays)
+        self._store_accelerations(values, mass)
+
     def update_positions(self, bodies: dict, dt: float):
         """更新所有天体的位置"""
-        if self.use_rk4:
-            self.rk4_integration(bodies, dt)
-        else:
+        if self.integrator == 'verlet':
+            self.verlet_integration(bodies, dt)
+        elif self.integrator == 'dopri5':
+            self.dopri5_integration(bodies, dt)
+        elif self.integrator == 'euler':
             self.euler_integration(bodies, dt)
+        else:
+            self.rk4_integration(bodies, dt)
             
         # 处理碰撞
         self.handle_collisions(bodies)
+
+    def attach(self, bodies: dict) -> 'AttachedSystem':
+        """把天体字典绑定到 SoA 表并返回积分句柄：之后的每一步直接在连续数组上推进，
+        不再逐步收集与回写天体属性（适合对同一组天体连续积分多步）"""
+        return AttachedSystem(self, bodies)
         
-    def handle_collisions(self, bodies: dict):
-        """处理天体间的碰撞"""
-        for i, body_key_1 in enumerate(bodies):
-            for j, body_key_2 in enumerate(bodies):
-                if i >= j:
-                    continue  # 跳过重复的对
-                if bodies[body_key_1].is_collision_with(bodies[body_key_2]):
-                    # 合并两个天体
-                    bodies[body_key_1].merge_with(bodies[body_key_2])
-                    # 移除被合并的天体
-                    del bodies[body_key_2]
-                    break
+    def handle_collisions(self, bodies: dict, table: BodyTable = None):
+        """处理天体间的碰撞
+
+        一次找出全部接触的天体对，再从小编号起单遍合并：被吞并的天体记入掩码，
+        不再参与后续合并，最后统一从字典中移除（成员变化后 SoA 表整体重建一次）。
+        若给出与 bodies 同步的 SoA 表则直接使用其数组。
+        """
+        if len(bodies) < 2:
+            return
+        if table is not None:
+            keys, body_list = table.keys, table.bodies
+            pos, radius = table.pos, table.radius
+        else:
+            keys, body_list = list(bodies.keys()), list(bodies.values())
+            pos = np.array([body.position for body in body_list], dtype=np.float64)
+            radius = np.fromiter((body.radius for body in body_list), dtype=np.float64, count=len(body_list))
+
+        pairs = find_collision_pairs(pos, radius)
+        if not len(pairs):
+            return
+        merged = np.zeros(len(body_list), dtype=bool)
+        for i, j in pairs.tolist():
+            if merged[i] or merged[j]:
+                continue
+            # 合并两个天体
+            body_list[i].merge_with(body_list[j])
+            merged[j] = True
+
+        # 移除被合并的天体
+        for j in np.flatnonzero(merged).tolist():
+            del bodies[keys[j]]
                     
+    @staticmethod
+    def _gather_arrays(bodies: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """将天体字典收集为 pos [N,3]、vel [N,3]、mass [N] 数组（副本）"""
+        values = bodies.values()
+        pos = np.array([body.position for body in values], dtype=np.float64).reshape(-1, 3)
+        vel = np.array([body.velocity for body in values], dtype=np.float64).reshape(-1, 3)
+        mass = np.fromiter((body.mass for body in values), dtype=np.float64, count=len(bodies))
+        return pos, vel, mass
+
     def calculate_system_energy(self, bodies: dict) -> float:
         """计算系统的总能量"""
-        total_kinetic = 0.0
-        total_potential = 0.0
-        
-        # 计算总动能
-        for body in bodies.values():
-            total_kinetic += body.get_kinetic_energy()
-            
-        # 计算总势能
-        for body_key_1, body_1 in bodies.items():
-            for body_key_2, body_2 in bodies.items():
-                if body_key_1 >= body_key_2:
-                    continue  # 跳过重复的对
-                distance = np.linalg.norm(body_1.position - body_2.position)
-                if distance > 0:
-                    total_potential -= self.G * body_1.mass * body_2.mass / distance
-        return total_kinetic + total_potential
+        if not bodies:
+            return 0.0
+        return self.system_energy_arrays(*self._gather_arrays(bodies))
+
+    def system_energy_arrays(self, pos: np.ndarray, vel: np.ndarray, mass: np.ndarray) -> float:
+        """由 SoA 数组计算系统总能量：势能取自引力核顺带求出的引力势，与一次加速度计算同遍完成"""
+        n = len(mass)
+        phi = np.empty(n)
+        # 加速度只是顺带结果：写入预分配的临时数组（NumPy 实现同时复用分块临时数组）
+        buf = self._ensure(n)
+        accelerations_gm(pos, self.G * mass, out=buf['tmp'], work=buf.get('work'), phi=phi)
+        kinetic = 0.5 * np.dot(mass, np.einsum('ij,ij->i', vel, vel))
+        # 每对天体在 phi_i 与 phi_j 中各计入一次
+        potential = 0.5 * np.dot(mass, phi)
+        return float(kinetic + potential)
     
     def calculate_angular_momentum(self, bodies: dict) -> np.ndarray:
         """计算系统的总角动量"""
-        total_angular_momentum = np.zeros(3, dtype=np.float64)
-        
-        for body in bodies.values():
-            angular_momentum = np.cross(body.position, body.mass * body.velocity)
-            total_angular_momentum += angular_momentum
-            
-        return total_angular_momentum
+        pos, vel, mass = self._gather_arrays(bodies)
+        return self.angular_momentum_arrays(pos, vel, mass)
+
+    @staticmethod
+    def angular_momentum_arrays(pos: np.ndarray, vel: np.ndarray, mass: np.ndarray) -> np.ndarray:
+        """由 SoA 数组计算系统总角动量 L = Σ r × (m v)"""
+        return np.cross(pos, mass[:, None] * vel).sum(axis=0)
         
     def find_center_of_mass(self, bodies: dict) -> np.ndarray:
         """计算系统的质心"""
-        total_mass = sum(body.mass for body in bodies.values())
-        if total_mass == 0:
-            return np.zeros(3)
-            
-        center_of_mass = np.zeros(3, dtype=np.float64)
-        for body in bodies.values():
-            center_of_mass += body.mass * body.position
-            
-        return center_of_mass / total_mass
+        pos, _, mass = self._gather_arrays(bodies)
+        return self.mass_weighted_mean(pos, mass)
         
     def find_center_of_mass_velocity(self, bodies: dict) -> np.ndarray:
         """计算系统的质心速度"""
-        total_mass = sum(body.mass for body in bodies.values())
+        _, vel, mass = self._gather_arrays(bodies)
+        return self.mass_weighted_mean(vel, mass)
+
+    @staticmethod
+    def mass_weighted_mean(values: np.ndarray, mass: np.ndarray) -> np.ndarray:
+        """按质量加权平均 [N,3] 数组（质心位置或质心速度），总质量为零时返回零向量"""
+        total_mass = mass.sum()
         if total_mass == 0:
             return np.zeros(3)
-            
-        center_of_mass_velocity = np.zeros(3, dtype=np.float64)
-        for body in bodies.values():
-            center_of_mass_velocity += body.mass * body.velocity
-            
-        return center_of_mass_velocity / total_mass
+        return mass @ values / total_mass
         
     def apply_correction(self, bodies: dict):
         """应用数值修正（能量和角动量守恒）"""
-        # 将系统质心移到原点
-        com = self.find_center_of_mass(bodies)
+        pos, vel, mass = self._gather_arrays(bodies)
+        com = self.mass_weighted_mean(pos, mass)
+        com_velocity = self.mass_weighted_mean(vel, mass)
+        # 原地修改，保持天体与 SoA 表之间的视图绑定
         for body in bodies.values():
             body.position -= com
-            
-        # 将系统质心速度设为零
-        com_velocity = self.find_center_of_mass_velocity(bodies)
-        for body in bodies.values():
             body.velocity -= com_velocity
+
+    def apply_correction_arrays(self, pos: np.ndarray, vel: np.ndarray, mass: np.ndarray):
+        """在 SoA 数组上原地应用数值修正：将质心移到原点并令质心速度为零"""
+        pos -= self.mass_weighted_mean(pos, mass)
+        vel -= self.mass_weighted_mean(vel, mass)
             
+
+class AttachedSystem:
+    """绑定到天体字典的积分句柄
+
+    构建时由字典建立 BodyTable，各天体的 position/velocity 成为表中数组的行视图，
+    因此 step 在数组上原地积分的结果直接反映到天体上，无需回写。
+    碰撞合并或外部增删天体使成员变化时，下一次 step 开始时重建表。
+    """
+
+    def __init__(self, engine: GravityEngine, bodies: dict):
+        self.engine = engine
+        self.bodies = bodies
+        self.table = BodyTable.from_bodies(bodies)
+
+    def step(self, dt: float, steps: int = 1):
+        """以步长 dt 推进 steps 步（积分方法由引擎的 integrator 决定），随后处理碰撞"""
+        if not self.table.matches(self.bodies):
+            self.table = BodyTable.from_bodies(self.bodies)
+        table = self.table
+        step_arrays = self.engine.step_arrays
+        for _ in range(steps):
+            step_arrays(table.pos, table.vel, table.mass, dt)
+        self.engine.handle_collisions(self.bodies, table)
+
+
 class OrbitalMechanics:
     """轨道力学工具类"""
     
     @staticmethod
     def calculate_orbital_velocity(central_mass: float, orbital_radius: float) -> float:
         """计算圆形轨道速度"""
-        G = 6.67430e-11
-        return math.sqrt(G * central_mass / orbital_radius)
+        return math.sqrt(G_CONST * central_mass / orbital_radius)
         
     @staticmethod
     def calculate_escape_velocity(central_mass: float, distance: float) -> float:
         """计算逃逸速度"""
-        G = 6.67430e-11
-        return math.sqrt(2 * G * central_mass / distance)
+        return math.sqrt(2 * G_CONST * central_mass / distance)
         
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def calculate_orbital_period(central_mass: float, semi_major_axis: float) -> float:
-        """计算轨道周期（开普勒第三定律）"""
-        G = 6.67430e-11
-        return 2 * math.pi * math.sqrt(semi_major_axis**3 / (G * central_mass))
+        """计算轨道周期（开普勒第三定律；相同参数的重复查询走缓存）"""
+        return 2 * math.pi * math.sqrt(semi_major_axis * semi_major_axis * semi_major_axis / (G_CONST * central_mass))
         
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def calculate_hohmann_transfer_delta_v(central_mass: float, r1: float, r2: float) -> Tuple[float, float]:
-        """计算霍曼转移所需的速度变化"""
-        G = 6.67430e-11
-        
-        # 初始轨道速度
-        v1 = math.sqrt(G * central_mass / r1)
+        """计算霍曼转移所需的速度变化（相同参数的重复查询走缓存）"""
+        gm = G_CONST * central_mass
         
-        # 最终轨道速度
-        v2 = math.sqrt(G * central_mass / r2)
+        # 初始轨道速度与最终轨道速度
+        v1 = math.sqrt(gm / r1)
+        v2 = math.sqrt(gm / r2)
         
-        # 转移轨道半长轴
-        a_transfer = (r1 + r2) / 2
+        # 转移轨道半长轴的倒数（vis-viva 公式中只用到 1/a）
+        inv_a_transfer = 2.0 / (r1 + r2)
         
         # 转移轨道在近地点和远地点的速度
-        v_transfer_periapsis = math.sqrt(G * central_mass * (2/r1 - 1/a_transfer))
-        v_transfer_apoapsis = math.sqrt(G * central_mass * (2/r2 - 1/a_transfer))
+        v_transfer_periapsis = math.sqrt(gm * (2/r1 - inv_a_transfer))
+        v_transfer_apoapsis = math.sqrt(gm * (2/r2 - inv_a_transfer))
         
         # 两次速度变化
         delta_v1 = v_transfer_periapsis - v1
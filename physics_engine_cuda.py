@@ -0,0 +1,178 @@
+"""
+CUDA引力计算后端
+基于PyCUDA，天体数据常驻显存，在GPU上完成引力计算与积分
+"""
+
+import numpy as np
+
+# PyCUDA 为可选依赖：导入失败或没有可用的 CUDA 设备时不启用该后端
+try:
+    import pycuda.autoinit  # noqa: F401  初始化 CUDA 上下文
+    import pycuda.gpuarray as gpuarray
+    from pycuda.compiler import SourceModule
+    CUDA_AVAILABLE = True
+except Exception:
+    CUDA_AVAILABLE = False
+
+# 每个线程块的线程数，同时是每次载入共享内存的天体块大小
+BLOCK_SIZE = 256
+
+# 分块共享内存核（GPU Gems 3 第 31 章）：每个线程负责一个目标天体 i，
+# 线程块每次协作把 BLOCK 个施力天体 j 载入共享内存，块内所有线程复用这一块数据后再载入下一块，
+# 全局内存读取量从 N² 降为 N²/BLOCK
+_KERNEL_SOURCE = r"""
+#define BLOCK %(block)d
+
+__global__ void pair_accel(const double *pos, const double *gm, const double eps2,
+                           const int n, double *acc)
+{
+    __shared__ double sx[BLOCK];
+    __shared__ double sy[BLOCK];
+    __shared__ double sz[BLOCK];
+    __shared__ double sgm[BLOCK];
+
+    const int tid = threadIdx.x;
+    const int i = blockIdx.x * BLOCK + tid;
+    double xi = 0.0;
+    double yi = 0.0;
+    double zi = 0.0;
+    if (i < n) {
+        xi = pos[3 * i];
+        yi = pos[3 * i + 1];
+        zi = pos[3 * i + 2];
+    }
+
+    double ax = 0.0;
+    double ay = 0.0;
+    double az = 0.0;
+    for (int tile = 0; tile < n; tile += BLOCK) {
+        // 越界的 i 也参与载入与同步；末尾不足一块的部分以 G·m = 0 填充
+        const int j = tile + tid;
+        if (j < n) {
+            sx[tid] = pos[3 * j];
+            sy[tid] = pos[3 * j + 1];
+            sz[tid] = pos[3 * j + 2];
+            sgm[tid] = gm[j];
+        } else {
+            sx[tid] = 0.0;
+            sy[tid] = 0.0;
+            sz[tid] = 0.0;
+            sgm[tid] = 0.0;
+        }
+        __syncthreads();
+
+        #pragma unroll 8
+        for (int k = 0; k < BLOCK; ++k) {
+            const double dx = sx[k] - xi;
+            const double dy = sy[k] - yi;
+            const double dz = sz[k] - zi;
+            const double r2 = dx * dx + dy * dy + dz * dz + eps2;
+            // 自身及位置重合的天体 r2 = 0，不产生作用
+            const double r1i = r2 > 0.0 ? rsqrt(r2) : 0.0;
+            const double mr3i = sgm[k] * r1i * r1i * r1i;
+            ax += dx * mr3i;
+            ay += dy * mr3i;
+            az += dz * mr3i;
+        }
+        __syncthreads();
+    }
+
+    if (i < n) {
+        acc[3 * i] = ax;
+        acc[3 * i + 1] = ay;
+        acc[3 * i + 2] = az;
+    }
+}
+"""
+
+
+class CudaGravityEngine:
+    """CUDA引力引擎 - 位置、速度和质量常驻显存，跨帧复用"""
+
+    # GPU 上实现的积分方法（与 GravityEngine.integrator 同名）；其余方法由调用方退回 CPU
+    INTEGRATORS = ('verlet', 'rk4')
+
+    def __init__(self, G: float = 6.67430e-11, eps2: float = 0.0, block_size: int = BLOCK_SIZE):
+        if not CUDA_AVAILABLE:
+            raise RuntimeError("PyCUDA 不可用，无法启用 CUDA 加速")
+
+        self.G = G
+        self.eps2 = eps2
+        self.block_size = block_size
+        module = SourceModule(_KERNEL_SOURCE % {'block': block_size})
+        self._kernel = module.get_function('pair_accel')
+
+        # 显存中的天体状态
+        self._pos = None
+        self._vel = None
+        self._gm = None  # G·m，上传时预先乘好引力常数
+        # RK4 四个阶段的加速度缓冲区，随天体状态一起分配，跨步复用；
+        # Verlet 用第一个缓冲区保存上一步末尾的加速度
+        self._acc = None
+        self._acc_valid = False  # _acc[0] 是否为当前位置处的加速度（Verlet 可直接复用）
+
+    def upload(self, pos: np.ndarray, vel: np.ndarray, mass: np.ndarray):
+        """上传天体状态到显存（仅在天体成员变化时调用）"""
+        self._pos = gpuarray.to_gpu(np.ascontiguousarray(pos, dtype=np.float64))
+        self._vel = gpuarray.to_gpu(np.ascontiguousarray(vel, dtype=np.float64))
+        self._gm = gpuarray.to_gpu(np.ascontiguousarray(self.G * mass, dtype=np.float64))
+        self._acc = [gpuarray.empty_like(self._pos) for _ in range(4)]
+        self._acc_valid = False
+
+    def download(self, pos: np.ndarray, vel: np.ndarray):
+        """将显存中的位置和速度写回主机数组"""
+        self._pos.get(pos)
+        self._vel.get(vel)
+
+    def accelerations(self, pos_gpu, out=None) -> 'gpuarray.GPUArray':
+        """在 GPU 上计算所有天体的引力加速度（可写入预分配的 out）"""
+        n = pos_gpu.shape[0]
+        if out is None:
+            out = gpuarray.empty_like(pos_gpu)
+        grid = ((n + self.block_size - 1) // self.block_size, 1)
+        self._kernel(pos_gpu.gpudata, self._gm.gpudata, np.float64(self.eps2),
+                     np.int32(n), out.gpudata,
+                     block=(self.block_size, 1, 1), grid=grid)
+        return out
+
+    def step(self, dt: float, integrator: str = 'rk4'):
+        """在显存中原地推进一步积分（integrator 取 INTEGRATORS 之一）"""
+        if self._pos is None or self._pos.shape[0] == 0:
+            return
+        if integrator == 'verlet':
+            self._step_verlet(dt)
+        elif integrator == 'rk4':
+            self._step_rk4(dt)
+        else:
+            raise ValueError(f"CUDA 后端不支持积分方法: {integrator}")
+
+    def _step_verlet(self, dt: float):
+        """速度 Verlet（kick-drift-kick）：复用上一步末尾的加速度，每步只需 1 次引力计算"""
+        pos = self._pos
+        vel = self._vel
+        acc = self._acc[0]
+        if not self._acc_valid:
+            self.accelerations(pos, acc)
+        vel += (0.5 * dt) * acc
+        pos += dt * vel
+        self.accelerations(pos, acc)
+        vel += (0.5 * dt) * acc
+        self._acc_valid = True
+
+    def _step_rk4(self, dt: float):
+        """RK4：每步 4 次引力计算"""
+        # 各阶段会改写 _acc[0]，之后的 Verlet 步需重新计算加速度
+        self._acc_valid = False
+        pos = self._pos
+        vel = self._vel
+        k1, k2, k3, k4 = self._acc
+        a1 = self.accelerations(pos, k1)
+        a2 = self.accelerations(pos + (0.5 * dt) * vel, k2)
+        v2 = vel + (0.5 * dt) * a1
+        a3 = self.accelerations(pos + (0.5 * dt) * v2, k3)
+        v3 = vel + (0.5 * dt) * a2
+        a4 = self.accelerations(pos + dt * v3, k4)
+        v4 = vel + dt * a3
+
+        pos += (vel + 2 * v2 + 2 * v3 + v4) * (dt / 6)
+        vel += (a1 + 2 * a2 + 2 * a3 + a4) * (dt / 6)
@@ -6,13 +6,623 @@ OpenGL渲染器
 import numpy as np
 import math
 from OpenGL.GL import *
+from OpenGL.GL import shaders
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 import pygame
 from pygame.locals import *
 from PIL import Image
 import io
-from config import RENDER_SCALE
+import ctypes
+import zlib
+import logging
+from config import RENDER_SCALE, STAR_COUNT, DEBUG_MODE
+from physics_engine import BODY_TYPE_CODES
+
+logger = logging.getLogger(__name__)
+
+# 实例化球体着色器（GLSL 1.20 兼容模式，沿用固定管线的矩阵与 LIGHT0）
+_SPHERE_VERTEX_SHADER = """
+#version 120
+attribute vec3 vertex;
+attribute vec4 instance_center_radius;
+attribute vec4 instance_color;
+varying vec3 v_normal;
+varying vec3 v_eye_pos;
+varying vec4 v_color;
+void main()
+{
+    vec4 world = vec4(instance_center_radius.xyz + vertex * instance_center_radius.w, 1.0);
+    vec4 eye = gl_ModelViewMatrix * world;
+    v_eye_pos = eye.xyz;
+    v_normal = gl_NormalMatrix * vertex;
+    v_color = instance_color;
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+_SPHERE_FRAGMENT_SHADER = """
+#version 120
+varying vec3 v_normal;
+varying vec3 v_eye_pos;
+varying vec4 v_color;
+void main()
+{
+    // instance_color.a 为自发光标志（恒星），否则按点光源做漫反射
+    if (v_color.a > 0.5) {
+        gl_FragColor = vec4(v_color.rgb, 1.0);
+        return;
+    }
+    vec3 n = normalize(v_normal);
+    vec3 l = normalize(gl_LightSource[0].position.xyz - v_eye_pos);
+    float diffuse = max(dot(n, l), 0.0);
+    gl_FragColor = vec4(v_color.rgb * (0.2 + 0.8 * diffuse), 1.0);
+}
+"""
+
+# 球体替身（impostor）着色器：屏幕上只占几个像素的球体画成一个朝向相机的四边形，
+# 由片元着色器按四边形内的坐标还原球面法线并计算光照
+_IMPOSTOR_VERTEX_SHADER = """
+#version 120
+attribute vec2 corner;
+attribute vec4 instance_center_radius;
+attribute vec4 instance_color;
+varying vec2 v_uv;
+varying vec3 v_eye_center;
+varying float v_radius;
+varying vec4 v_color;
+void main()
+{
+    vec4 eye = gl_ModelViewMatrix * vec4(instance_center_radius.xyz, 1.0);
+    v_eye_center = eye.xyz;
+    v_radius = instance_center_radius.w;
+    v_uv = corner;
+    v_color = instance_color;
+    eye.xy += corner * instance_center_radius.w;
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+_IMPOSTOR_FRAGMENT_SHADER = """
+#version 120
+varying vec2 v_uv;
+varying vec3 v_eye_center;
+varying float v_radius;
+varying vec4 v_color;
+void main()
+{
+    float d2 = dot(v_uv, v_uv);
+    if (d2 > 1.0) {
+        discard;
+    }
+    if (v_color.a > 0.5) {
+        gl_FragColor = vec4(v_color.rgb, 1.0);
+        return;
+    }
+    vec3 n = vec3(v_uv, sqrt(1.0 - d2));
+    vec3 l = normalize(gl_LightSource[0].position.xyz - (v_eye_center + n * v_radius));
+    float diffuse = max(dot(n, l), 0.0);
+    gl_FragColor = vec4(v_color.rgb * (0.2 + 0.8 * diffuse), 1.0);
+}
+"""
+
+# 拾取着色器：每个实例输出 gl_InstanceID + 1 编码成的 RGB（0 表示未命中）
+_PICK_VERTEX_SHADER = """
+#version 120
+#extension GL_ARB_draw_instanced : require
+attribute vec3 vertex;
+attribute vec4 instance_center_radius;
+varying vec4 v_id;
+void main()
+{
+    float id = float(gl_InstanceIDARB + 1);
+    v_id = vec4(mod(id, 256.0), mod(floor(id / 256.0), 256.0), floor(id / 65536.0), 255.0) / 255.0;
+    vec4 world = vec4(instance_center_radius.xyz + vertex * instance_center_radius.w, 1.0);
+    gl_Position = gl_ProjectionMatrix * (gl_ModelViewMatrix * world);
+}
+"""
+
+_PICK_FRAGMENT_SHADER = """
+#version 120
+varying vec4 v_id;
+void main()
+{
+    gl_FragColor = v_id;
+}
+"""
+
+
+def look_at_matrix(eye: np.ndarray, target: np.ndarray, up: np.ndarray) -> np.ndarray:
+    """与 gluLookAt 等价的视图矩阵（4×4，按列向量右乘：clip = M @ v）"""
+    f = np.asarray(target, dtype=np.float64) - eye
+    f /= np.linalg.norm(f)
+    s = np.cross(f, up)
+    s /= np.linalg.norm(s)
+    u = np.cross(s, f)
+    m = np.identity(4)
+    m[0, :3] = s
+    m[1, :3] = u
+    m[2, :3] = -f
+    m[:3, 3] = -m[:3, :3] @ eye
+    return m
+
+
+def perspective_matrix(fovy: float, aspect: float, z_near: float, z_far: float) -> np.ndarray:
+    """与 gluPerspective 等价的投影矩阵（4×4，fovy 单位为度）"""
+    f = 1.0 / math.tan(math.radians(fovy) / 2.0)
+    m = np.zeros((4, 4))
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (z_far + z_near) / (z_near - z_far)
+    m[2, 3] = 2.0 * z_far * z_near / (z_near - z_far)
+    m[3, 2] = -1.0
+    return m
+
+
+def orbit_direction(rotation) -> np.ndarray:
+    """环绕相机从目标指向相机的单位向量，rotation 为 [俯仰, 偏航]（度）"""
+    phi = math.radians(rotation[0])  # 垂直旋转
+    theta = math.radians(rotation[1])  # 水平旋转
+    cos_phi = math.cos(phi)
+    return np.array([cos_phi * math.sin(theta), math.sin(phi), cos_phi * math.cos(theta)])
+
+
+def frustum_planes(view_proj: np.ndarray) -> np.ndarray:
+    """由视图投影矩阵提取视锥体六个平面（Gribb–Hartmann），返回 [6, 4]
+
+    每行 (a, b, c, d) 已按法线长度归一化，法线指向视锥体内部：a·x + b·y + c·z + d 即点到平面的有向距离。
+    顺序为左、右、下、上、近、远。
+    """
+    m = view_proj
+    planes = np.array([m[3] + m[0], m[3] - m[0],
+                       m[3] + m[1], m[3] - m[1],
+                       m[3] + m[2], m[3] - m[2]], dtype=np.float64)
+    planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+    return planes
+
+
+def pick_matrix(x: float, y: float, viewport: tuple) -> np.ndarray:
+    """与 gluPickMatrix(x, y, 1, 1, viewport) 等价：把窗口像素 (x, y) 处的 1×1 区域放大到整个裁剪空间"""
+    m = np.identity(4)
+    m[0, 0] = viewport[2]
+    m[1, 1] = viewport[3]
+    m[0, 3] = viewport[2] - 2.0 * (x - viewport[0])
+    m[1, 3] = viewport[3] - 2.0 * (y - viewport[1])
+    return m
+
+
+def build_asteroid_shapes(variants: int = 16, seed: int = 0) -> np.ndarray:
+    """生成若干个不规则小行星单位网格（顶点半径随机扰动的二十面体）
+
+    返回 [variants * 60, 6] float32：每个变体 20 个三角形，逐顶点 (x, y, z, nx, ny, nz)，法线取面法线；
+    固定种子保证每次生成相同形状。
+    """
+    g = (1.0 + math.sqrt(5.0)) / 2.0
+    ico = np.array([(-1, g, 0), (1, g, 0), (-1, -g, 0), (1, -g, 0),
+                    (0, -1, g), (0, 1, g), (0, -1, -g), (0, 1, -g),
+                    (g, 0, -1), (g, 0, 1), (-g, 0, -1), (-g, 0, 1)], dtype=np.float64)
+    ico /= np.linalg.norm(ico, axis=1)[:, None]
+    faces = np.array([(0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+                      (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+                      (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+                      (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)])
+
+    rng = np.random.default_rng(seed)
+    # 半径扰动范围与原先的随机形状相同（0.8 ~ 1.2 倍）
+    scale = 0.8 + 0.4 * rng.random((variants, len(ico)))
+    tris = (ico[None, :, :] * scale[:, :, None])[:, faces]
+    normals = np.cross(tris[:, :, 1] - tris[:, :, 0], tris[:, :, 2] - tris[:, :, 0])
+    normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+
+    out = np.empty((variants, len(faces), 3, 6), dtype=np.float32)
+    out[..., :3] = tris
+    out[..., 3:] = normals[:, :, None, :]
+    return out.reshape(-1, 6)
+
+
+def build_glow_sprite(size: int = 128, sigma: float = 0.35, peak: float = 0.6) -> np.ndarray:
+    """生成径向高斯光晕贴图 [size, size, 4] uint8：RGB 为白色（由 glColor 调制），alpha 随半径高斯衰减
+
+    sigma 以贴图半宽为单位；alpha 减去边缘值后截断，使四边形边缘完全透明。
+    """
+    c = (np.arange(size, dtype=np.float64) + 0.5) / size * 2.0 - 1.0
+    r2 = c[:, None] ** 2 + c[None, :] ** 2
+    edge = math.exp(-1.0 / (2.0 * sigma * sigma))
+    alpha = np.clip((np.exp(-r2 / (2.0 * sigma * sigma)) - edge) / (1.0 - edge), 0.0, 1.0) * peak
+    sprite = np.full((size, size, 4), 255, dtype=np.uint8)
+    sprite[..., 3] = np.round(alpha * 255.0)
+    return sprite
+
+
+# 星空方向向量以 int16 定点数上传（单位向量乘以该值），每颗星 4 个分量（第 4 个为对齐填充），
+# 每颗 8 字节；绘制时在模型视图矩阵中除回该值
+STAR_FIELD_FIXED_SCALE = 32767.0
+STAR_FIELD_STRIDE = 8
+
+# 光晕四边形的纹理坐标（与 render_glow 中四个角的顺序一致）
+_GLOW_TEXCOORDS = np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)], dtype=np.float32)
+
+# 每个实例 8 个 float32：center_xyz, radius, color_rgb, emissive
+INSTANCE_FLOATS = 8
+INSTANCE_STRIDE = INSTANCE_FLOATS * 4
+# 持久映射实例缓冲区的环段数（三重缓冲，CPU 写入与 GPU 读取互不等待）
+INSTANCE_RING_SIZE = 3
+
+
+def _gl_vec4(r: float, g: float, b: float, a: float = 1.0):
+    """预先构造的 GLfloat[4]，传给 glMaterialfv 时无需每次把 Python 列表转换为 C 数组"""
+    return (GLfloat * 4)(r, g, b, a)
+
+
+_BLACK = _gl_vec4(0.0, 0.0, 0.0)
+
+# 各类天体与颜色无关的材质参数：emission 为 None 表示自发光颜色取天体颜色；
+# diffuse_factor 为漫反射颜色相对天体颜色的亮度系数
+MATERIALS = {
+    'star': {'ambient': _BLACK, 'specular': _BLACK, 'shininess': None, 'emission': None, 'diffuse_factor': 0.0},
+    'planet': {'ambient': _gl_vec4(0.2, 0.2, 0.2), 'specular': _gl_vec4(0.5, 0.5, 0.5), 'shininess': 30.0,
+               'emission': _BLACK, 'diffuse_factor': 1.0},
+    'moon': {'ambient': _gl_vec4(0.1, 0.1, 0.1), 'specular': _gl_vec4(0.1, 0.1, 0.1), 'shininess': 10.0,
+             'emission': _BLACK, 'diffuse_factor': 0.8},
+    'asteroid': {'ambient': _gl_vec4(0.3, 0.2, 0.1), 'specular': _BLACK, 'shininess': 0.0,
+                 'emission': _BLACK, 'diffuse_factor': 1.0},
+}
+
+
+class SphereInstancedBatch:
+    """实例化球体批次 - 单位球网格只上传一次，所有天体用一次实例化绘制调用完成
+
+    每个实例的数据为 (center_xyz, radius) 和 (color_rgb, emissive)，
+    通过 begin 取得可写视图、填入后调用 draw。
+    GL 对象在首次绘制时才创建（需要有效的 OpenGL 上下文），
+    驱动不支持着色器/实例化时 available 为 False，由调用方退回逐个绘制。
+    """
+
+    def __init__(self, segments: int = 32):
+        self.segments = segments
+        self.available = None  # None 表示尚未尝试初始化
+        self.program = None
+        self.mesh_vbo = None
+        self.index_vbo = None
+        self.instance_vbo = None
+        self.index_count = 0
+        self.instance_capacity = 0
+        # 持久映射（GL 4.4 glBufferStorage）的三重缓冲环与每段的栅栏
+        self.persistent = True
+        self._mapped = None
+        self._staging = None
+        self._fences = [None] * INSTANCE_RING_SIZE
+        self._slot = 0
+        self._pending_upload = False
+        # 上一次绘制的实例数（及其中用完整网格绘制的前若干个），暂停时可直接重绘而不重新填充
+        self.last_count = 0
+        self.last_mesh_count = 0
+        # 替身四边形（顶点为四个角的 [-1, 1] 坐标）；着色器编译失败时全部用网格绘制
+        self.impostor_program = None
+        self.impostor_vbo = None
+        # 颜色 ID 拾取：1×1 离屏帧缓冲与拾取着色器（首次拾取时创建）
+        self.pick_available = None
+        self.pick_program = None
+        self.pick_fbo = None
+
+    @staticmethod
+    def build_sphere_mesh(segments: int) -> tuple:
+        """生成单位球的顶点（兼作法线）与三角形索引"""
+        lat = np.linspace(0.0, math.pi, segments + 1)
+        lon = np.linspace(0.0, 2.0 * math.pi, segments + 1)
+        sin_lat, cos_lat = np.sin(lat)[:, None], np.cos(lat)[:, None]
+        vertices = np.empty((segments + 1, segments + 1, 3), dtype=np.float32)
+        vertices[..., 0] = sin_lat * np.cos(lon)[None, :]
+        vertices[..., 1] = cos_lat
+        vertices[..., 2] = sin_lat * np.sin(lon)[None, :]
+
+        row = np.arange(segments)[:, None] * (segments + 1)
+        col = np.arange(segments)[None, :]
+        a = (row + col).ravel()
+        b = a + segments + 1
+        indices = np.stack([a, b, a + 1, a + 1, b, b + 1], axis=1).astype(np.uint32)
+        return vertices.reshape(-1, 3), indices.ravel()
+
+    @staticmethod
+    def build_sphere_strip(segments: int) -> np.ndarray:
+        """生成与 build_sphere_mesh 顶点对应的单条三角形带索引（uint16）
+
+        相邻两圈纬线之间各为一段三角形带，段与段之间重复上一段的末索引与下一段的首索引，
+        插入退化三角形把所有段连成一次 glDrawElements(GL_TRIANGLE_STRIP) 调用。
+        """
+        ring = segments + 1
+        k = np.arange(segments)
+        col = np.arange(ring)[None, :]
+        rows = np.empty((segments, 2 * ring + 2), dtype=np.uint16)
+        rows[:, 2::2] = k[:, None] * ring + col
+        rows[:, 3::2] = (k[:, None] + 1) * ring + col
+        # 每段前的退化三角形：上一段末索引（k*ring + segments）与本段首索引（两个索引，保持环绕方向不变）
+        rows[:, 0] = k * ring + segments
+        rows[:, 1] = k * ring
+        # 第一段之前没有上一段
+        return rows.ravel()[2:]
+
+    def _initialize(self):
+        """创建着色器与缓冲区，失败时标记为不可用"""
+        try:
+            self.program = shaders.compileProgram(
+                shaders.compileShader(_SPHERE_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(_SPHERE_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            )
+            self.attr_vertex = glGetAttribLocation(self.program, 'vertex')
+            self.attr_center_radius = glGetAttribLocation(self.program, 'instance_center_radius')
+            self.attr_color = glGetAttribLocation(self.program, 'instance_color')
+
+            # 与固定管线 draw_sphere 相同的单条三角形带（uint16 索引，约为三角形列表的 1/3 大小）
+            vertices, _ = self.build_sphere_mesh(self.segments)
+            indices = self.build_sphere_strip(self.segments)
+            self.index_count = indices.size
+            self.mesh_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.mesh_vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+            self.index_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_vbo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            self.persistent = bool(glBufferStorage) and bool(glFenceSync)
+            self._allocate_instances(64)
+            self.available = True
+        except Exception as e:
+            logger.warning("实例化渲染不可用，退回逐个绘制: %s", e)
+            self.available = False
+            return
+        self._initialize_impostors()
+
+    def _initialize_impostors(self):
+        """创建球体替身着色器与四边形顶点缓冲区，失败时所有实例都用网格绘制"""
+        try:
+            self.impostor_program = shaders.compileProgram(
+                shaders.compileShader(_IMPOSTOR_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(_IMPOSTOR_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            )
+            self.impostor_attr_corner = glGetAttribLocation(self.impostor_program, 'corner')
+            self.impostor_attr_center_radius = glGetAttribLocation(self.impostor_program, 'instance_center_radius')
+            self.impostor_attr_color = glGetAttribLocation(self.impostor_program, 'instance_color')
+            corners = np.array([[-1.0, -1.0], [1.0, -1.0], [-1.0, 1.0], [1.0, 1.0]], dtype=np.float32)
+            self.impostor_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.impostor_vbo)
+            glBufferData(GL_ARRAY_BUFFER, corners.nbytes, corners, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        except Exception as e:
+            logger.warning("球体替身不可用，全部使用网格绘制: %s", e)
+            self.impostor_program = None
+
+    def _allocate_instances(self, capacity: int):
+        """按容量分配实例缓冲区；支持时使用持久映射的三重缓冲环"""
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        if self.instance_vbo is not None:
+            if self._mapped is not None:
+                glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+                glUnmapBuffer(GL_ARRAY_BUFFER)
+                glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDeleteBuffers(1, [self.instance_vbo])
+        for fence in self._fences:
+            if fence is not None:
+                glDeleteSync(fence)
+        self._fences = [None] * INSTANCE_RING_SIZE
+        self._mapped = None
+
+        self.instance_capacity = capacity
+        self.instance_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        region_bytes = capacity * INSTANCE_STRIDE
+        if self.persistent:
+            try:
+                flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+                total_bytes = INSTANCE_RING_SIZE * region_bytes
+                glBufferStorage(GL_ARRAY_BUFFER, total_bytes, None, flags)
+                address = glMapBufferRange(GL_ARRAY_BUFFER, 0, total_bytes, flags)
+                raw = (ctypes.c_float * (total_bytes // 4)).from_address(int(address))
+                self._mapped = np.ctypeslib.as_array(raw).reshape(INSTANCE_RING_SIZE, capacity, INSTANCE_FLOATS)
+            except Exception as e:
+                # 不支持 GL 4.4 持久映射时退回 glBufferSubData
+                logger.warning("持久映射缓冲区不可用，改用 glBufferSubData: %s", e)
+                self.persistent = False
+                glDeleteBuffers(1, [self.instance_vbo])
+                self.instance_vbo = glGenBuffers(1)
+                glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        if not self.persistent:
+            glBufferData(GL_ARRAY_BUFFER, region_bytes, None, GL_DYNAMIC_DRAW)
+            self._staging = np.empty((capacity, INSTANCE_FLOATS), dtype=np.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def begin(self, n: int) -> np.ndarray:
+        """返回本帧可写入的 [n, 8] 实例视图：center_xyz, radius, color_rgb, emissive
+
+        持久映射时视图直接指向显存映射区（环中当前帧的那一段），写入即上传，无需驱动再拷贝一次；
+        否则返回主机暂存数组，由 draw 通过 glBufferSubData 上传。
+        GL 不可用时返回 None。
+        """
+        if self.available is None:
+            self._initialize()
+        if not self.available:
+            return None
+
+        if n > self.instance_capacity:
+            # 容量按 2 倍增长，天体数量小幅变化时无需重新分配
+            self._allocate_instances(max(n, 2 * self.instance_capacity))
+
+        self._pending_upload = True
+        if self._mapped is None:
+            return self._staging[:n]
+
+        self._slot = (self._slot + 1) % INSTANCE_RING_SIZE
+        fence = self._fences[self._slot]
+        if fence is not None:
+            # 等待 GPU 读完这一段（通常是三帧前提交的），避免覆盖正在使用的数据
+            glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, 1000000000)
+            glDeleteSync(fence)
+            self._fences[self._slot] = None
+        return self._mapped[self._slot, :n]
+
+    def draw(self, n: int, mesh_count: int = None):
+        """绘制 begin 中写入的前 n 个实例
+
+        前 mesh_count 个实例用球体网格绘制，其余的用替身四边形绘制（默认全部用网格）。
+        """
+        if not self.available or n == 0:
+            return
+        if mesh_count is None or self.impostor_program is None:
+            mesh_count = n
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        if self._mapped is None:
+            base = 0
+            # 重绘上一帧的实例（未调用 begin）时无需重新上传
+            if self._pending_upload:
+                glBufferSubData(GL_ARRAY_BUFFER, 0, n * INSTANCE_STRIDE, self._staging[:n])
+        else:
+            base = self._slot * self.instance_capacity * INSTANCE_STRIDE
+
+        if mesh_count > 0:
+            self._bind_attributes(base, self.attr_vertex, self.attr_center_radius, self.attr_color)
+            glUseProgram(self.program)
+            glDrawElementsInstanced(GL_TRIANGLE_STRIP, self.index_count, GL_UNSIGNED_SHORT, ctypes.c_void_p(0), mesh_count)
+            glUseProgram(0)
+            self._unbind_attributes(self.attr_vertex, self.attr_center_radius, self.attr_color)
+        if mesh_count < n:
+            self._draw_impostors(base + mesh_count * INSTANCE_STRIDE, n - mesh_count)
+
+        if self._mapped is not None:
+            if self._fences[self._slot] is not None:
+                glDeleteSync(self._fences[self._slot])
+            self._fences[self._slot] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self._pending_upload = False
+        self.last_count = n
+        self.last_mesh_count = mesh_count
+
+    def _draw_impostors(self, base: int, count: int):
+        """用替身四边形绘制实例缓冲区偏移 base 处开始的 count 个实例"""
+        attr_corner = self.impostor_attr_corner
+        attr_center_radius = self.impostor_attr_center_radius
+        attr_color = self.impostor_attr_color
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glEnableVertexAttribArray(attr_center_radius)
+        glVertexAttribPointer(attr_center_radius, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, ctypes.c_void_p(base))
+        glVertexAttribDivisor(attr_center_radius, 1)
+        glEnableVertexAttribArray(attr_color)
+        glVertexAttribPointer(attr_color, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, ctypes.c_void_p(base + 16))
+        glVertexAttribDivisor(attr_color, 1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.impostor_vbo)
+        glEnableVertexAttribArray(attr_corner)
+        glVertexAttribPointer(attr_corner, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+
+        glUseProgram(self.impostor_program)
+        glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count)
+        glUseProgram(0)
+
+        glVertexAttribDivisor(attr_center_radius, 0)
+        glVertexAttribDivisor(attr_color, 0)
+        glDisableVertexAttribArray(attr_corner)
+        glDisableVertexAttribArray(attr_center_radius)
+        glDisableVertexAttribArray(attr_color)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _bind_attributes(self, base: int, attr_vertex: int, attr_center_radius: int, attr_color: int = -1):
+        """绑定网格顶点与实例属性（实例数据从缓冲区偏移 base 处开始）"""
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glEnableVertexAttribArray(attr_center_radius)
+        glVertexAttribPointer(attr_center_radius, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, ctypes.c_void_p(base))
+        glVertexAttribDivisor(attr_center_radius, 1)
+        if attr_color >= 0:
+            glEnableVertexAttribArray(attr_color)
+            glVertexAttribPointer(attr_color, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, ctypes.c_void_p(base + 16))
+            glVertexAttribDivisor(attr_color, 1)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.mesh_vbo)
+        glEnableVertexAttribArray(attr_vertex)
+        glVertexAttribPointer(attr_vertex, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_vbo)
+
+    def _unbind_attributes(self, attr_vertex: int, attr_center_radius: int, attr_color: int = -1):
+        glVertexAttribDivisor(attr_center_radius, 0)
+        glDisableVertexAttribArray(attr_vertex)
+        glDisableVertexAttribArray(attr_center_radius)
+        if attr_color >= 0:
+            glVertexAttribDivisor(attr_color, 0)
+            glDisableVertexAttribArray(attr_color)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def _initialize_picking(self):
+        """创建拾取着色器与 1×1 的 RGBA8 + 深度离屏帧缓冲，失败时标记为不可用"""
+        try:
+            self.pick_program = shaders.compileProgram(
+                shaders.compileShader(_PICK_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(_PICK_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            )
+            self.pick_attr_vertex = glGetAttribLocation(self.pick_program, 'vertex')
+            self.pick_attr_center_radius = glGetAttribLocation(self.pick_program, 'instance_center_radius')
+
+            color_rb, depth_rb = glGenRenderbuffers(2)
+            glBindRenderbuffer(GL_RENDERBUFFER, color_rb)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, 1, 1)
+            glBindRenderbuffer(GL_RENDERBUFFER, depth_rb)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, 1, 1)
+            glBindRenderbuffer(GL_RENDERBUFFER, 0)
+            self.pick_fbo = glGenFramebuffers(1)
+            glBindFramebuffer(GL_FRAMEBUFFER, self.pick_fbo)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color_rb)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, depth_rb)
+            status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+            if status != GL_FRAMEBUFFER_COMPLETE:
+                raise RuntimeError(f"framebuffer incomplete: 0x{status:x}")
+            self.pick_available = True
+        except Exception as e:
+            logger.warning("GPU 拾取不可用，退回 CPU 射线检测: %s", e)
+            self.pick_available = False
+
+    def pick(self, x: int, y: int, projection: np.ndarray, viewport: tuple) -> int:
+        """返回窗口像素 (x, y)（OpenGL 坐标，原点在左下）处可见的实例序号，未命中返回 -1
+
+        用拾取矩阵把该像素放大到 1×1 离屏帧缓冲，以实例 ID 为颜色重绘上一次 draw 的实例，
+        读回一个像素即得结果，开销与天体数量无关。拾取不可用时返回 None。
+        """
+        if not self.available or self.last_count == 0:
+            return -1
+        if self.pick_available is None:
+            self._initialize_picking()
+        if not self.pick_available:
+            return None
+
+        glPushAttrib(GL_ENABLE_BIT | GL_VIEWPORT_BIT | GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadMatrixd(np.ascontiguousarray((pick_matrix(x + 0.5, y + 0.5, viewport) @ projection).T))
+        glMatrixMode(GL_MODELVIEW)
+        try:
+            glBindFramebuffer(GL_FRAMEBUFFER, self.pick_fbo)
+            glViewport(0, 0, 1, 1)
+            glDisable(GL_BLEND)
+            glEnable(GL_DEPTH_TEST)
+            glDepthMask(GL_TRUE)
+            glClearColor(0.0, 0.0, 0.0, 0.0)
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+
+            base = self._slot * self.instance_capacity * INSTANCE_STRIDE if self._mapped is not None else 0
+            self._bind_attributes(base, self.pick_attr_vertex, self.pick_attr_center_radius)
+            glUseProgram(self.pick_program)
+            glDrawElementsInstanced(GL_TRIANGLE_STRIP, self.index_count, GL_UNSIGNED_SHORT, ctypes.c_void_p(0),
+                                    self.last_count)
+            glUseProgram(0)
+            self._unbind_attributes(self.pick_attr_vertex, self.pick_attr_center_radius)
+
+            pixel = np.frombuffer(glReadPixels(0, 0, 1, 1, GL_RGBA, GL_UNSIGNED_BYTE), dtype=np.uint8)
+        finally:
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+            glPopAttrib()
+        return int(pixel[0]) + (int(pixel[1]) << 8) + (int(pixel[2]) << 16) - 1
+
 
 class OpenGLRenderer:
     """OpenGL渲染器类"""
@@ -26,6 +636,15 @@ class OpenGLRenderer:
         self.camera_pos = np.array([0.0, 0.0, 500.0])
         self.camera_target = np.array([0.0, 0.0, 0.0])
         self.camera_up = np.array([0.0, 1.0, 0.0])
+
+        # 透视参数与缓存的矩阵：由 setup_projection/setup_camera 在 CPU 端计算后载入 GL，
+        # 标签投影与拾取直接使用缓存，无需每帧 glGet* 回读
+        self.fov = 60.0
+        self.z_near = 0.1
+        self.z_far = 10000.0
+        self.view_matrix = np.identity(4)
+        self.projection_matrix = perspective_matrix(self.fov, width / height, self.z_near, self.z_far)
+        self.viewport = (0, 0, width, height)
         
         # 渲染选项
         self.show_orbits = True
@@ -39,6 +658,8 @@ class OpenGLRenderer:
         # 星空背景
         # 渲染时的动态缩放倍率（在运行时可调整，便于调试显示尺度）
         self.scale_multiplier = 1.0
+        # 物理坐标到渲染单位的总缩放，只在 change_scale 中重新计算
+        self.render_scale = RENDER_SCALE * self.scale_multiplier
 
         # 最小可见/可点击半径（渲染单位），用于确保小天体可见并且拾取一致
         self.min_display_radius = 0.3
@@ -50,55 +671,140 @@ class OpenGLRenderer:
 
         # 拾取屏幕空间回退的像素阈值
         self.pick_pixel_threshold = 20.0
+        # 屏幕半径小于该像素数的球体用替身四边形绘制，较大的仍用完整网格
+        self.impostor_pixel_radius = 6.0
 
         # star_field 存储为单位方向向量（在渲染时按照摄像机位置放置在远处）
-        self.star_field = self.generate_star_field(5000)
+        self.star_field = self.generate_star_field(STAR_COUNT)
+        # 星空静态 VBO（首次绘制时上传，star_field 改变时重新上传）；
+        # 支持时用 VAO 记录顶点指针状态，每帧只需绑定 VAO 后绘制
+        self.star_field_vbo = None
+        self.star_field_vao = None
+        self._uploaded_star_field = None
         
-        # 显示列表缓存
-        self.sphere_display_list = None
+        # 固定管线球体网格缓存：细分数 -> (顶点 VBO, 三角形带索引 IBO, 索引数)
+        self.sphere_strips = {}
+        # 小行星形状网格（首次绘制时上传）：全部变体存放在同一个 VBO 中，按天体名选择变体
+        self.asteroid_shape_variants = 16
+        # 恒星光晕贴图（首次绘制时上传）
+        self.glow_texture = None
+        # 选中高亮圆环：XY 平面单位圆的 float32 顶点（首次绘制时上传）
+        self.selection_ring_segments = 64
+        self.selection_ring_vbo = None
+        # 坐标网格线段 VBO（首次绘制时上传）
+        self.grid_vbo = None
+        self._grid_vertex_count = 0
+        self.asteroid_shape_vbo = None
+        self._asteroid_shape_vertices = 0
+        self._asteroid_variant = {}
+        # 由天体颜色得到的材质数组缓存：(颜色, 系数) -> GLfloat[4]
+        self._color_materials = {}
+        # 上一次设置的材质（类型, 颜色），相同时跳过 glMaterial 调用；每帧开始时重置
+        self._current_material = None
+        # 实例化球体批次（首次绘制时创建 GL 对象）
+        self.sphere_batch = SphereInstancedBatch()
+        # 实例序号到 SoA 表行号的映射（由 fill_sphere_instances 更新）
+        self.instance_rows = None
         glutInit()
         
     def generate_star_field(self, num_stars: int) -> np.ndarray:
         """生成星空背景"""
-        # 生成随机方向矢量并归一化，这样渲染时可将它们放到相机远处形成背景天穹
-        v = np.random.randn(num_stars, 3)
-        norms = np.linalg.norm(v, axis=1, keepdims=True)
+        # 生成随机方向矢量并归一化，这样渲染时可将它们放到相机远处形成背景天穹；
+        # 直接生成 float32（上传时再量化为 int16 定点数）
+        v = np.random.default_rng().standard_normal((num_stars, 3), dtype=np.float32)
+        norms = np.linalg.norm(v, axis=1)
         norms[norms == 0] = 1.0
-        dirs = v / norms
-        return dirs
+        v /= norms[:, None]
+        return v
         
     def setup_camera(self, distance: float, rotation: list):
         """设置相机位置和方向"""
-        # 根据旋转角度计算相机位置
-        phi = math.radians(rotation[0])  # 垂直旋转
-        theta = math.radians(rotation[1])  # 水平旋转
+        # 根据旋转角度计算相机相对于目标的偏移，再将偏移加到目标位置上
         # 在计算相机位置/视图时使用渲染缩放（包含运行时倍率）
-        scaled_distance = distance * RENDER_SCALE * self.scale_multiplier
+        scaled_distance = distance * self.render_scale
+        scaled_target = self.camera_target * self.render_scale
+        np.add(scaled_target, orbit_direction(rotation) * scaled_distance, out=self.camera_pos)
 
-        # 计算相对于目标的偏移向量，再将偏移加到目标位置上
-        offset_x = scaled_distance * math.cos(phi) * math.sin(theta)
-        offset_y = scaled_distance * math.sin(phi)
-        offset_z = scaled_distance * math.cos(phi) * math.cos(theta)
+        # 设置视图矩阵（使用已缩放的相机位置与目标），缓存后载入 GL（GL 为列主序）
+        self.view_matrix = look_at_matrix(self.camera_pos, scaled_target, self.camera_up)
+        glLoadMatrixd(np.ascontiguousarray(self.view_matrix.T))
 
-        scaled_target = self.camera_target * RENDER_SCALE * self.scale_multiplier
+    def setup_projection(self, width: int, height: int):
+        """设置并缓存透视投影矩阵"""
+        self.projection_matrix = perspective_matrix(self.fov, width / height, self.z_near, self.z_far)
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixd(np.ascontiguousarray(self.projection_matrix.T))
+        glMatrixMode(GL_MODELVIEW)
+                  
+    def display_radius(self, radius):
+        """物理半径（米，标量或 [N] 数组）转换为显示半径（渲染单位）
 
-        self.camera_pos[0] = scaled_target[0] + offset_x
-        self.camera_pos[1] = scaled_target[1] + offset_y
-        self.camera_pos[2] = scaled_target[2] + offset_z
+        use_true_radii 时按 radius_scale_multiplier 放大，结果不小于 min_display_radius；
+        所有绘制路径（逐个绘制、实例化、高亮、大气层）共用这一规则。
+        """
+        scale = self.render_scale * self.radius_scale_multiplier if self.use_true_radii else self.render_scale
+        if isinstance(radius, np.ndarray):
+            return np.maximum(radius * scale, self.min_display_radius)
+        return max(radius * scale, self.min_display_radius)
 
-        # 设置视图矩阵（使用已缩放的相机位置与目标）
-        gluLookAt(self.camera_pos[0], self.camera_pos[1], self.camera_pos[2],
-              scaled_target[0], scaled_target[1], scaled_target[2],
-              self.camera_up[0], self.camera_up[1], self.camera_up[2])
-                  
-    def render_celestial_bodies(self, bodies: dict, selected_body):
-        """渲染天体"""
-        for body_key, body in bodies.items():
+    def bounding_radius(self, radius: np.ndarray) -> np.ndarray:
+        """天体连同附加效果（光晕、大气层、选中高亮）的包围球半径（渲染单位）"""
+        return np.maximum(self.display_radius(radius) * 1.2, radius * (self.render_scale * 3.0))
+
+    def visible_mask(self, centers: np.ndarray, radii) -> np.ndarray:
+        """包围球（渲染单位，centers 为 [N, 3]）与当前视锥体相交的布尔掩码"""
+        planes = frustum_planes(self.projection_matrix @ self.view_matrix)
+        signed_dist = centers @ planes[:, :3].T.astype(centers.dtype) + planes[:, 3].astype(centers.dtype)
+        return np.all(signed_dist >= -np.reshape(radii, (-1, 1)), axis=1)
+
+    def scale_positions(self, positions: np.ndarray) -> np.ndarray:
+        """物理坐标（米，float64）转换为渲染单位
+
+        积分保持 float64，渲染端只需 float32 精度（与实例缓冲区的 GL_FLOAT 属性一致）。
+        """
+        return np.multiply(positions, self.render_scale, dtype=np.float32)
+
+    def render_celestial_bodies(self, bodies: dict, selected_body, table=None, scaled_positions=None,
+                                reuse_instances: bool = False):
+        """渲染天体
+
+        传入 SoA 表且实例化可用时，所有球形天体用一次实例化绘制完成，
+        只有光晕、小行星、大气层和选中高亮等附加效果逐个绘制。
+        scaled_positions 为本帧已缩放的 float32 渲染坐标，可由调用方复用于标签投影。
+        reuse_instances 为 True 时直接重绘上一帧的实例缓冲区（画面内容未变化，如暂停时）。
+        """
+        if table is not None and scaled_positions is None:
+            scaled_positions = self.scale_positions(table.pos)
+        if table is not None and self.sphere_batch.available is not False:
+            self.render_celestial_bodies_instanced(table, selected_body, scaled_positions, reuse_instances)
+            if self.sphere_batch.available:
+                return
+
+        # 按类型排序后逐个绘制，相邻天体的材质相同时不再重复设置
+        self._current_material = None
+        if table is not None:
+            # 直接使用 SoA 表中的坐标与半径
+            order = np.argsort(table.type_code, kind='stable')
+            body_list = [table.bodies[i] for i in order.tolist()]
+            positions = scaled_positions[order]
+            radii = table.radius[order]
+        else:
+            body_list = sorted(bodies.values(), key=lambda body: body.type)
+            positions = self.scale_positions(np.array([body.position for body in body_list],
+                                                      dtype=np.float64).reshape(-1, 3))
+            radii = np.fromiter((body.radius for body in body_list), dtype=np.float64, count=len(body_list))
+        if not body_list:
+            return
+        # 视锥体外的天体（含光晕与高亮范围）不绘制
+        visible = self.visible_mask(positions, self.bounding_radius(radii))
+        # 坐标一次性转换为 Python 浮点数，循环内无需逐分量 float()
+        for body, scaled_pos, in_view in zip(body_list, positions.tolist(), visible.tolist()):
+            if not in_view:
+                continue
             glPushMatrix()
             
             # 移动到天体位置
-            scaled_pos = body.position * RENDER_SCALE * self.scale_multiplier
-            glTranslatef(float(scaled_pos[0]), float(scaled_pos[1]), float(scaled_pos[2]))
+            glTranslatef(*scaled_pos)
             
             # 设置颜色
             glColor3f(*body.color)
@@ -122,38 +828,101 @@ class OpenGLRenderer:
                 
             glPopMatrix()
             
+    def render_celestial_bodies_instanced(self, table, selected_body, scaled_pos: np.ndarray,
+                                          reuse_instances: bool = False):
+        """用 SoA 表批量绘制天体（scaled_pos 为 float32 渲染坐标）"""
+        n = len(table)
+        if n == 0:
+            return
+
+        types = table.type_code
+        is_star = types == BODY_TYPE_CODES['star']
+        visible = self.visible_mask(scaled_pos, self.bounding_radius(table.radius))
+        if reuse_instances and self.sphere_batch.available:
+            self.sphere_batch.draw(self.sphere_batch.last_count, self.sphere_batch.last_mesh_count)
+        else:
+            self.fill_sphere_instances(table, types, is_star, scaled_pos, visible)
+        if not self.sphere_batch.available:
+            return
+
+        # 附加效果仍按天体逐个绘制
+        self._current_material = None
+        rows = np.flatnonzero(visible)
+        for i, pos in zip(rows.tolist(), scaled_pos[rows].tolist()):
+            body = table.bodies[i]
+            needs_glow = is_star[i]
+            needs_atmosphere = getattr(body, 'has_atmosphere', False) and body.type == 'planet'
+            is_asteroid = body.type == 'asteroid'
+            is_selected = body is selected_body
+            if not (needs_glow or needs_atmosphere or is_asteroid or is_selected):
+                continue
+
+            glPushMatrix()
+            glTranslatef(*pos)
+            glColor3f(*body.color)
+            if is_asteroid:
+                self.setup_material_properties(body)
+                self.render_asteroid(body)
+            if needs_glow:
+                self.render_glow(body)
+            if needs_atmosphere:
+                self.render_atmosphere(body)
+            if is_selected:
+                self.render_selection_highlight(body)
+            glPopMatrix()
+
+    def fill_sphere_instances(self, table, types: np.ndarray, is_star: np.ndarray, scaled_pos: np.ndarray,
+                              visible: np.ndarray = None):
+        """填充球形天体的实例数据并绘制（visible 为视锥体剔除掩码，只写入可见天体）"""
+        is_sphere = types <= BODY_TYPE_CODES['moon']
+        if visible is not None:
+            is_sphere &= visible
+
+        # 与逐个绘制相同的显示半径规则
+        r_draw = self.display_radius(table.radius)
+
+        rows = np.flatnonzero(is_sphere)
+        # 按屏幕半径（像素）分组：网格实例在前，替身实例在后，两组各用一次实例化绘制
+        # 焦距（像素）直接取自缓存的投影矩阵：P[1, 1] = 1 / tan(fov / 2)
+        focal_px = 0.5 * self.viewport[3] * self.projection_matrix[1, 1]
+        distance = np.linalg.norm(scaled_pos[rows] - self.camera_pos.astype(np.float32), axis=1)
+        pixel_radius = r_draw[rows] * focal_px / np.maximum(distance, self.z_near)
+        small = pixel_radius < self.impostor_pixel_radius
+        mesh_count = len(rows) - int(np.count_nonzero(small))
+        rows = np.concatenate((rows[~small], rows[small]))
+        # 实例序号 -> 表中行号，供 GPU 拾取反查天体
+        self.instance_rows = rows
+        # 直接写入实例缓冲区（持久映射时即为显存映射区）
+        instances = self.sphere_batch.begin(len(rows))
+        if instances is None:
+            return
+        instances[:, :3] = scaled_pos[rows]
+        instances[:, 3] = r_draw[rows]
+        # 映射区只写不读：卫星颜色先在主机端变暗再整体写入
+        colors = table.color[rows]
+        colors[types[rows] == BODY_TYPE_CODES['moon']] *= 0.8
+        instances[:, 4:7] = colors
+        instances[:, 7] = is_star[rows]
+        self.sphere_batch.draw(len(rows), mesh_count)
+
     def render_star(self, body):
         """渲染恒星"""
-        # 恒星是光源，使用自发光材质
-        glMaterialfv(GL_FRONT, GL_EMISSION, [body.color[0], body.color[1], body.color[2], 1.0])
-        
+        # 恒星是光源，自发光材质已由 setup_material_properties 设置
         # 绘制恒星本体（根据当前半径模式选择显示半径）
-        r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-        if self.use_true_radii:
-            r_draw = r_physical * self.radius_scale_multiplier
-        else:
-            r_draw = max(r_physical, self.min_display_radius)
+        r_draw = self.display_radius(body.radius)
         self.draw_sphere(r_draw)
         
         # 绘制光晕效果
         self.render_glow(body)
         
         # 重置发光材质
-        glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
+        glMaterialfv(GL_FRONT, GL_EMISSION, _BLACK)
+        self._current_material = None
         
     def render_planet(self, body):
         """渲染行星"""
-        # 设置行星材质
-        glMaterialfv(GL_FRONT, GL_AMBIENT, [0.2, 0.2, 0.2, 1.0])
-        glMaterialfv(GL_FRONT, GL_DIFFUSE, [body.color[0], body.color[1], body.color[2], 1.0])
-        glMaterialfv(GL_FRONT, GL_SPECULAR, [0.5, 0.5, 0.5, 1.0])
-        glMaterialf(GL_FRONT, GL_SHININESS, 30.0)
-        
-        r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-        if self.use_true_radii:
-            r_draw = r_physical * self.radius_scale_multiplier
-        else:
-            r_draw = max(r_physical, self.min_display_radius)
+        # 行星材质已由 setup_material_properties 设置
+        r_draw = self.display_radius(body.radius)
         self.draw_sphere(r_draw)
         
         # 如果有大气层，渲染大气效果
@@ -162,100 +931,122 @@ class OpenGLRenderer:
             
     def render_moon(self, body):
         """渲染卫星"""
-        # 卫星材质较暗
-        glMaterialfv(GL_FRONT, GL_AMBIENT, [0.1, 0.1, 0.1, 1.0])
-        glMaterialfv(GL_FRONT, GL_DIFFUSE, [body.color[0]*0.8, body.color[1]*0.8, body.color[2]*0.8, 1.0])
-        glMaterialfv(GL_FRONT, GL_SPECULAR, [0.1, 0.1, 0.1, 1.0])
-        glMaterialf(GL_FRONT, GL_SHININESS, 10.0)
-        
-        r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-        if self.use_true_radii:
-            r_draw = r_physical * self.radius_scale_multiplier
-        else:
-            r_draw = max(r_physical, self.min_display_radius)
+        # 卫星材质（较暗）已由 setup_material_properties 设置
+        r_draw = self.display_radius(body.radius)
         self.draw_sphere(r_draw)
         
     def render_asteroid(self, body):
         """渲染小行星"""
-        # 小行星使用不规则形状
-        glMaterialfv(GL_FRONT, GL_AMBIENT, [0.3, 0.2, 0.1, 1.0])
-        glMaterialfv(GL_FRONT, GL_DIFFUSE, [body.color[0], body.color[1], body.color[2], 1.0])
-        glMaterialfv(GL_FRONT, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
-        
-        r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-        if self.use_true_radii:
-            r_draw = r_physical * self.radius_scale_multiplier
-        else:
-            r_draw = max(r_physical, self.min_display_radius)
-        self.draw_irregular_shape(r_draw)
+        # 小行星使用不规则形状，材质已由 setup_material_properties 设置
+        r_draw = self.display_radius(body.radius)
+        # 形状变体由天体名决定，同一颗小行星每帧形状相同
+        variant = self._asteroid_variant.get(body.name)
+        if variant is None:
+            variant = self._asteroid_variant[body.name] = zlib.crc32(body.name.encode('utf-8'))
+        self.draw_irregular_shape(r_draw, variant)
         
     def draw_sphere(self, radius: float, segments: int = 32):
-        """绘制球体"""
-        if self.sphere_display_list is None:
-            self.sphere_display_list = glGenLists(1)
-            glNewList(self.sphere_display_list, GL_COMPILE)
-            
-            quadric = gluNewQuadric()
-            gluQuadricNormals(quadric, GLU_SMOOTH)
-            gluSphere(quadric, 1.0, segments, segments)
-            gluDeleteQuadric(quadric)
-            
-            glEndList()
+        """绘制球体：单位球网格按细分数上传一次，之后每次只需一次三角形带绘制调用"""
+        strip = self.sphere_strips.get(segments)
+        if strip is None:
+            vertices, _ = SphereInstancedBatch.build_sphere_mesh(segments)
+            indices = SphereInstancedBatch.build_sphere_strip(segments)
+            vbo, ibo = glGenBuffers(2)
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+            strip = self.sphere_strips[segments] = (vbo, ibo, indices.size)
+        vbo, ibo, count = strip
             
-        # 缩放球体到指定半径（保证最小可见尺寸）
+        # 缩放球体到指定半径（保证最小可见尺寸）；缩放只作用于本次绘制，
+        # 之后在同一坐标系中绘制的光晕、大气层与选中高亮不受影响
         display_radius = max(radius, self.min_display_radius)
+        glPushMatrix()
         glScalef(display_radius, display_radius, display_radius)
-        glCallList(self.sphere_display_list)
-        
-    def draw_irregular_shape(self, base_radius: float):
-        """绘制不规则形状（用于小行星）"""
-        # 使用随机顶点创建不规则形状
-        vertices = []
-        faces = []
-        
-        # 生成顶点
-        num_vertices = 20
-        for i in range(num_vertices):
-            theta = 2 * math.pi * i / num_vertices
-            phi = math.pi * (i % 2)  # 交替上下
-            
-            # 添加随机性（base_radius 已为渲染单位）
-            r = base_radius * (0.8 + 0.4 * np.random.random())
-            
-            x = r * math.sin(phi) * math.cos(theta)
-            y = r * math.cos(phi)
-            z = r * math.sin(phi) * math.sin(theta)
-            
-            vertices.append([x, y, z])
-            
-        # 生成面
-        for i in range(num_vertices):
-            next_i = (i + 1) % num_vertices
-            
-            # 连接到中心点形成三角形
-            glBegin(GL_TRIANGLES)
-            glVertex3f(0, 0, 0)
-            glVertex3fv(vertices[i])
-            glVertex3fv(vertices[next_i])
-            glEnd()
-            
+
+        # 单位球的顶点坐标即法线，两者共用同一个缓冲区
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ibo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glNormalPointer(GL_FLOAT, 0, None)
+        glDrawElements(GL_TRIANGLE_STRIP, count, GL_UNSIGNED_SHORT, None)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopMatrix()
+        
+    def draw_irregular_shape(self, base_radius: float, variant: int = 0):
+        """绘制不规则形状（用于小行星）：缓存的形状网格缩放后一次绘制"""
+        if self.asteroid_shape_vbo is None:
+            shapes = build_asteroid_shapes(self.asteroid_shape_variants)
+            self.asteroid_shape_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.asteroid_shape_vbo)
+            glBufferData(GL_ARRAY_BUFFER, shapes.nbytes, shapes, GL_STATIC_DRAW)
+            self._asteroid_shape_vertices = len(shapes) // self.asteroid_shape_variants
+        count = self._asteroid_shape_vertices
+
+        # 网格为单位尺寸（base_radius 已为渲染单位）
+        glPushMatrix()
+        glScalef(base_radius, base_radius, base_radius)
+        glBindBuffer(GL_ARRAY_BUFFER, self.asteroid_shape_vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 24, None)
+        glNormalPointer(GL_FLOAT, 24, ctypes.c_void_p(12))
+        # 面法线在缩放后仍需归一化
+        glEnable(GL_NORMALIZE)
+        glDrawArrays(GL_TRIANGLES, (variant % self.asteroid_shape_variants) * count, count)
+        glDisable(GL_NORMALIZE)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopMatrix()
+
     def render_glow(self, body):
-        """渲染恒星的光晕效果"""
+        """渲染恒星的光晕效果：一个面向相机、贴有径向高斯贴图的四边形"""
+        if self.glow_texture is None:
+            sprite = build_glow_sprite()
+            self.glow_texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self.glow_texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, sprite.shape[1], sprite.shape[0], 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, sprite)
+
+        # 半宽与原先最外层光晕球的半径相同；视图矩阵前两行即相机的右/上方向
+        size = body.radius * self.render_scale * 3.0
+        right = self.view_matrix[0, :3] * size
+        up = self.view_matrix[1, :3] * size
+        corners = np.array([-right - up, right - up, right + up, up - right], dtype=np.float32)
+
+        glDisable(GL_LIGHTING)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE)
-        
-        # 多层光晕
-        for i in range(3):
-            alpha = 0.3 - i * 0.1
-            size = body.radius * RENDER_SCALE * self.scale_multiplier * (2.0 + i * 0.5)
+        # 光晕不写深度，避免遮挡其后的天体
+        glDepthMask(GL_FALSE)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.glow_texture)
+        glColor4f(body.color[0], body.color[1], body.color[2], 1.0)
 
-            glColor4f(body.color[0], body.color[1], body.color[2], alpha)
-            glPushMatrix()
-            glScalef(size, size, size)
-            self.draw_sphere(1.0, 16)
-            glPopMatrix()
-            
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, corners)
+        glTexCoordPointer(2, GL_FLOAT, 0, _GLOW_TEXCOORDS)
+        glDrawArrays(GL_QUADS, 0, 4)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glDepthMask(GL_TRUE)
         glDisable(GL_BLEND)
+        glEnable(GL_LIGHTING)
         
     def render_atmosphere(self, body):
         """渲染行星大气层"""
@@ -266,13 +1057,7 @@ class OpenGLRenderer:
         glColor4f(0.5, 0.7, 1.0, 0.2)
         
         # 稍微放大一点
-        atmosphere_radius = body.radius * 1.1 * RENDER_SCALE * self.scale_multiplier
-        r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-        if self.use_true_radii:
-            base_r = r_physical * self.radius_scale_multiplier
-        else:
-            base_r = max(r_physical, self.min_display_radius)
-        atmosphere_radius = base_r * 1.1
+        atmosphere_radius = self.display_radius(body.radius) * 1.1
         glPushMatrix()
         glScalef(atmosphere_radius, atmosphere_radius, atmosphere_radius)
         self.draw_sphere(1.0, 32)
@@ -290,45 +1075,73 @@ class OpenGLRenderer:
         glColor4f(1.0, 1.0, 0.0, 0.8)
         glLineWidth(3.0)
         
+        segments = self.selection_ring_segments
+        if self.selection_ring_vbo is None:
+            angle = np.arange(segments) * (2.0 * math.pi / segments)
+            ring = np.zeros((segments, 3), dtype=np.float32)
+            ring[:, 0] = np.cos(angle)
+            ring[:, 1] = np.sin(angle)
+            self.selection_ring_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.selection_ring_vbo)
+            glBufferData(GL_ARRAY_BUFFER, ring.nbytes, ring, GL_STATIC_DRAW)
+
+        # 圆环面向相机：单位圆的 X/Y 轴映射到相机的右/上方向（视图矩阵前两行）
+        r_ring = self.display_radius(body.radius) * 1.2
+        orient = np.identity(4)
+        orient[:3, 0] = self.view_matrix[0, :3] * r_ring
+        orient[:3, 1] = self.view_matrix[1, :3] * r_ring
+        orient[:3, 2] = self.view_matrix[2, :3]
         glPushMatrix()
-        r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-        if self.use_true_radii:
-            r_display = max(r_physical * self.radius_scale_multiplier, self.min_display_radius)
-        else:
-            r_display = max(r_physical, self.min_display_radius)
-        glScalef(r_display * 1.2, r_display * 1.2, r_display * 1.2)
-        # 使用 GLU 四叉体以替代 GLUT 的 wire sphere，避免 GLUT 依赖导致的访问冲突
-        quad = gluNewQuadric()
-        gluQuadricDrawStyle(quad, GLU_LINE)
-        gluSphere(quad, 1.0, 16, 16)
-        gluDeleteQuadric(quad)
+        glMultMatrixd(np.ascontiguousarray(orient.T))
+        glBindBuffer(GL_ARRAY_BUFFER, self.selection_ring_vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glDrawArrays(GL_LINE_LOOP, 0, segments)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         glPopMatrix()
         
         glEnable(GL_LIGHTING)
         glDisable(GL_BLEND)
         
     def render_orbits(self, bodies: list):
-        """渲染轨道"""
+        """渲染轨道：每个天体的轨迹作为 float32 顶点数组一次绘制，缩放交给模型视图矩阵"""
         if not self.show_orbits:
             return
             
         glDisable(GL_LIGHTING)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
-        for body_key, body in bodies.items():
-            if len(body.trail) < 2:
-                continue
-                
+        glLineWidth(2.0)
+        scale = self.render_scale
+
+        # 以轨迹包围盒的外接球做视锥体剔除
+        drawn = []
+        for body in bodies.values():
+            trail = body.trail_points()
+            if len(trail) >= 2:
+                drawn.append((body, trail))
+        if drawn:
+            lo = np.array([trail.min(axis=0) for _, trail in drawn], dtype=np.float64)
+            hi = np.array([trail.max(axis=0) for _, trail in drawn], dtype=np.float64)
+            centers = (lo + hi) * (0.5 * scale)
+            radii = np.linalg.norm(hi - lo, axis=1) * (0.5 * scale)
+            visible = self.visible_mask(centers, radii)
+            drawn = [item for item, in_view in zip(drawn, visible) if in_view]
+
+        glPushMatrix()
+        glScalef(scale, scale, scale)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        for body, trail in drawn:
             # 设置轨道颜色（半透明）
             glColor4f(body.color[0], body.color[1], body.color[2], 0.6)
-            glLineWidth(2.0)
             
             # 绘制轨道线
-            glBegin(GL_LINE_STRIP)
-            for point in body.trail:
-                glVertex3f(point[0] * RENDER_SCALE * self.scale_multiplier, point[1] * RENDER_SCALE * self.scale_multiplier, point[2] * RENDER_SCALE * self.scale_multiplier)
-            glEnd()
+            glVertexPointer(3, GL_FLOAT, 0, trail)
+            glDrawArrays(GL_LINE_STRIP, 0, len(trail))
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glPopMatrix()
             
         glEnable(GL_LIGHTING)
         glDisable(GL_BLEND)
@@ -347,215 +1160,298 @@ class OpenGLRenderer:
 
         # 远距离（米）设置为一个很大的值，渲染时会乘以 RENDER_SCALE 和 scale_multiplier
         far_distance_m = 1.0e13
-        far_scaled = far_distance_m * RENDER_SCALE * self.scale_multiplier
+        far_scaled = far_distance_m * self.render_scale
 
-        glBegin(GL_POINTS)
-        for dir_vec in self.star_field:
-            # 将星点放置在摄像机位置的远处方向上
-            x = self.camera_pos[0] + float(dir_vec[0]) * far_scaled
-            y = self.camera_pos[1] + float(dir_vec[1]) * far_scaled
-            z = self.camera_pos[2] + float(dir_vec[2]) * far_scaled
-            glVertex3f(x, y, z)
-        glEnd()
+        if self.star_field_vbo is None:
+            self._initialize_star_field()
+        if self._uploaded_star_field is not self.star_field:
+            stars = np.zeros((len(self.star_field), 4), dtype=np.int16)
+            stars[:, :3] = np.round(np.asarray(self.star_field) * STAR_FIELD_FIXED_SCALE)
+            glBindBuffer(GL_ARRAY_BUFFER, self.star_field_vbo)
+            glBufferData(GL_ARRAY_BUFFER, stars.nbytes, stars, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self._uploaded_star_field = self.star_field
+
+        # 星点方向只上传一次，放置到摄像机远处由模型视图矩阵完成
+        glPushMatrix()
+        glTranslatef(*self.camera_pos.tolist())
+        star_scale = far_scaled / STAR_FIELD_FIXED_SCALE
+        glScalef(star_scale, star_scale, star_scale)
+        if self.star_field_vao is not None:
+            glBindVertexArray(self.star_field_vao)
+            glDrawArrays(GL_POINTS, 0, len(self.star_field))
+            glBindVertexArray(0)
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self.star_field_vbo)
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_SHORT, STAR_FIELD_STRIDE, None)
+            glDrawArrays(GL_POINTS, 0, len(self.star_field))
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopMatrix()
 
         glDisable(GL_BLEND)
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_LIGHTING)
         
+    def _initialize_star_field(self):
+        """创建星空 VBO；支持顶点数组对象时把顶点指针状态记录在 VAO 中"""
+        self.star_field_vbo = glGenBuffers(1)
+        try:
+            if not bool(glGenVertexArrays):
+                return
+            self.star_field_vao = glGenVertexArrays(1)
+            glBindVertexArray(self.star_field_vao)
+            glBindBuffer(GL_ARRAY_BUFFER, self.star_field_vbo)
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_SHORT, STAR_FIELD_STRIDE, None)
+            glBindVertexArray(0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        except Exception as e:
+            logger.warning("顶点数组对象不可用，星空改为每帧设置顶点指针: %s", e)
+            self.star_field_vao = None
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    @staticmethod
+    def build_grid_lines(grid_size: int, grid_step: int) -> np.ndarray:
+        """生成 XZ 平面网格线段端点 [4 * 线数, 3] float32：每个刻度一条平行 Z 轴、一条平行 X 轴的线"""
+        ticks = np.arange(-grid_size, grid_size + 1, grid_step, dtype=np.float32)
+        lines = np.zeros((len(ticks), 4, 3), dtype=np.float32)
+        lines[:, 0:2, 0] = ticks[:, None]
+        lines[:, 0, 2] = -grid_size
+        lines[:, 1, 2] = grid_size
+        lines[:, 2, 0] = -grid_size
+        lines[:, 3, 0] = grid_size
+        lines[:, 2:4, 2] = ticks[:, None]
+        return lines.reshape(-1, 3)
+
     def render_grid(self):
         """渲染坐标网格"""
         if not self.show_grid:
             return
             
+        if self.grid_vbo is None:
+            vertices = self.build_grid_lines(1000, 100)
+            self.grid_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.grid_vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+            self._grid_vertex_count = len(vertices)
+
         glDisable(GL_LIGHTING)
         glColor3f(0.2, 0.2, 0.2)
         
-        grid_size = 1000
-        grid_step = 100
-        
         # XZ平面网格
-        glBegin(GL_LINES)
-        for i in range(-grid_size, grid_size + 1, grid_step):
-            glVertex3f(i, 0, -grid_size)
-            glVertex3f(i, 0, grid_size)
-            glVertex3f(-grid_size, 0, i)
-            glVertex3f(grid_size, 0, i)
-        glEnd()
+        glBindBuffer(GL_ARRAY_BUFFER, self.grid_vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glDrawArrays(GL_LINES, 0, self._grid_vertex_count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
         glEnable(GL_LIGHTING)
         
+    def color_material(self, color: tuple, factor: float = 1.0):
+        """返回天体颜色乘以系数后的 GLfloat[4]（按颜色缓存，颜色改变时自然生成新条目）"""
+        key = (tuple(color[:3]), factor)
+        material = self._color_materials.get(key)
+        if material is None:
+            material = _gl_vec4(color[0] * factor, color[1] * factor, color[2] * factor)
+            self._color_materials[key] = material
+        return material
+
     def setup_material_properties(self, body):
-        """根据天体类型设置材质属性"""
-        if body.type == 'star':
+        """根据天体类型设置材质属性（与上一次设置的类型和颜色相同时跳过）"""
+        material = MATERIALS.get(body.type)
+        if material is None:
+            return
+        key = (body.type, tuple(body.color[:3]))
+        if key == self._current_material:
+            return
+        self._current_material = key
+
+        emission = material['emission']
+        if emission is None:
             # 恒星自发光
-            glMaterialfv(GL_FRONT, GL_EMISSION, [body.color[0], body.color[1], body.color[2], 1.0])
-            glMaterialfv(GL_FRONT, GL_AMBIENT, [0.0, 0.0, 0.0, 1.0])
-            glMaterialfv(GL_FRONT, GL_DIFFUSE, [0.0, 0.0, 0.0, 1.0])
-            glMaterialfv(GL_FRONT, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
-            
-        elif body.type == 'planet':
-            # 行星有反射材质
-            glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
-            glMaterialfv(GL_FRONT, GL_AMBIENT, [0.2, 0.2, 0.2, 1.0])
-            glMaterialfv(GL_FRONT, GL_DIFFUSE, [body.color[0], body.color[1], body.color[2], 1.0])
-            glMaterialfv(GL_FRONT, GL_SPECULAR, [0.5, 0.5, 0.5, 1.0])
-            glMaterialf(GL_FRONT, GL_SHININESS, 30.0)
+            emission = self.color_material(body.color)
+        glMaterialfv(GL_FRONT, GL_EMISSION, emission)
+        glMaterialfv(GL_FRONT, GL_AMBIENT, material['ambient'])
+        factor = material['diffuse_factor']
+        glMaterialfv(GL_FRONT, GL_DIFFUSE, self.color_material(body.color, factor) if factor else _BLACK)
+        glMaterialfv(GL_FRONT, GL_SPECULAR, material['specular'])
+        if material['shininess'] is not None:
+            glMaterialf(GL_FRONT, GL_SHININESS, material['shininess'])
             
-        elif body.type == 'moon':
-            # 卫星材质较暗
-            glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
-            glMaterialfv(GL_FRONT, GL_AMBIENT, [0.1, 0.1, 0.1, 1.0])
-            glMaterialfv(GL_FRONT, GL_DIFFUSE, [body.color[0]*0.8, body.color[1]*0.8, body.color[2]*0.8, 1.0])
-            glMaterialfv(GL_FRONT, GL_SPECULAR, [0.1, 0.1, 0.1, 1.0])
-            glMaterialf(GL_FRONT, GL_SHININESS, 10.0)
-            
-        elif body.type == 'asteroid':
-            # 小行星材质粗糙
-            glMaterialfv(GL_FRONT, GL_EMISSION, [0.0, 0.0, 0.0, 1.0])
-            glMaterialfv(GL_FRONT, GL_AMBIENT, [0.3, 0.2, 0.1, 1.0])
-            glMaterialfv(GL_FRONT, GL_DIFFUSE, [body.color[0], body.color[1], body.color[2], 1.0])
-            glMaterialfv(GL_FRONT, GL_SPECULAR, [0.0, 0.0, 0.0, 1.0])
-            glMaterialf(GL_FRONT, GL_SHININESS, 0.0)
-            
-    def pick_body(self, mouse_pos: tuple, bodies: list, camera_distance: float, camera_rotation: list) -> object:
-        """鼠标拾取天体"""
-        # 使用 gluUnProject 从窗口坐标生成世界坐标射线（更精确）
+    def pick_body_gpu(self, mouse_pos: tuple, table) -> object:
+        """用颜色 ID 离屏帧缓冲拾取本帧实例化绘制的球形天体，未命中或不可用时返回 None
+
+        须在 render_celestial_bodies 之后调用（读取的是本帧实例缓冲区）。
+        """
+        if self.instance_rows is None:
+            return None
+        x = int(mouse_pos[0])
+        # OpenGL 窗口 Y 与 Pygame Y 方向不同
+        y = self.height - 1 - int(mouse_pos[1])
+        instance = self.sphere_batch.pick(x, y, self.projection_matrix, self.viewport)
+        if instance is None or instance < 0 or instance >= len(self.instance_rows):
+            return None
+        body = table.bodies[self.instance_rows[instance]]
+        if DEBUG_MODE:
+            logger.debug("[pick-gpu] hit body=%s instance=%s", body.name, instance)
+        return body
+
+    def pick_body(self, mouse_pos: tuple, bodies: list, camera_distance: float, camera_rotation: list,
+                  table=None) -> object:
+        """鼠标拾取天体
+
+        传入 table（与 bodies 一致的 BodyTable）时直接使用其位置/半径数组，否则从 bodies 收集。
+        """
+        # 由缓存的矩阵把窗口坐标反投影为世界坐标射线
         win_x = float(mouse_pos[0])
         # OpenGL 窗口 Y 与 Pygame Y 方向不同
         win_y = float(self.height - mouse_pos[1])
 
-        # 获取当前矩阵与视口
-        model = glGetDoublev(GL_MODELVIEW_MATRIX)
-        proj = glGetDoublev(GL_PROJECTION_MATRIX)
-        viewport = glGetIntegerv(GL_VIEWPORT)
-
         # 近/远平面点（窗口坐标 z=0..1）
         try:
-            near = gluUnProject(win_x, win_y, 0.0, model, proj, viewport)
-            far = gluUnProject(win_x, win_y, 1.0, model, proj, viewport)
-        except Exception:
-            # 退回到简单方向向量方法
-            ray_origin = self.camera_pos.copy()
-            phi = math.radians(camera_rotation[0])
-            theta = math.radians(camera_rotation[1])
-            ray_direction = np.array([
-                math.cos(phi) * math.sin(theta),
-                math.sin(phi),
-                math.cos(phi) * math.cos(theta)
-            ])
-            near = ray_origin
-            far = ray_origin + ray_direction * 1.0
+            near, far = self.screen_to_world(win_x, win_y, (0.0, 1.0))
+        except np.linalg.LinAlgError:
+            # 退回到相机视线方向（从相机指向目标）
+            near = self.camera_pos.copy()
+            far = near - orbit_direction(camera_rotation)
 
         ray_origin = np.array(near, dtype=np.float64)
         ray_dir = np.array(far, dtype=np.float64) - ray_origin
         ray_dir = ray_dir / np.linalg.norm(ray_dir)
 
-        closest_body = None
-        closest_t = float('inf')
-
-        # 若启用详细调试，打印每个天体的相对参数
-        debug = False
-
-        for body_key, body in bodies.items():
-            # 天体位置（渲染单位）
-            body_pos = np.array(body.position * RENDER_SCALE * self.scale_multiplier, dtype=np.float64)
-
-            # 求解射线与球体最短距离（射线参数 t）
-            L = body_pos - ray_origin
-            t_ca = np.dot(L, ray_dir)
-            if t_ca < 0:
-                # 球心在射线起点背后，仍需检查（射线从相机向外）
-                pass
-
-            d2 = np.dot(L, L) - t_ca * t_ca
-            # 物理半径（渲染单位）
-            r_physical = body.radius * RENDER_SCALE * self.scale_multiplier
-            # 实际用于渲染与拾取的半径（至少为最小显示半径）
-            r_display = max(r_physical, self.min_display_radius)
-            if debug:
-                try:
-                    print(f"[pick-debug] body={getattr(body,'name',body_key)} pos={body_pos} r_physical={r_physical} r_display={r_display} t_ca={t_ca} d2={d2}")
-                except Exception:
-                    pass
-
-            # 使用显示半径进行相交测试，这样可与屏幕上实际看到的球体一致
-            if d2 <= r_display * r_display:
-                # 计算距离到相交点的 t
-                thc = math.sqrt(max(0.0, r_display * r_display - d2))
-                t0 = t_ca - thc
-                t1 = t_ca + thc
-                t = t0 if t0 > 0 else t1
-                if t > 0 and t < closest_t:
-                    closest_t = t
-                    closest_body = body
-                    try:
-                        print(f"[pick] hit body={body.name} r_display={r_display} r_physical={r_physical} t={t} d2={d2}")
-                    except Exception:
-                        pass
-
-            # 如果射线测试没有命中任何天体，使用屏幕空间回退：将每个天体中心投影到窗口坐标并比较像素距离
-            if closest_body is None:
-                try:
-                    mouse_win_x = win_x
-                    mouse_win_y = win_y
-                    pixel_threshold = self.pick_pixel_threshold  # 像素阈值，可通过属性调整
-
-                    best_body = None
-                    best_dist = float('inf')
-
-                    for body_key, body in bodies.items():
-                        body_pos = np.array(body.position * RENDER_SCALE * self.scale_multiplier, dtype=np.float64)
-                        try:
-                            proj_xy = gluProject(float(body_pos[0]), float(body_pos[1]), float(body_pos[2]), model, proj, viewport)
-                            winx = proj_xy[0]
-                            winy = proj_xy[1]
-                            dx = winx - mouse_win_x
-                            dy = winy - mouse_win_y
-                            dist_px = math.hypot(dx, dy)
-                            # print(f"[pick-fallback] body={getattr(body,'name',body_key)} win=({winx:.1f},{winy:.1f}) dist_px={dist_px:.2f}")
-                            if dist_px < pixel_threshold and dist_px < best_dist:
-                                best_dist = dist_px
-                                best_body = body
-                        except Exception:
-                            pass
-
-                    if best_body is not None:
-                        print(f"[pick-fallback] selected body={getattr(best_body,'name','unknown')} dist_px={best_dist}")
-                        closest_body = best_body
-                except Exception:
-                    pass
-
-            return closest_body
-
-        def world_to_screen(self, world_pos: np.ndarray) -> tuple:
-            """将世界坐标（渲染单位）投影到窗口坐标，返回 (winx, winy, winz)。
-
-            `world_pos` 应当是渲染单位（已经乘以 RENDER_SCALE 和 scale_multiplier）。
-            """
-            try:
-                model = glGetDoublev(GL_MODELVIEW_MATRIX)
-                proj = glGetDoublev(GL_PROJECTION_MATRIX)
-                viewport = glGetIntegerv(GL_VIEWPORT)
-                proj_xy = gluProject(float(world_pos[0]), float(world_pos[1]), float(world_pos[2]), model, proj, viewport)
-                return (proj_xy[0], proj_xy[1], proj_xy[2])
-            except Exception:
-                return (None, None, None)
-        
-        
+        if table is not None:
+            body_list = table.bodies
+            positions = table.pos
+            radii = table.radius
+        else:
+            body_list = list(bodies.values())
+            positions = np.array([body.position for body in body_list], dtype=np.float64).reshape(-1, 3)
+            radii = np.fromiter((body.radius for body in body_list), dtype=np.float64, count=len(body_list))
+        if not body_list:
+            return None
+
+        # 所有天体一次完成射线-球体相交测试（渲染单位）
+        # 使用显示半径进行相交测试，这样可与屏幕上实际看到的球体一致
+        world = positions * self.render_scale
+        L = world - ray_origin
+        t_ca = L @ ray_dir
+        d2 = np.einsum('ij,ij->i', L, L) - t_ca * t_ca
+        r2 = self.display_radius(radii) ** 2
+        thc = np.sqrt(np.clip(r2 - d2, 0.0, None))
+        t0 = t_ca - thc
+        # 射线起点在球内时取远交点
+        t = np.where(t0 > 0, t0, t_ca + thc)
+        t[(d2 > r2) | (t <= 0)] = np.inf
+
+        hit = int(np.argmin(t))
+        if np.isfinite(t[hit]):
+            if DEBUG_MODE:
+                logger.debug("[pick] hit body=%s t=%s d2=%s", body_list[hit].name, t[hit], d2[hit])
+            return body_list[hit]
+
+        # 射线测试没有命中任何天体时使用屏幕空间回退：将天体中心投影到窗口坐标并比较像素距离
+        candidates = self._pick_cone_candidates(world, ray_dir)
+        if candidates.size == 0:
+            return None
+        win = self.world_to_screen_batch(world[candidates])
+        dist_px = np.hypot(win[:, 0] - win_x, win[:, 1] - win_y)
+        # 相机后方的点为 NaN，不参与比较
+        dist_px[~np.isfinite(dist_px)] = np.inf
+        best = int(np.argmin(dist_px))
+        # 像素阈值，可通过属性调整
+        if dist_px[best] < self.pick_pixel_threshold:
+            body = body_list[candidates[best]]
+            if DEBUG_MODE:
+                logger.debug("[pick-fallback] selected body=%s dist_px=%s", body.name, dist_px[best])
+            return body
+        return None
+
+    def _pick_cone_candidates(self, world: np.ndarray, ray_dir: np.ndarray) -> np.ndarray:
+        """返回可能落在鼠标像素阈值内的天体行号
+
+        以相机为顶点、沿拾取射线的圆锥粗筛：窗口上相距 p 像素的两点，其视线夹角不超过
+        (π/2)·p/d（d 为以像素计的焦距），因此圆锥外的天体投影后必然超出阈值，无需投影。
+        """
+        viewport = self.viewport
+        focal_px = 0.5 * min(viewport[2] * self.projection_matrix[0, 0], viewport[3] * self.projection_matrix[1, 1])
+        max_angle = 0.5 * math.pi * self.pick_pixel_threshold / focal_px
+        if not max_angle < 0.5 * math.pi:
+            return np.arange(len(world))
+        rel = world - self.camera_pos
+        along = rel @ ray_dir
+        perp2 = np.einsum('ij,ij->i', rel, rel) - along * along
+        tan_max = math.tan(max_angle)
+        return np.flatnonzero((along > 0) & (perp2 <= (tan_max * tan_max) * (along * along)))
+
+    def world_to_screen(self, world_pos: np.ndarray) -> tuple:
+        """将世界坐标（渲染单位）投影到窗口坐标，返回 (winx, winy, winz)。
+
+        `world_pos` 应当是渲染单位（已经乘以 RENDER_SCALE 和 scale_multiplier）。
+        """
+        try:
+            win = self.world_to_screen_batch(np.asarray(world_pos, dtype=np.float64).reshape(1, 3))[0]
+        except Exception:
+            return (None, None, None)
+        if not np.isfinite(win[0]):
+            return (None, None, None)
+        return (win[0], win[1], win[2])
+
+    def screen_to_world(self, win_x: float, win_y: float, win_z=(0.0, 1.0)) -> np.ndarray:
+        """把窗口坐标反投影为世界坐标（渲染单位），win_z 可为多个深度，返回 [len(win_z), 3]
+
+        与 gluUnProject 等价，但使用缓存的矩阵，所有深度共用一次 np.linalg.solve。
+        """
+        viewport = self.viewport
+        win_z = np.atleast_1d(np.asarray(win_z, dtype=np.float64))
+        ndc = np.empty((4, win_z.size), dtype=np.float64)
+        ndc[0] = 2.0 * (win_x - viewport[0]) / viewport[2] - 1.0
+        ndc[1] = 2.0 * (win_y - viewport[1]) / viewport[3] - 1.0
+        ndc[2] = 2.0 * win_z - 1.0
+        ndc[3] = 1.0
+        world = np.linalg.solve(self.projection_matrix @ self.view_matrix, ndc)
+        return (world[:3] / world[3]).T
+
+    def world_to_screen_batch(self, world_positions: np.ndarray) -> np.ndarray:
+        """批量投影世界坐标（渲染单位，[N, 3]）到窗口坐标，返回 [N, 3] 的 (winx, winy, winz)。
+
+        等价于逐点调用 gluProject，但使用缓存的矩阵并用一次矩阵乘法完成全部投影。
+        位于相机后方的点返回 NaN。
+        """
+        viewport = self.viewport
+        mvp = self.projection_matrix @ self.view_matrix
+
+        n = world_positions.shape[0]
+        homogeneous = np.ones((n, 4), dtype=np.float64)
+        homogeneous[:, :3] = world_positions
+        # 行向量形式：clip = v · MVPᵀ
+        clip = homogeneous @ mvp.T
+
+        win = np.full((n, 3), np.nan, dtype=np.float64)
+        w = clip[:, 3]
+        in_front = w > 0
+        ndc = clip[in_front, :3] / w[in_front, None]
+        win[in_front, 0] = viewport[0] + viewport[2] * (ndc[:, 0] + 1.0) * 0.5
+        win[in_front, 1] = viewport[1] + viewport[3] * (ndc[:, 1] + 1.0) * 0.5
+        win[in_front, 2] = (ndc[:, 2] + 1.0) * 0.5
+        return win
+
     def resize(self, width: int, height: int):
         """调整渲染器大小"""
         self.width = width
         self.height = height
+        self.viewport = (0, 0, width, height)
         glViewport(0, 0, width, height)
 
     def change_scale(self, factor: float):
-        """按比例调整运行时渲染缩放倍率并更新星空缓存。"""
-        try:
-            self.scale_multiplier *= factor
-            # 更新星场以应用新的倍率
-            self.star_field = self.generate_star_field(5000) * RENDER_SCALE * self.scale_multiplier
-        except Exception:
-            pass
+        """按比例调整运行时渲染缩放倍率
+
+        星空保存的是单位方向向量，远处放置与缩放在绘制时由模型视图矩阵完成，无需重新生成。
+        """
+        self.scale_multiplier *= factor
+        self.render_scale = RENDER_SCALE * self.scale_multiplier
         
     def toggle_orbits(self):
         """切换轨道显示"""
@@ -5,154 +5,106 @@
 
 import numpy as np
 import math
+import json
+from datetime import datetime
 from physics_engine import CelestialBody
-from physics_engine import OrbitalMechanics
-import random
+from physics_engine import GravityEngine, OrbitalMechanics, G_CONST
+
+# 可选的 orjson：直接序列化 NumPy 数组，比标准库 json 快数倍
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 天文单位 (m)
+_AU = 149597870.7 * 1000
+
+# 太阳系天体参数表（按数组存放，父天体总在子天体之前）：键名、名称、类型、质量 (kg)、半径 (m)、
+# 父天体行号（太阳为 -1）、绕父天体的圆轨道半径 (m)、颜色
+_SOLAR_KEYS = ('sun', 'mercury', 'venus', 'earth', 'moon', 'mars', 'jupiter', 'saturn', 'uranus', 'neptune')
+_SOLAR_NAMES = ('太阳', '水星', '金星', '地球', '月球', '火星', '木星', '土星', '天王星', '海王星')
+_SOLAR_TYPES = ('star', 'planet', 'planet', 'planet', 'moon', 'planet', 'planet', 'planet', 'planet', 'planet')
+_SOLAR_MASSES = np.array([1.989e30, 3.301e23, 4.867e24, 5.972e24, 7.342e22, 6.417e23,
+                          1.898e27, 5.683e26, 8.681e25, 1.024e26])
+_SOLAR_RADII = np.array([696340e3, 2439.7e3, 6051.8e3, 6371e3, 1737.1e3, 3389.5e3,
+                         69911e3, 58232e3, 25362e3, 24622e3])
+_SOLAR_PARENTS = np.array([-1, 0, 0, 0, 3, 0, 0, 0, 0, 0])
+# 月球与地球的平均距离为 384400 km，其余为行星轨道半长轴
+_SOLAR_ORBIT_RADII = np.array([0.0, 0.387 * _AU, 0.723 * _AU, 1.0 * _AU, 384400e3, 1.524 * _AU,
+                               5.203 * _AU, 9.537 * _AU, 19.191 * _AU, 30.07 * _AU])
+_SOLAR_COLORS = ((1.0, 0.8, 0.0), (0.55, 0.47, 0.33), (1.0, 0.77, 0.29), (0.25, 0.41, 0.88), (0.8, 0.8, 0.8),
+                 (0.8, 0.2, 0.2), (0.85, 0.65, 0.2), (0.95, 0.82, 0.38), (0.4, 0.8, 0.9), (0.2, 0.4, 0.9))
+# 层级深度（太阳 -> 地球 -> 月球）
+_SOLAR_DEPTH = 2
+# 原点（静止天体的位置/速度；CelestialBody 会复制传入的数组）
+_ORIGIN = np.zeros(3, dtype=np.float64)
+
+
+def _gen_orbits(rng, n: int, central_mass: float, r_lo: float, r_hi: float, G: float,
+                thickness: float, speed_jitter: float, vertical_speed: float) -> tuple:
+    """在 XZ 平面附近随机生成 n 条绕中心天体的近圆轨道，返回 (位置 [n, 3], 速度 [n, 3])
+
+    轨道半径在 [r_lo, r_hi) 内均匀分布，高度为 ±thickness/2 倍半径；
+    切向速度为圆轨道速度加 ±speed_jitter/2 的扰动，另加 ±vertical_speed/2 的垂直速度。
+    """
+    distance = r_lo + rng.random(n) * (r_hi - r_lo)
+    angle = rng.random(n) * (2 * math.pi)
+    sin_a, cos_a = np.sin(angle), np.cos(angle)
+
+    positions = np.empty((n, 3))
+    positions[:, 0] = cos_a * distance
+    positions[:, 1] = (rng.random(n) - 0.5) * thickness * distance
+    positions[:, 2] = sin_a * distance
+
+    speed = np.sqrt(G * central_mass / distance)
+    if speed_jitter:
+        speed += (rng.random(n) - 0.5) * speed_jitter
+    velocities = np.empty((n, 3))
+    velocities[:, 0] = -sin_a * speed
+    velocities[:, 1] = (rng.random(n) - 0.5) * vertical_speed
+    velocities[:, 2] = cos_a * speed
+    return positions, velocities
+
 
 class SceneManager:
     """场景管理器类"""
+
+    # 随机系统中行星依次使用的颜色
+    _RANDOM_COLORS = ((0.2, 0.4, 0.8), (0.2, 0.8, 0.2), (0.8, 0.2, 0.2),
+                      (0.8, 0.2, 0.8), (0.2, 0.8, 0.8), (0.8, 0.8, 0.2))
     
-    def __init__(self):
-        """初始化场景管理器"""
-        self.G = 6.67430e-11  # 引力常数
-        self.AU = 149597870.7 * 1000 # 天文单位 (km)
-        
-    def load_solar_system(self, bodies: list):
-        """加载太阳系"""
+    def __init__(self, seed: int = None):
+        """初始化场景管理器（seed 用于复现随机场景，默认不固定）"""
+        self.G = G_CONST  # 引力常数
+        self.AU = _AU # 天文单位 (m)
+        # 各随机场景共用的随机数生成器
+        self._rng = np.random.default_rng(seed)
+        
+    def load_solar_system(self, bodies: dict):
+        """加载太阳系：由参数表一次性算出全部天体的初始状态"""
         # 清空现有天体
         bodies.clear()
+
+        # 每个天体在父天体的位置/速度上叠加圆轨道：沿 X 轴偏移轨道半径，速度沿 +Y
+        has_parent = _SOLAR_PARENTS >= 0
+        parents = np.where(has_parent, _SOLAR_PARENTS, 0)
+        offset_pos = np.zeros((len(_SOLAR_KEYS), 3))
+        offset_pos[:, 0] = _SOLAR_ORBIT_RADII
+        offset_vel = np.zeros((len(_SOLAR_KEYS), 3))
+        offset_vel[has_parent, 1] = np.sqrt(self.G * _SOLAR_MASSES[parents[has_parent]]
+                                            / _SOLAR_ORBIT_RADII[has_parent])
+        # 按层级逐层累加父天体的状态（太阳的偏移为零，作为根）
+        positions, velocities = offset_pos, offset_vel
+        for _ in range(_SOLAR_DEPTH):
+            positions = offset_pos + positions[parents]
+            velocities = offset_vel + velocities[parents]
+
+        for key, body in zip(_SOLAR_KEYS, CelestialBody.from_soa(
+                _SOLAR_NAMES, _SOLAR_TYPES, _SOLAR_MASSES, _SOLAR_RADII, positions, velocities, _SOLAR_COLORS)):
+            bodies[key] = body
         
-        # 太阳
-        sun = CelestialBody(
-            name='太阳',
-            body_type='star',
-            mass=1.989e30,
-            radius=696340e3,
-            position=[0, 0, 0],
-            velocity=[0, 0, 0],
-            color=(1.0, 0.8, 0.0)
-        )
-        bodies['sun'] = sun
-        
-        # 水星
-        mercury_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 0.387 * self.AU)
-        mercury = CelestialBody(
-            name='水星',
-            body_type='planet',
-            mass=3.301e23,
-            radius=2439.7e3,
-            position=[0.387 * self.AU, 0, 0],
-            velocity=[0, mercury_orbital_velocity, 0],
-            color=(0.55, 0.47, 0.33)
-        )
-        bodies['mercury'] = mercury
-        
-        # 金星
-        venus_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 0.723 * self.AU)
-        venus = CelestialBody(
-            name='金星',
-            body_type='planet',
-            mass=4.867e24,
-            radius=6051.8e3,
-            position=[0.723 * self.AU, 0, 0],
-            velocity=[0, venus_orbital_velocity, 0],
-            color=(1.0, 0.77, 0.29)
-        )
-        bodies['venus'] = venus
-        
-        # 地球
-        earth_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 1.0 * self.AU)
-        earth = CelestialBody(
-            name='地球',
-            body_type='planet',
-            mass=5.972e24,
-            radius=6371e3,
-            position=[1.0 * self.AU, 0, 0],
-            velocity=[0, earth_orbital_velocity, 0],
-            color=(0.25, 0.41, 0.88)
-        )
-        bodies['earth'] = earth
-        
-        # 月球（地球的卫星）
-        dist_to_earth = 384400 * 1000  # 月球距离地球的平均距离，已转换为米
-        moon_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(earth.mass, dist_to_earth)
-        moon = CelestialBody(
-            name='月球',
-            body_type='moon',
-            mass=7.342e22,
-            radius=1737.1e3,
-            position=[1.0 * self.AU + dist_to_earth, 0, 0],
-            velocity=[0, earth_orbital_velocity + moon_orbital_velocity, 0],
-            color=(0.8, 0.8, 0.8)
-        )
-        bodies['moon'] = moon
-        
-        # 火星
-        mars_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 1.524 * self.AU)
-        mars = CelestialBody(
-            name='火星',
-            body_type='planet',
-            mass=6.417e23,
-            radius=3389.5e3,
-            position=[1.524 * self.AU, 0, 0],
-            velocity=[0, mars_orbital_velocity, 0],
-            color=(0.8, 0.2, 0.2)
-        )
-        bodies['mars'] = mars
-        
-        # 木星
-        jupiter_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 5.203 * self.AU)
-        jupiter = CelestialBody(
-            name='木星',
-            body_type='planet',
-            mass=1.898e27,
-            radius=69911e3,
-            position=[5.203 * self.AU, 0, 0],
-            velocity=[0, jupiter_orbital_velocity, 0],
-            color=(0.85, 0.65, 0.2)
-        )
-        bodies['jupiter'] = jupiter
-        
-        # 土星
-        saturn_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 9.537 * self.AU)
-        saturn = CelestialBody(
-            name='土星',
-            body_type='planet',
-            mass=5.683e26,
-            radius=58232e3,
-            position=[9.537 * self.AU, 0, 0],
-            velocity=[0, saturn_orbital_velocity, 0],
-            color=(0.95, 0.82, 0.38)
-        )
-        bodies['saturn'] = saturn
-        
-        # 天王星
-        uranus_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 19.191 * self.AU)
-        uranus = CelestialBody(
-            name='天王星',
-            body_type='planet',
-            mass=8.681e25,
-            radius=25362e3,
-            position=[19.191 * self.AU, 0, 0],
-            velocity=[0, uranus_orbital_velocity, 0],
-            color=(0.4, 0.8, 0.9)
-        )
-        bodies['uranus'] = uranus
-        
-        # 海王星
-        neptune_orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, 30.07 * self.AU)
-        neptune = CelestialBody(
-            name='海王星',
-            body_type='planet',
-            mass=1.024e26,
-            radius=24622e3,
-            position=[30.07 * self.AU, 0, 0],
-            velocity=[0, neptune_orbital_velocity, 0],
-            color=(0.2, 0.4, 0.9)
-        )
-        bodies['neptune'] = neptune
-        
-    def load_binary_system(self, bodies: list):
+    def load_binary_system(self, bodies: dict):
         """加载双星系统"""
         bodies.clear()
         
@@ -217,53 +169,38 @@ class SceneManager:
             body_type='star',
             mass=star_mass,
             radius=696340,  # 半径已转换为米
-            position=[0, 0, 0],
-            velocity=[0, 0, 0],
+            position=_ORIGIN,
+            velocity=_ORIGIN,
             color=(1.0, 0.9, 0.3)
         )
         bodies['star'] = star
         
-        # 随机生成行星
-        import random
-        colors = [(0.2, 0.4, 0.8), (0.2, 0.8, 0.2), (0.8, 0.2, 0.2), 
-                 (0.8, 0.2, 0.8), (0.2, 0.8, 0.8), (0.8, 0.8, 0.2)]
+        # 随机生成行星：所有轨道参数一次性按数组采样
+        rng = self._rng
+        colors = self._RANDOM_COLORS
         
-        planet_count = random.randint(3, 6)
+        planet_count = int(rng.integers(3, 7))
         
-        for i in range(planet_count):
-            # 随机轨道距离
-            distance = (random.random() * 300 + 50) * 1e6  # 已转换为米
-            angle = random.random() * 2 * math.pi
-            
-            # 随机质量
-            mass = random.random() * 1e25 + 1e23
-            radius = random.random() * 5000 + 2000  # 已转换为米
-            
-            # 位置
-            x = math.cos(angle) * distance
-            z = math.sin(angle) * distance
-            y = (random.random() - 0.5) * distance * 0.1
-            position = [x, y, z]
-            
-            # 轨道速度
-            orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(star_mass, distance)
-            vx = -math.sin(angle) * orbital_velocity
-            vz = math.cos(angle) * orbital_velocity
-            vy = (random.random() - 0.5) * 5
-            velocity = [vx, vy, vz]
-            
-            planet = CelestialBody(
-                name=f'行星{i+1}',
-                body_type='planet',
-                mass=mass,
-                radius=radius,
-                position=position,
-                velocity=velocity,
-                color=colors[i % len(colors)]
-            )
-            bodies[f'planet{i+1}'] = planet
+        # 随机轨道：距离 50-350 百万米，倾斜 ±5%，垂直速度 ±2.5 m/s
+        positions, velocities = _gen_orbits(rng, planet_count, star_mass, 50e6, 350e6, self.G,
+                                            thickness=0.1, speed_jitter=0.0, vertical_speed=5.0)
+        
+        # 随机质量与半径（已转换为米）
+        mass = rng.random(planet_count) * 1e25 + 1e23
+        radius = rng.random(planet_count) * 5000 + 2000
+        
+        planets = CelestialBody.from_soa(
+            names=[f'行星{i+1}' for i in range(planet_count)],
+            body_types=['planet'] * planet_count,
+            masses=mass,
+            radii=radius,
+            positions=positions,
+            velocities=velocities,
+            colors=[colors[i % len(colors)] for i in range(planet_count)]
+        )
+        bodies.update((f'planet{i+1}', planet) for i, planet in enumerate(planets))
             
-    def load_triple_system(self, bodies: list):
+    def load_triple_system(self, bodies: dict):
         """加载三星系统"""
         bodies.clear()
         
@@ -276,11 +213,11 @@ class SceneManager:
             body_type='star',
             mass=1.0e30,
             radius=500000,
-            position=[0, 0, 0],
-            velocity=[0, 0, 0],
+            position=_ORIGIN,
+            velocity=_ORIGIN,
             color=(1.0, 1.0, 0.0)
         )
-        bodies.append(star1)
+        bodies['star1'] = star1
         
         # 恒星2
         star2 = CelestialBody(
@@ -292,7 +229,7 @@ class SceneManager:
             velocity=[0, 20, 0],
             color=(1.0, 0.6, 0.0)
         )
-        bodies.append(star2)
+        bodies['star2'] = star2
         
         # 恒星3
         star3 = CelestialBody(
@@ -304,17 +241,18 @@ class SceneManager:
             velocity=[-10 * math.sqrt(3), 10, 0],
             color=(1.0, 0.3, 0.0)
         )
-        bodies.append(star3)
+        bodies['star3'] = star3
         
         # 添加一个围绕质心运行的行星
         planet_mass = 5e24
         planet_radius = 6000
         planet_distance = 3 * distance
         
-        # 计算系统质心
-        total_mass = star1.mass + star2.mass + star3.mass
-        com_x = (star1.mass * star1.position[0] + star2.mass * star2.position[0] + star3.mass * star3.position[0]) / total_mass
-        com_y = (star1.mass * star1.position[1] + star2.mass * star2.position[1] + star3.mass * star3.position[1]) / total_mass
+        # 计算系统质心（与物理引擎相同的质量加权平均）
+        stars = (star1, star2, star3)
+        masses = np.array([star.mass for star in stars])
+        total_mass = masses.sum()
+        com_x, com_y, _ = GravityEngine.mass_weighted_mean(np.array([star.position for star in stars]), masses)
         
         # 行星围绕质心运行
         planet_velocity = OrbitalMechanics.calculate_orbital_velocity(total_mass, planet_distance)
@@ -328,9 +266,9 @@ class SceneManager:
             velocity=[0, 0, planet_velocity],
             color=(0.2, 0.8, 0.2)
         )
-        bodies.append(planet)
+        bodies['planet'] = planet
         
-    def load_asteroid_belt(self, bodies: list):
+    def load_asteroid_belt(self, bodies: dict):
         """加载小行星带"""
         bodies.clear()
         
@@ -340,11 +278,11 @@ class SceneManager:
             body_type='star',
             mass=1.989e30,
             radius=696340,
-            position=[0, 0, 0],
-            velocity=[0, 0, 0],
+            position=_ORIGIN,
+            velocity=_ORIGIN,
             color=(1.0, 0.8, 0.0)
         )
-        bodies.append(sun)
+        bodies['sun'] = sun
         
         # 木星（在小行星带外侧）
         jupiter = CelestialBody(
@@ -356,46 +294,32 @@ class SceneManager:
             velocity=[0, OrbitalMechanics.calculate_orbital_velocity(sun.mass, 5.203 * self.AU), 0],
             color=(0.85, 0.65, 0.2)
         )
-        bodies.append(jupiter)
+        bodies['jupiter'] = jupiter
         
-        # 生成小行星
+        # 生成小行星：所有轨道参数一次性按数组采样
+        rng = self._rng
         num_asteroids = 50
-        for i in range(num_asteroids):
-            # 小行星带范围 (2.0 - 3.5 AU)
-            distance = (2.0 + random.random() * 1.5) * self.AU
-            angle = random.random() * 2 * math.pi
-            
-            # 小行星参数
-            mass = random.random() * 1e20 + 1e15
-            radius = random.random() * 100 + 10
-            
-            # 位置
-            x = math.cos(angle) * distance
-            z = math.sin(angle) * distance
-            y = (random.random() - 0.5) * distance * 0.05
-            position = [x, y, z]
-            
-            # 速度（考虑木星扰动）
-            base_velocity = OrbitalMechanics.calculate_orbital_velocity(sun.mass, distance)
-            velocity_perturbation = (random.random() - 0.5) * 2
-            
-            vx = -math.sin(angle) * (base_velocity + velocity_perturbation)
-            vz = math.cos(angle) * (base_velocity + velocity_perturbation)
-            vy = (random.random() - 0.5) * 1
-            velocity = [vx, vy, vz]
-            
-            asteroid = CelestialBody(
-                name=f'小行星{i+1}',
-                body_type='asteroid',
-                mass=mass,
-                radius=radius,
-                position=position,
-                velocity=velocity,
-                color=(0.55, 0.45, 0.33)
-            )
-            bodies.append(asteroid)
+        
+        # 小行星带范围 (2.0 - 3.5 AU)，速度加 ±1 m/s 扰动（考虑木星扰动）
+        positions, velocities = _gen_orbits(rng, num_asteroids, sun.mass, 2.0 * self.AU, 3.5 * self.AU, self.G,
+                                            thickness=0.05, speed_jitter=2.0, vertical_speed=1.0)
+        
+        # 小行星参数
+        mass = rng.random(num_asteroids) * 1e20 + 1e15
+        radius = rng.random(num_asteroids) * 100 + 10
+        
+        asteroids = CelestialBody.from_soa(
+            names=[f'小行星{i+1}' for i in range(num_asteroids)],
+            body_types=['asteroid'] * num_asteroids,
+            masses=mass,
+            radii=radius,
+            positions=positions,
+            velocities=velocities,
+            colors=[(0.55, 0.45, 0.33)] * num_asteroids
+        )
+        bodies.update((f'asteroid{i+1}', asteroid) for i, asteroid in enumerate(asteroids))
             
-    def load_black_hole_system(self, bodies: list):
+    def load_black_hole_system(self, bodies: dict):
         """加载黑洞系统"""
         bodies.clear()
         
@@ -408,91 +332,110 @@ class SceneManager:
             body_type='star',  # 使用star类型以便渲染
             mass=black_hole_mass,
             radius=schwarzschild_radius,
-            position=[0, 0, 0],
-            velocity=[0, 0, 0],
+            position=_ORIGIN,
+            velocity=_ORIGIN,
             color=(0.0, 0.0, 0.0)
         )
-        bodies.append(black_hole)
+        bodies['black_hole'] = black_hole
         
-        # 围绕黑洞运行的恒星
+        # 围绕黑洞运行的恒星：轨道参数按数组一次计算
         num_stars = 10
-        for i in range(num_stars):
-            # 随机轨道参数（接近黑洞）
-            distance = (5 + i * 2) * schwarzschild_radius
-            angle = i * 2 * math.pi / num_stars
-            
-            # 计算相对论修正的轨道速度
-            classical_velocity = OrbitalMechanics.calculate_orbital_velocity(black_hole_mass, distance)
-            # 添加相对论修正
-            relativistic_factor = 1 + 3 * schwarzschild_radius / distance
-            orbital_velocity = classical_velocity * math.sqrt(relativistic_factor)
-            
-            # 位置
-            x = math.cos(angle) * distance
-            z = math.sin(angle) * distance
-            y = (i % 2) * distance * 0.1  # 轻微倾斜
-            position = [x, y, z]
-            
-            # 速度
-            vx = -math.sin(angle) * orbital_velocity
-            vz = math.cos(angle) * orbital_velocity
-            vy = 0
-            velocity = [vx, vy, vz]
-            
-            # 恒星颜色根据距离变化
-            color_intensity = 1.0 - i / num_stars * 0.5
-            star = CelestialBody(
-                name=f'恒星{i+1}',
-                body_type='star',
-                mass=1.989e30,
-                radius=696340,
-                position=position,
-                velocity=velocity,
-                color=(color_intensity, color_intensity * 0.8, color_intensity * 0.3)
-            )
-            bodies.append(star)
+        i = np.arange(num_stars)
+        # 轨道参数（接近黑洞）
+        distance = (5 + i * 2) * schwarzschild_radius
+        angle = i * (2 * math.pi / num_stars)
+        # 位置与速度共用同一组正弦/余弦
+        sin_a, cos_a = np.sin(angle), np.cos(angle)
+        
+        # 计算相对论修正的轨道速度：v = sqrt(GM/r · (1 + 3 r_s / r))
+        relativistic_factor = 1 + 3 * schwarzschild_radius / distance
+        orbital_velocity = np.sqrt(self.G * black_hole_mass / distance * relativistic_factor)
+        
+        # 位置（奇数序号的恒星轻微倾斜）
+        positions = np.empty((num_stars, 3))
+        positions[:, 0] = cos_a * distance
+        positions[:, 1] = (i % 2) * distance * 0.1
+        positions[:, 2] = sin_a * distance
+        
+        # 速度
+        velocities = np.zeros((num_stars, 3))
+        velocities[:, 0] = -sin_a * orbital_velocity
+        velocities[:, 2] = cos_a * orbital_velocity
+        
+        # 恒星颜色根据距离变化
+        color_intensity = (1.0 - i / num_stars * 0.5).tolist()
+        stars = CelestialBody.from_soa(
+            names=[f'恒星{k+1}' for k in range(num_stars)],
+            body_types=['star'] * num_stars,
+            masses=np.full(num_stars, 1.989e30),
+            radii=np.full(num_stars, 696340.0),
+            positions=positions,
+            velocities=velocities,
+            colors=[(c, c * 0.8, c * 0.3) for c in color_intensity]
+        )
+        bodies.update((f'star{k+1}', star) for k, star in enumerate(stars))
             
-    def save_scene(self, bodies: list, filename: str):
-        """保存场景到文件"""
-        import json
-        
+    def save_scene(self, bodies: dict, filename: str, table=None):
+        """保存场景到文件
+
+        传入 table（与 bodies 一致的 BodyTable）时直接使用其位置/速度数组，否则从 bodies 堆叠一次。
+        """
+        body_list = list(bodies.values())
+        if table is not None:
+            positions, velocities = table.pos, table.vel
+        else:
+            n = len(body_list)
+            positions = np.array([body.position for body in body_list], dtype=np.float64).reshape(n, 3)
+            velocities = np.array([body.velocity for body in body_list], dtype=np.float64).reshape(n, 3)
+        if not ORJSON_AVAILABLE:
+            # 标准库 json 需要 Python 列表：整块数组各转换一次，而不是逐天体 tolist()
+            positions, velocities = positions.tolist(), velocities.tolist()
+
         scene_data = {
-            'timestamp': '2023-12-01T12:00:00',
-            'bodies': []
+            'timestamp': datetime.now().isoformat(),
+            'bodies': [
+                {
+                    'key': key,
+                    'name': body.name,
+                    'type': body.type,
+                    'mass': body.mass,
+                    'radius': body.radius,
+                    'position': position,
+                    'velocity': velocity,
+                    'color': list(body.color)
+                }
+                for key, body, position, velocity in zip(bodies.keys(), body_list, positions, velocities)
+            ]
         }
-        
-        for body in bodies:
-            body_data = {
-                'name': body.name,
-                'type': body.type,
-                'mass': body.mass,
-                'radius': body.radius,
-                'position': body.position.tolist(),
-                'velocity': body.velocity.tolist(),
-                'color': list(body.color)
-            }
-            scene_data['bodies'].append(body_data)
-            
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(scene_data, f, indent=2, ensure_ascii=False)
+
+        if ORJSON_AVAILABLE:
+            # 位置/速度为 float64 数组行，由 orjson 直接序列化
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(scene_data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(scene_data, f, indent=2, ensure_ascii=False)
             
-    def load_scene(self, bodies: list, filename: str):
+    def load_scene(self, bodies: dict, filename: str):
         """从文件加载场景"""
-        import json
-        
-        with open(filename, 'r', encoding='utf-8') as f:
-            scene_data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(filename, 'rb') as f:
+                scene_data = orjson.loads(f.read())
+        else:
+            with open(filename, 'r', encoding='utf-8') as f:
+                scene_data = json.load(f)
             
         bodies.clear()
         
         for body_data in scene_data['bodies']:
             body = CelestialBody(
                 name=body_data['name'],
-                type=body_data['type'],
+                body_type=body_data['type'],
                 mass=body_data['mass'],
                 radius=body_data['radius'],
                 position=body_data['position'],
                 velocity=body_data['velocity'],
                 color=tuple(body_data['color'])
             )
-            bodies.append(body)
\ No newline at end of file
+            # 旧版场景文件没有键名，以天体名代替
+            bodies[body_data.get('key', body_data['name'])] = body
\ No newline at end of file
@@ -4,281 +4,463 @@
 用于验证各个模块的功能是否正常
 """
 
-import sys
+import os
+import tempfile
+import unittest
+from unittest import mock
 import numpy as np
 import time
-from physics_engine import CelestialBody, GravityEngine, OrbitalMechanics
+from physics_engine import (CelestialBody, GravityEngine, OrbitalMechanics, accelerations, warmup_kernels,
+                            find_collision_pairs, COLLISION_GRID_THRESHOLD, BodyTable)
+import physics_engine
+from barnes_hut import accelerations_bh
+import scene_manager
 from scene_manager import SceneManager
 import math
 
-def test_celestial_body():
-    """测试天体类"""
-    print("正在测试天体类...")
-    
-    # 创建地球
-    earth = CelestialBody(
-        name='地球',
-        body_type='planet',
-        mass=5.972e24,
-        radius=6371,
-        position=[149597870.7, 0, 0],  # 1 AU
-        velocity=[0, 29.78, 0],  # 轨道速度
-        color=(0.25, 0.41, 0.88)
-    )
-    
-    # 测试基本属性
-    assert earth.name == '地球'
-    assert earth.type == 'planet'
-    assert abs(earth.mass - 5.972e24) < 1e20
-    assert abs(earth.radius - 6371) < 1
-    
-    # 测试位置和速度
-    assert abs(earth.position[0] - 149597870.7) < 1e6
-    assert abs(earth.velocity[1] - 29.78) < 0.1
-    
-    # 测试动能计算
-    kinetic_energy = earth.get_kinetic_energy()
-    expected_ke = 0.5 * earth.mass * (29.78**2)
-    assert abs(kinetic_energy - expected_ke) / expected_ke < 0.01
-    
-    print("√ 天体类测试通过")
-    return earth
-
-def test_gravity_engine():
-    """测试引力引擎"""
-    print("正在测试引力引擎...")
-    
-    # 创建太阳和地球
-    sun = CelestialBody(
-        name='太阳',
-        body_type='star',
-        mass=1.989e30,
-        radius=696340,
-        position=[0, 0, 0],
-        velocity=[0, 0, 0],
-        color=(1.0, 0.8, 0.0)
-    )
-    
-    earth = CelestialBody(
-        name='地球',
-        body_type='planet',
-        mass=5.972e24,
-        radius=6371,
-        position=[149597870.7, 0, 0],
-        velocity=[0, 29.78, 0],
-        color=(0.25, 0.41, 0.88)
-    )
-    
-    bodies = {
-        'sun': sun,
-        'earth': earth
-    }
-    
-    # 创建引力引擎
+# 常用天体的默认参数（国际单位制），在导入时解析一次，各测试通过工厂函数复用
+SUN_KW = dict(
+    name='太阳',
+    body_type='star',
+    mass=1.989e30,
+    radius=696340e3,
+    position=[0, 0, 0],
+    velocity=[0, 0, 0],
+    color=(1.0, 0.8, 0.0)
+)
+
+EARTH_KW = dict(
+    name='地球',
+    body_type='planet',
+    mass=5.972e24,
+    radius=6371e3,
+    position=[149597870.7e3, 0, 0],
+    velocity=[0, 29780, 0],
+    color=(0.25, 0.41, 0.88)
+)
+
+# 部分测试以千米为长度单位
+KM_UNITS = {
+    'sun': dict(radius=696340),
+    'earth': dict(radius=6371, position=[149597870.7, 0, 0], velocity=[0, 29.78, 0]),
+}
+
+def make_sun(**overrides):
+    """按默认参数创建太阳，overrides 覆盖个别字段"""
+    return CelestialBody(**{**SUN_KW, **overrides})
+
+def make_earth(**overrides):
+    """按默认参数创建地球，overrides 覆盖个别字段"""
+    return CelestialBody(**{**EARTH_KW, **overrides})
+
+def _warmup():
+    """在任何测试之前触发一次 JIT 编译，使计时只包含稳态开销"""
+    warmup_kernels()
     engine = GravityEngine()
-    
-    # 测试引力计算
-    forces = engine.calculate_gravitational_forces(bodies)
-    
-    # 计算预期的引力
-    G = 6.67430e-11
-    distance = 149597870.7
-    expected_force = G * sun.mass * earth.mass / (distance**2)
-    
-    # 地球受到的力应该指向太阳（负方向）
-    earth_force = forces['earth']
-    assert earth_force[0] < 0  # x方向为负
-    assert abs(earth_force[0]) > abs(earth_force[1])  # x方向力最大
-    
-    # 测试系统能量计算
-    total_energy = engine.calculate_system_energy(bodies)
-    assert total_energy < 0  # 束缚系统能量为负
-    
-    print("√ 引力引擎测试通过")
-    return engine, bodies
-
-def test_orbital_mechanics():
-    """测试轨道力学"""
-    print("正在测试轨道力学...")
-    
-    # 测试圆轨道速度
-    sun_mass = 1.989e30
-    earth_distance = 149597870.7 * 1000  # 转换为米
-    
-    orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun_mass, earth_distance)
-    expected_velocity = 29780  # km/s
-    assert abs(orbital_velocity - expected_velocity) / expected_velocity < 0.01
-    
-    # 测试逃逸速度
-    escape_velocity = OrbitalMechanics.calculate_escape_velocity(sun_mass, earth_distance)
-    expected_escape = expected_velocity * math.sqrt(2)
-    
-    assert abs(escape_velocity - expected_escape) / expected_escape < 0.01
-    
-    # 测试轨道周期
-    orbital_period = OrbitalMechanics.calculate_orbital_period(sun_mass, earth_distance)
-    expected_period = 365.25 * 24 * 3600  # 一年
-    
-    assert abs(orbital_period - expected_period) / expected_period < 0.01
-    
-    print("√ 轨道力学测试通过")
-
-def test_scene_manager():
-    """测试场景管理器"""
-    print("正在测试场景管理器...")
-    
-    manager = SceneManager()
-    bodies = dict()
-    
-    # 测试加载太阳系
-    manager.load_solar_system(bodies)
-    assert len(bodies) == 10  # 太阳 + 8颗行星
-    assert bodies['sun'].name == '太阳'
-    assert bodies['mercury'].name == '水星'
-    
-    # 验证轨道速度
-    earth = bodies['earth']  # 地球是第5个天体（太阳+水星+金星+地球）
-    expected_orbital_velocity = 29780  # m/s
-    assert abs(earth.velocity[1] - expected_orbital_velocity) / expected_orbital_velocity < 0.01
-    
-    # 测试加载双星系统
-    bodies.clear()
-    manager.load_binary_system(bodies)
-    assert len(bodies) == 4  # 2颗恒星 + 2颗行星
-    assert bodies['primary'].name == '主星'
-    assert bodies['secondary'].name == '伴星'
-    
-    print("√ 场景管理器测试通过")
-    return manager
-
-def test_physics_simulation():
-    """测试物理模拟"""
-    print("正在测试物理模拟...")
-    
-    # 创建简单的双体系统
-    sun = CelestialBody(
-        name='太阳',
-        body_type='star',
-        mass=1.989e30,
-        radius=696340e3,
-        position=[0, 0, 0],
-        velocity=[0, 0, 0],
-        color=(1.0, 0.8, 0.0)
-    )
-    
-    earth = CelestialBody(
-        name='地球',
-        body_type='planet',
-        mass=5.972e24,
-        radius=6371e3,
-        position=[149597870.7e3, 0, 0],
-        velocity=[0, 29780, 0],
-        color=(0.25, 0.41, 0.88)
-    )
-    
     bodies = {
-        'sun': sun,
-        'earth': earth
+        'a': CelestialBody('a', 'star', 1.0, 1.0, [0, 0, 0], [0, 0, 0], (1.0, 1.0, 1.0)),
+        'b': CelestialBody('b', 'planet', 1.0, 1.0, [1, 0, 0], [0, 1, 0], (1.0, 1.0, 1.0)),
     }
-    engine = GravityEngine()
-    # 运行短时间模拟
-    dt = 3600  # 1小时
-    initial_energy = engine.calculate_system_energy(bodies)
-    for step in range(100):
-        engine.update_positions(bodies, dt)
-    final_energy = engine.calculate_system_energy(bodies)
-    # 能量应该基本守恒（数值误差范围内）
-    energy_change = abs(final_energy - initial_energy) / abs(initial_energy)
-    assert energy_change < 0.01  # 能量变化小于1%
-    
-    # 地球应该大致回到初始位置（完成一个周期的1/24）
-    earth_final_pos = earth.position
-    expected_angle = 2 * math.pi * 100 / (365.25 * 24)  # 100小时的角度
-    expected_x = 149597870.7e3 * math.cos(expected_angle)
-    expected_y = 149597870.7e3 * math.sin(expected_angle)
-    
-    distance_error = np.linalg.norm(earth_final_pos - [expected_x, expected_y, 0])
-    assert distance_error < 1e7  # 位置误差小于1000km
-    
-    print("√ 物理模拟测试通过")
-
-def test_performance():
-    """测试性能"""
-    print("正在测试性能...")
-    
-    # 创建包含多个天体的系统
-    bodies = dict()
-    
-    # 中心恒星
-    sun = CelestialBody(
-        name='太阳',
-        body_type='star',
-        mass=1.989e30,
-        radius=69634e3,
-        position=[0, 0, 0],
-        velocity=[0, 0, 0],
-        color=(1.0, 0.8, 0.0)
-    )
-    bodies['sun'] = sun
-    
-    # 添加多个行星
-    for i in range(8):
-        angle = i * math.pi / 4
-        distance = (i + 1) * 1e8
-        velocity = math.sqrt(6.67430e-11 * sun.mass / distance)
-        
-        planet = CelestialBody(
-            name=f'行星{i+1}',
-            body_type='planet',
-            mass=5.972e24,
-            radius=6371e3,
-            position=[distance * math.cos(angle), 0, distance * math.sin(angle)],
-            velocity=[-velocity * math.sin(angle), 0, velocity * math.cos(angle)],
-            color=(0.25, 0.41, 0.88)
-        )
-        bodies[f"planet_{i}"] = planet
-    
-    engine = GravityEngine()
-    
-    # 测试计算性能
-    start_time = time.time()
-    for _ in range(100):
-        engine.calculate_gravitational_forces(bodies)
-    end_time = time.time()
-    
-    calculation_time = end_time - start_time
-    print(f"100次引力计算耗时: {calculation_time:.3f}秒")
-    
-    assert calculation_time < 1.0  # 应该在1秒内完成
-    
-    print("√ 性能测试通过")
-
-def main():
-    """主测试函数"""
-    print("开始天体系统模拟器测试...")
-    print("=" * 50)
-    
-    try:
-        # 运行所有测试
-        test_celestial_body()
-        test_gravity_engine()
-        test_orbital_mechanics()
-        test_scene_manager()
-        test_physics_simulation()
-        test_performance()
-        
-        print("=" * 50)
-        print("＜（＾－＾）＞ 所有测试通过！")
-        print("天体系统模拟器功能正常，可以运行主程序。")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ 测试失败: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    engine.calculate_gravitational_forces(bodies)
+    engine.update_positions(bodies, 1.0)
+
+def setUpModule():
+    """模块级预热（unittest 与 pytest 均会调用）"""
+    _warmup()
+
+
+class TestSimulator(unittest.TestCase):
+
+    def test_celestial_body(self):
+        """测试天体类"""
+        # 创建地球
+        earth = make_earth(**KM_UNITS['earth'])  # 1 AU，轨道速度 29.78 km/s
+        
+        # 测试基本属性
+        self.assertEqual(earth.name, '地球')
+        self.assertEqual(earth.type, 'planet')
+        self.assertAlmostEqual(earth.mass, 5.972e24, delta=1e20)
+        self.assertAlmostEqual(earth.radius, 6371, delta=1)
+        # 天体使用 __slots__，没有每实例的 __dict__
+        self.assertFalse(hasattr(earth, '__dict__'))
+        
+        # 测试位置和速度
+        self.assertAlmostEqual(earth.position[0], 149597870.7, delta=1e6)
+        self.assertAlmostEqual(earth.velocity[1], 29.78, delta=0.1)
+        
+        # 测试动能计算
+        kinetic_energy = earth.get_kinetic_energy()
+        expected_ke = 0.5 * earth.mass * (29.78**2)
+        self.assertAlmostEqual(kinetic_energy, expected_ke, delta=0.01 * expected_ke)
+
+    def test_gravity_engine(self):
+        """测试引力引擎"""
+        # 创建太阳和地球
+        sun = make_sun(**KM_UNITS['sun'])
+        earth = make_earth(**KM_UNITS['earth'])
+        
+        bodies = {
+            'sun': sun,
+            'earth': earth
+        }
+        
+        # 创建引力引擎
+        engine = GravityEngine()
+        
+        # 测试引力计算
+        forces = engine.calculate_gravitational_forces(bodies)
+        
+        # 地球受到的力应该指向太阳（负方向）
+        earth_force = forces['earth']
+        self.assertLess(earth_force[0], 0)  # x方向为负
+        self.assertGreater(abs(earth_force[0]), abs(earth_force[1]))  # x方向力最大
+        
+        # 测试系统能量计算
+        total_energy = engine.calculate_system_energy(bodies)
+        self.assertLess(total_energy, 0)  # 束缚系统能量为负
+
+    def test_orbital_mechanics(self):
+        """测试轨道力学"""
+        # 测试圆轨道速度
+        sun_mass = 1.989e30
+        earth_distance = 149597870.7 * 1000  # 转换为米
+        
+        orbital_velocity = OrbitalMechanics.calculate_orbital_velocity(sun_mass, earth_distance)
+        expected_velocity = 29780  # m/s
+        self.assertAlmostEqual(orbital_velocity, expected_velocity, delta=0.01 * expected_velocity)
+        
+        # 测试逃逸速度
+        escape_velocity = OrbitalMechanics.calculate_escape_velocity(sun_mass, earth_distance)
+        expected_escape = expected_velocity * math.sqrt(2)
+        self.assertAlmostEqual(escape_velocity, expected_escape, delta=0.01 * expected_escape)
+        
+        # 测试轨道周期
+        orbital_period = OrbitalMechanics.calculate_orbital_period(sun_mass, earth_distance)
+        expected_period = 365.25 * 24 * 3600  # 一年
+        self.assertAlmostEqual(orbital_period, expected_period, delta=0.01 * expected_period)
+
+    def test_scene_manager(self):
+        """测试场景管理器"""
+        manager = SceneManager()
+        bodies = dict()
+        
+        # 测试加载太阳系
+        manager.load_solar_system(bodies)
+        self.assertEqual(len(bodies), 10)  # 太阳 + 8颗行星 + 月球
+        self.assertEqual(bodies['sun'].name, '太阳')
+        self.assertEqual(bodies['mercury'].name, '水星')
+        
+        # 验证轨道速度
+        earth = bodies['earth']
+        expected_orbital_velocity = 29780  # m/s
+        self.assertAlmostEqual(earth.velocity[1], expected_orbital_velocity,
+                               delta=0.01 * expected_orbital_velocity)
+        
+        # 测试加载双星系统
+        bodies.clear()
+        manager.load_binary_system(bodies)
+        self.assertEqual(len(bodies), 4)  # 2颗恒星 + 2颗行星
+        self.assertEqual(bodies['primary'].name, '主星')
+        self.assertEqual(bodies['secondary'].name, '伴星')
+
+    def test_scene_loaders_fill_bodies(self):
+        """测试每个预设场景加载函数都会填充天体字典"""
+        manager = SceneManager(seed=0)
+        loaders = [name for name in dir(manager) if name.startswith('load_') and name != 'load_scene']
+        self.assertGreaterEqual(len(loaders), 6)
+        for name in loaders:
+            bodies = {}
+            getattr(manager, name)(bodies)
+            self.assertGreater(len(bodies), 0, name)
+            for body in bodies.values():
+                self.assertEqual(body.position.shape, (3,))
+                self.assertTrue(np.isfinite(body.position).all() and np.isfinite(body.velocity).all(), name)
+
+    def test_body_table_compares_by_identity(self):
+        """测试 SoA 表按对象身份比较，可直接放进用 == 比较的缓存键"""
+        bodies = {'sun': make_sun(), 'earth': make_earth()}
+        table = BodyTable.from_bodies(bodies)
+        rebuilt = BodyTable.from_bodies(bodies)
+        self.assertEqual((table, 1), (table, 1))
+        self.assertNotEqual((table, 1), (rebuilt, 1))
+        self.assertEqual(len({table, rebuilt}), 2)
+
+    def test_scene_save_load_round_trip(self):
+        """测试场景保存后重新加载得到相同的天体（分别使用 orjson 与标准库 json）"""
+        manager = SceneManager()
+        original = {}
+        manager.load_binary_system(original)
+        backends = (True, False) if scene_manager.ORJSON_AVAILABLE else (False,)
+        for use_orjson in backends:
+            for table in (None, BodyTable.from_bodies(original)):
+                with self.subTest(orjson=use_orjson, table=table is not None), \
+                        mock.patch.object(scene_manager, 'ORJSON_AVAILABLE', use_orjson), \
+                        tempfile.TemporaryDirectory() as tmp:
+                    filename = os.path.join(tmp, 'scene.json')
+                    manager.save_scene(original, filename, table)
+                    loaded = {'stale': make_earth()}
+                    manager.load_scene(loaded, filename)
+
+                    self.assertEqual(list(loaded), list(original))
+                    for key, body in original.items():
+                        restored = loaded[key]
+                        self.assertEqual((restored.name, restored.type), (body.name, body.type))
+                        self.assertEqual((restored.mass, restored.radius), (body.mass, body.radius))
+                        np.testing.assert_array_equal(restored.position, body.position)
+                        np.testing.assert_array_equal(restored.velocity, body.velocity)
+                        self.assertEqual(tuple(restored.color), tuple(body.color))
+
+    def test_physics_simulation(self):
+        """测试物理模拟"""
+        # 创建简单的双体系统
+        sun = make_sun()
+        earth = make_earth()
+        
+        bodies = {
+            'sun': sun,
+            'earth': earth
+        }
+        engine = GravityEngine()
+        # 运行短时间模拟
+        dt = 3600  # 1小时
+        initial_energy = engine.calculate_system_energy(bodies)
+        for step in range(100):
+            engine.update_positions(bodies, dt)
+        final_energy = engine.calculate_system_energy(bodies)
+        # 能量应该基本守恒（能量变化小于1%）
+        np.testing.assert_allclose(final_energy, initial_energy, rtol=0.01)
+        
+        # 地球沿轨道转过 100 小时对应的角度
+        expected_angle = 2 * math.pi * 100 / (365.25 * 24)
+        expected_x = 149597870.7e3 * math.cos(expected_angle)
+        expected_y = 149597870.7e3 * math.sin(expected_angle)
+        
+        # 位置误差小于 10000 km
+        distance_error = np.linalg.norm(earth.position - [expected_x, expected_y, 0])
+        self.assertLess(distance_error, 1e7)
+
+    def test_integrators_record_trail(self):
+        """测试每次 update_positions 为每个天体记录一个轨迹点"""
+        for integrator in ('verlet', 'euler', 'rk4', 'dopri5'):
+            bodies = {'sun': make_sun(), 'earth': make_earth()}
+            engine = GravityEngine()
+            engine.integrator = integrator
+            for step in range(5):
+                engine.update_positions(bodies, 3600)
+                self.assertEqual(len(bodies['earth'].trail_points()), step + 1, integrator)
+            np.testing.assert_allclose(bodies['earth'].trail_points()[-1], bodies['earth'].position, rtol=1e-6)
+
+    def test_trail_ring_buffer_wraparound(self):
+        """测试轨迹环形缓冲区写满后按时间先后返回最近的点，且为连续切片"""
+        earth = make_earth()
+        earth.max_trail_length = 8
+        recorded = []
+        for i in range(21):
+            earth.position[:] = (i, 2 * i, 3 * i)
+            earth.record_trail_point()
+            recorded.append(earth.position.copy())
+        
+        points = earth.trail_points()
+        self.assertEqual(points.dtype, np.float32)
+        self.assertTrue(points.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(points, np.array(recorded[-8:], dtype=np.float32))
+        # 副本与视图内容一致
+        np.testing.assert_array_equal(earth.get_trail(), points)
+
+    def test_collision_pairs_match_brute_force(self):
+        """测试碰撞配对（距离矩阵与网格两种路径）与逐对暴力检查一致，合并后的天体从字典移除"""
+        rng = np.random.default_rng(1)
+        for n in (COLLISION_GRID_THRESHOLD // 2, COLLISION_GRID_THRESHOLD * 4):
+            pos = rng.uniform(-1e9, 1e9, size=(n, 3))
+            radius = rng.uniform(1e7, 2e8, n)
+            expected = [(i, j) for i in range(n) for j in range(i + 1, n)
+                        if np.linalg.norm(pos[i] - pos[j]) < radius[i] + radius[j]]
+            pairs = find_collision_pairs(pos, radius)
+            self.assertGreater(len(expected), 0)
+            self.assertEqual([tuple(pair) for pair in pairs.tolist()], expected)
+
+        # 两对重叠的天体各合并为一个，远处的天体不受影响
+        bodies = {
+            'a': make_earth(position=[0, 0, 0]),
+            'b': make_earth(position=[1e6, 0, 0]),
+            'c': make_earth(position=[1e11, 0, 0]),
+            'd': make_earth(position=[1e11, 1e6, 0]),
+            'e': make_earth(position=[-1e11, 0, 0]),
+        }
+        GravityEngine().handle_collisions(bodies)
+        self.assertEqual(sorted(bodies), ['a', 'c', 'e'])
+        self.assertAlmostEqual(bodies['a'].mass, 2 * 5.972e24, delta=1e20)
+
+    def test_merge_with_conserves_momentum(self):
+        """测试合并后位于合并前的质心、动量守恒、体积相加"""
+        a = CelestialBody('a', 'planet', 3.0, 2.0, [0, 0, 0], [1, 0, 0], (1.0, 1.0, 1.0))
+        b = CelestialBody('b', 'planet', 1.0, 1.0, [4, 0, 0], [0, 2, 0], (1.0, 1.0, 1.0))
+        position = a.position
+        a.merge_with(b)
+        
+        self.assertEqual(a.mass, 4.0)
+        np.testing.assert_allclose(a.position, [1.0, 0.0, 0.0])
+        np.testing.assert_allclose(a.velocity, [0.75, 0.5, 0.0])
+        self.assertAlmostEqual(a.radius, 9.0 ** (1 / 3))
+        # 原地写入，不重新绑定数组
+        self.assertIs(a.position, position)
+
+    def test_float32_matches_float64_within_1pct(self):
+        """测试单精度引力计算与双精度结果一致"""
+        results = {}
+        for dtype in (np.float64, np.float32):
+            bodies = {
+                'sun': make_sun(),
+                'earth': make_earth()
+            }
+            engine = GravityEngine(dtype=dtype)
+            dt = 3600
+            initial_energy = engine.calculate_system_energy(bodies)
+            for step in range(100):
+                engine.update_positions(bodies, dt)
+            final_energy = engine.calculate_system_energy(bodies)
+            results[dtype] = (initial_energy, final_energy, bodies['earth'].position.copy())
+        
+        # 状态与能量归约始终为 float64，单精度只影响引力本身（相对误差约 1e-6）
+        e0_64, e1_64, pos_64 = results[np.float64]
+        e0_32, e1_32, pos_32 = results[np.float32]
+        self.assertEqual(e0_32, e0_64)
+        np.testing.assert_allclose(e1_32, e1_64, rtol=0.01)
+        np.testing.assert_allclose(e1_32, e0_32, rtol=0.01)
+        self.assertLess(np.linalg.norm(pos_32 - pos_64) / np.linalg.norm(pos_64), 0.01)
+
+    def test_energy_drift_long_horizon(self):
+        """测试辛积分的长期能量守恒"""
+        sun = make_sun()
+        earth = make_earth()
+        
+        bodies = {
+            'sun': sun,
+            'earth': earth
+        }
+        engine = GravityEngine()
+        engine.integrator = 'verlet'
+        
+        # 步长加倍（2小时），积分 10000 步（约 2.3 年）
+        dt = 7200
+        initial_energy = engine.calculate_system_energy(bodies)
+        energies = []
+        for step in range(10000):
+            engine.update_positions(bodies, dt)
+            if step % 500 == 0:
+                energies.append(engine.calculate_system_energy(bodies))
+        energies.append(engine.calculate_system_energy(bodies))
+        
+        # Verlet 的能量误差有界，不随时间累积
+        np.testing.assert_allclose(energies, initial_energy, rtol=1e-6)
+
+    def test_dopri5_accuracy_and_energy(self):
+        """测试 Dormand-Prince 自适应积分的能量守恒与精度"""
+        bodies = {'sun': make_sun(), 'earth': make_earth()}
+        engine = GravityEngine()
+        engine.integrator = 'dopri5'
+        
+        # 每次调用推进 20 小时，共 1000 次（约 2.3 年）；步长由误差估计自动选取
+        initial_energy = engine.calculate_system_energy(bodies)
+        initial_momentum = engine.calculate_angular_momentum(bodies)
+        for step in range(1000):
+            engine.update_positions(bodies, 72000)
+        np.testing.assert_allclose(engine.calculate_system_energy(bodies), initial_energy, rtol=1e-9)
+        np.testing.assert_allclose(engine.calculate_angular_momentum(bodies), initial_momentum, rtol=1e-9)
+        
+        # 30 天后的位置与小步长 RK4 的参考解一致（误差小于 1 km）
+        results = {}
+        for integrator, dt, steps in (('dopri5', 86400, 30), ('rk4', 600, 30 * 144)):
+            bodies = {'sun': make_sun(), 'earth': make_earth()}
+            engine = GravityEngine()
+            engine.integrator = integrator
+            for step in range(steps):
+                engine.update_positions(bodies, dt)
+            results[integrator] = bodies['earth'].position.copy()
+        self.assertLess(np.linalg.norm(results['dopri5'] - results['rk4']), 1e3)
+        
+        # integrate 的容限只作用于本次调用，不改变引擎的默认设置
+        pos, vel, mass = engine._gather_arrays(bodies)
+        rtol, atol = engine.rtol, engine.atol
+        engine.integrate(pos, vel, mass, 86400, rtol=1e-12, atol=1e-14)
+        self.assertEqual((engine.rtol, engine.atol), (rtol, atol))
+
+    def test_performance(self):
+        """测试性能"""
+        # 创建包含多个天体的系统
+        bodies = dict()
+        
+        # 中心恒星
+        sun = make_sun(radius=69634e3)
+        bodies['sun'] = sun
+        
+        # 添加多个行星
+        for i in range(8):
+            angle = i * math.pi / 4
+            distance = (i + 1) * 1e8
+            velocity = math.sqrt(6.67430e-11 * sun.mass / distance)
+            
+            planet = CelestialBody(
+                name=f'行星{i+1}',
+                body_type='planet',
+                mass=5.972e24,
+                radius=6371e3,
+                position=[distance * math.cos(angle), 0, distance * math.sin(angle)],
+                velocity=[-velocity * math.sin(angle), 0, velocity * math.cos(angle)],
+                color=(0.25, 0.41, 0.88)
+            )
+            bodies[f"planet_{i}"] = planet
+        
+        engine = GravityEngine()
+        
+        # 测试计算性能：100 次引力计算应在 1 秒内完成
+        start_time = time.perf_counter()
+        for _ in range(100):
+            engine.calculate_gravitational_forces(bodies)
+        end_time = time.perf_counter()
+        
+        self.assertLess(end_time - start_time, 1.0)
+
+    @unittest.skipUnless(physics_engine.NUMBA_AVAILABLE, "需要 Numba")
+    def test_serial_kernels_have_own_cache_entries(self):
+        """测试单线程核与并行核在 Numba 磁盘缓存中各占不同的条目"""
+        def cache_key(kernel):
+            return kernel._cache._index_key(kernel.signatures[0], kernel.targetctx.codegen())
+        
+        for parallel, serial in ((physics_engine._accel_kernel, physics_engine._accel_kernel_serial),
+                                 (physics_engine._accel_kernel_f32, physics_engine._accel_kernel_f32_serial)):
+            self.assertTrue(parallel.targetoptions['parallel'])
+            self.assertFalse(serial.targetoptions['parallel'])
+            self.assertNotEqual(cache_key(parallel), cache_key(serial))
+
+    def test_barnes_hut_matches_direct(self):
+        """测试 Barnes-Hut 八叉树与直接求和的一致性"""
+        # 随机分布的天体团
+        rng = np.random.default_rng(0)
+        n = 2000
+        pos = rng.normal(size=(n, 3)) * 1e11
+        mass = rng.uniform(1e20, 1e24, n)
+        G = 6.67430e-11
+        
+        direct = accelerations(pos, mass, G)
+        direct_norm = np.linalg.norm(direct, axis=1)
+        
+        # θ=0 时不做任何近似，应与直接求和一致（仅有求和顺序带来的舍入差异）
+        exact = accelerations_bh(pos, mass, G, theta=0.0)
+        self.assertLess(np.max(np.linalg.norm(exact - direct, axis=1) / direct_norm), 1e-10)
+        
+        # θ=0.5 时相对误差的均方根应远小于 θ²
+        theta = 0.5
+        approx = accelerations_bh(pos, mass, G, theta=theta)
+        relative_error = np.linalg.norm(approx - direct, axis=1) / direct_norm
+        self.assertLess(np.sqrt(np.mean(relative_error ** 2)), 0.1 * theta ** 2)
+        
+        # 天体数达到阈值时引擎自动切换到 Barnes-Hut
+        engine = GravityEngine()
+        engine.barnes_hut_threshold = n
+        switched = engine.accelerations(pos, G * mass)
+        np.testing.assert_allclose(switched, approx, rtol=1e-5, atol=1e-8)
+
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    unittest.main()
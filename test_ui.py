@@ -1,20 +1,33 @@
+import os
 import unittest
 import pygame
 from unittest.mock import MagicMock
 from ui_manager import UIManager
-from celestial_simulator import CelestialBody  # 假设你有天体类
-from physics_engine import OrbitalMechanics  # 如果涉及物理引擎
+from celestial_simulator import CelestialBody, CelestialSimulator  # 假设你有天体类
+from physics_engine import OrbitalMechanics, BodyTable  # 如果涉及物理引擎
 from renderer import OpenGLRenderer  # 如果涉及渲染器
 
+# 无显示环境（如 CI）下使用 SDL 的虚拟视频驱动
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
 class TestUIManager(unittest.TestCase):
     
-    def setUp(self):
-        """在每个测试前初始化pygame和UIManager"""
+    @classmethod
+    def setUpClass(cls):
+        """整个测试类只初始化一次pygame、显示窗口、字体和渲染器"""
         pygame.init()
-        self.screen = pygame.display.set_mode((800, 600))
+        cls.screen = pygame.display.set_mode((800, 600))
+        cls.font = pygame.font.SysFont("Arial", 20)
+
+    @classmethod
+    def tearDownClass(cls):
+        """全部测试结束后退出pygame"""
+        pygame.quit()
+
+    def setUp(self):
+        """在每个测试前重新创建UIManager与测试天体"""
         self.ui_manager = UIManager(800, 600)  # 创建UIManager对象
-        self.ui_manager.font = pygame.font.SysFont("Arial", 20)  # 设置字体
-        self.renderer = OpenGLRenderer(self.ui_manager.width, self.ui_manager.height)  # 创建渲染器实例
+        self.ui_manager.font = self.font  # 设置字体
 
         # 创建一些虚拟的天体，用于测试UI显示
         self.sun = CelestialBody(name='Sun', body_type='star', mass=1.989e30, radius=696340, position=[0, 0, 0], velocity=[0, 0, 0], color=(1.0, 1.0, 0.0))
@@ -22,9 +35,9 @@ class TestUIManager(unittest.TestCase):
         
         self.bodies = {'sun': self.sun, 'earth': self.earth}
 
-    def tearDown(self):
-        """在每个测试后退出pygame"""
-        pygame.quit()
+        # UI 逻辑测试不需要真实的 OpenGL 上下文：渲染器以按接口约束的 Mock 代替
+        self.renderer = MagicMock(spec=OpenGLRenderer)
+        self.renderer.pick_body.return_value = self.earth
 
     def test_initialization(self):
         """测试UIManager是否正确初始化"""
@@ -51,24 +64,145 @@ class TestUIManager(unittest.TestCase):
         self.ui_manager.toggle_simulation()  # 点击继续按钮
         self.assertFalse(self.ui_manager.is_simulation_paused)  # 模拟应该继续运行
         
+    def test_toggle_changed_invalidates_frame(self):
+        """测试主程序推送的开关状态进入帧输入，变化后不再重放上一帧"""
+        args = (self.bodies, None, 0.0, 1.0, 60, [], None)
+        before = self.ui_manager._frame_key(*args)
+        self.ui_manager.on_toggle_changed('grid', True)
+        self.assertTrue(self.ui_manager._toggle_state['grid'])
+        self.assertNotEqual(self.ui_manager._frame_key(*args), before)
+
+    def test_text_cache_lru(self):
+        """测试文本纹理缓存按容量淘汰最久未用的条目"""
+        self.ui_manager._text_cache_size = 4
+        for i in range(6):
+            self.ui_manager.draw_text(f"label {i}", 0, 0, (255, 255, 255), self.font)
+        # 重复绘制的文本命中缓存并移到队尾
+        self.ui_manager.draw_text("label 2", 0, 0, (255, 255, 255), self.font)
+
+        keys = list(self.ui_manager._text_cache)
+        self.assertEqual([text for _, text, _ in keys], ["label 3", "label 4", "label 5", "label 2"])
+        # 键中保存字体对象本身，而不是可能被复用的 id(font)
+        self.assertIs(keys[0][0], self.font)
+        # 被淘汰的条目位于图集中，不单独删除纹理
+        self.assertEqual(self.ui_manager._pending_texture_deletes, [])
+
+    def test_text_atlas_shares_texture(self):
+        """测试稳定文本打包进同一张图集纹理，各自占用不重叠的子区域"""
+        self.ui_manager.draw_text("Sun", 0, 0, (255, 255, 255), self.font)
+        self.ui_manager.draw_text("Earth", 0, 20, (255, 255, 255), self.font)
+        first, second = self.ui_manager._text_queue
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(first[0], self.ui_manager._atlas_tex)
+        # 子区域的纹理坐标互不重叠（同一货架上从左到右排列）
+        self.assertLessEqual(first[7], second[5])
+        self.assertEqual(self.ui_manager._upload_text_queue()[0][1:], (0, 12))
+
+    def test_labeled_slot_caches_label(self):
+        """测试“标签: 数值”行的标签部分进入缓存，数值部分紧随其后使用槽位纹理"""
+        self.ui_manager.draw_labeled_slot('fps', "FPS: ", "59", 10, 20, (255, 255, 255), self.font)
+        self.ui_manager.draw_labeled_slot('fps', "FPS: ", "60", 10, 20, (255, 255, 255), self.font)
+
+        self.assertEqual(len(self.ui_manager._text_cache), 1)
+        self.assertEqual(self.ui_manager._slot_textures['fps'][0][0], "60")
+        label, value = self.ui_manager._text_queue[2:]
+        self.assertEqual(value[1], label[1] + label[3])
+
+    def test_slot_string_formats_on_change(self):
+        """测试槽位文本只在显示精度下的值变化时重新格式化"""
+        first = self.ui_manager._slot_string('sim_time', round(1.234, 2), "模拟时间: {:.2f} 天")
+        again = self.ui_manager._slot_string('sim_time', round(1.2341, 2), "模拟时间: {:.2f} 天")
+        self.assertEqual(first, "模拟时间: 1.23 天")
+        self.assertIs(again, first)
+        self.assertEqual(self.ui_manager._slot_string('sim_time', 1.24, "模拟时间: {:.2f} 天"), "模拟时间: 1.24 天")
+
+    def test_surface_cache_keyed_by_identity(self):
+        """测试表面纹理按对象身份与版本号缓存，不读取像素内容"""
+        surface = self.font.render("Jupiter", True, (255, 255, 255))
+        self.ui_manager.draw_text_from_surface(surface, 0, 0)
+        self.ui_manager.draw_text_from_surface(surface, 10, 10)
+        self.assertEqual(len(self.ui_manager._text_cache), 1)
+
+        # 内容变化后以新版本号绘制，重新上传
+        self.ui_manager.draw_text_from_surface(surface, 0, 0, version=1)
+        self.assertEqual(len(self.ui_manager._text_cache), 2)
+
+    def test_slot_text_reuses_texture(self):
+        """测试逐帧变化的文本按槽位复用纹理，不进入 LRU 缓存"""
+        self.ui_manager.draw_slot_text('fps', "FPS: 59", 0, 0, (255, 255, 255), self.font)
+        _, tex_id, _, _ = self.ui_manager._slot_textures['fps']
+        self.ui_manager.draw_slot_text('fps', "FPS: 60", 0, 0, (255, 255, 255), self.font)
+
+        text_key, reused_id, _, _ = self.ui_manager._slot_textures['fps']
+        self.assertEqual(text_key[0], "FPS: 60")
+        self.assertEqual(reused_id, tex_id)
+        self.assertEqual(len(self.ui_manager._text_cache), 0)
+        self.assertEqual(len(self.ui_manager._text_queue), 2)
+
+    def test_click_dispatch_uses_layout(self):
+        """测试按钮点击按布局矩形分发，面板外或面板隐藏时不触发"""
+        self.ui_manager.render_control_panel(1.0, 60)
+        play_pause = self.ui_manager.buttons['play_pause']
+
+        self.ui_manager.handle_mouse_click(play_pause.center, 1)
+        self.assertTrue(self.ui_manager.is_simulation_paused)
+
+        # 面板外的点击不影响状态
+        self.ui_manager.handle_mouse_click((700, 500), 1)
+        self.assertTrue(self.ui_manager.is_simulation_paused)
+
+        # 再次渲染不会重建按钮矩形
+        self.ui_manager.render_control_panel(1.0, 60)
+        self.assertIs(self.ui_manager.buttons['play_pause'], play_pause)
+
+        self.ui_manager.show_control_panel = False
+        self.ui_manager.handle_mouse_click(play_pause.center, 1)
+        self.assertTrue(self.ui_manager.is_simulation_paused)
+
+    def _click_simulator(self):
+        """构造只含点击拾取所需状态的模拟器（跳过创建 OpenGL 窗口的 __init__），渲染器为 Mock"""
+        simulator = CelestialSimulator.__new__(CelestialSimulator)
+        simulator.renderer = self.renderer
+        simulator.camera_distance = 500.0
+        simulator.camera_rotation = [0.0, 0.0]
+        simulator.selected_body = None
+        simulator.pending_click_pos = None
+        return simulator
+
     def test_pick_body(self):
-        """测试鼠标点击天体（选择天体）"""
-        # 模拟鼠标点击事件
-        mouse_pos = (400, 300)  # 假设鼠标点击了屏幕中心
-        selected_body = self.renderer.pick_body(mouse_pos, self.bodies, 500.0, [0, 0])
-        
-        # 我们期望选择的是地球
-        self.assertEqual(selected_body, self.earth)
+        """测试左键点击延迟到渲染帧拾取：GPU 未命中时退回 CPU 射线检测并更新选中天体"""
+        simulator = self._click_simulator()
+        self.renderer.pick_body_gpu.return_value = None
+        table = BodyTable.from_bodies(self.bodies)
 
-    def test_render_highlight_selected_body(self):
-        """测试选中天体时是否正确高亮显示"""
-        # 渲染地球时，应该正确高亮显示
-        self.ui_manager.selected_body = self.earth
-        self.renderer.render_celestial_bodies(self.bodies, self.earth)
-        
-        # 检查渲染过程中是否发生了正确的高亮操作（这需要依赖OpenGL的渲染结果，实际测试时需结合渲染输出）
-        # 这里假设有相关的渲染逻辑来检测高亮效果
-        # 比如检查glColor等渲染状态的变化
+        # 左键按下只记录点击位置
+        simulator._on_mouse_down(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(400, 300), button=1))
+        self.assertEqual(simulator.pending_click_pos, (400, 300))
+        self.renderer.pick_body.assert_not_called()
+
+        simulator.resolve_pending_click(table, self.bodies)
+        self.renderer.pick_body_gpu.assert_called_once_with((400, 300), table)
+        self.renderer.pick_body.assert_called_once_with((400, 300), self.bodies, 500.0, [0.0, 0.0], table)
+        self.assertIs(simulator.selected_body, self.earth)
+        self.assertIsNone(simulator.pending_click_pos)
+
+    def test_pick_body_gpu_hit_and_miss(self):
+        """测试 GPU 拾取命中时不再做 CPU 射线检测；两者都未命中时保留原选中天体"""
+        simulator = self._click_simulator()
+        table = BodyTable.from_bodies(self.bodies)
+
+        self.renderer.pick_body_gpu.return_value = self.sun
+        simulator.pending_click_pos = (10, 10)
+        simulator.resolve_pending_click(table, self.bodies)
+        self.assertIs(simulator.selected_body, self.sun)
+        self.renderer.pick_body.assert_not_called()
+
+        self.renderer.pick_body_gpu.return_value = None
+        self.renderer.pick_body.return_value = None
+        simulator.pending_click_pos = (20, 20)
+        simulator.resolve_pending_click(table, self.bodies)
+        self.assertIs(simulator.selected_body, self.sun)
+        self.assertIsNone(simulator.pending_click_pos)
         
     def test_update_ui(self):
         """测试模拟状态更改时，UI是否正确更新"""
@@ -87,5 +221,32 @@ class TestUIManager(unittest.TestCase):
         self.assertEqual(button.text, "继续")
         
 
+@unittest.skipUnless(os.environ.get('HAS_GL'), "需要可用的 OpenGL 显示环境（设置 HAS_GL=1 启用）")
+class TestRendererGL(unittest.TestCase):
+    """使用真实 OpenGL 渲染器的测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        """创建 OpenGL 窗口与渲染器"""
+        pygame.init()
+        cls.screen = pygame.display.set_mode((800, 600), pygame.DOUBLEBUF | pygame.OPENGL)
+        cls.renderer = OpenGLRenderer(800, 600)
+
+    @classmethod
+    def tearDownClass(cls):
+        """全部测试结束后退出pygame"""
+        pygame.quit()
+
+    def setUp(self):
+        """创建测试天体"""
+        self.sun = CelestialBody(name='Sun', body_type='star', mass=1.989e30, radius=696340, position=[0, 0, 0], velocity=[0, 0, 0], color=(1.0, 1.0, 0.0))
+        self.earth = CelestialBody(name='Earth', body_type='planet', mass=5.972e24, radius=6371e3, position=[1.0 * 149597870.7 * 1000, 0, 0], velocity=[0, 29780, 0], color=(0.25, 0.41, 0.88))
+        self.bodies = {'sun': self.sun, 'earth': self.earth}
+
+    def test_render_highlight_selected_body(self):
+        """渲染带选中高亮的天体不应出错"""
+        self.renderer.render_celestial_bodies(self.bodies, self.earth)
+
+
 if __name__ == '__main__':
     unittest.main()
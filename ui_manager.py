@@ -7,8 +7,75 @@ import pygame
 import numpy as np
 from OpenGL.GL import *
 import math
+import ctypes
+from collections import OrderedDict
 from OpenGL.GLU import gluOrtho2D
 
+# UI 批次顶点布局: x, y, r, g, b, a（float32）
+UI_VERTEX_FLOATS = 6
+UI_VERTEX_STRIDE = UI_VERTEX_FLOATS * 4
+# 文字四边形顶点布局: x, y, u, v（float32），每个四边形两个三角形
+TEXT_VERTEX_STRIDE = 4 * 4
+# 单位四边形的两个三角形：(x 系数, y 系数) 同时也是纹理坐标 (u, v)
+_QUAD_CORNERS = np.array([(0, 0), (1, 0), (1, 1), (0, 0), (1, 1), (0, 1)], dtype=np.float32)
+# 独立纹理（槽位文本、图集放不下的文本）覆盖整张纹理的纹理坐标 (u0, v0, u1, v1)
+_FULL_UV = (0.0, 0.0, 1.0, 1.0)
+# 文本图集边长（像素，RGBA8 约 4 MB）；LRU 缓存的稳定文本都打包进这一张纹理
+TEXT_ATLAS_SIZE = 1024
+# UI 响应的事件类型（其余事件如鼠标移动直接跳过）
+UI_EVENT_TYPES = frozenset((pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN))
+
+
+def _unit_rgba(color: tuple) -> tuple:
+    """0..255 的 RGBA 颜色换算为 0..1 的浮点颜色"""
+    return (color[0] / 255, color[1] / 255, color[2] / 255, color[3] / 255)
+
+
+def _rect_points(x, y, width, height) -> tuple:
+    """矩形的两个三角形（6 个顶点）"""
+    x1, y1 = x + width, y + height
+    return ((x, y), (x1, y), (x1, y1), (x, y), (x1, y1), (x, y1))
+
+
+def _border_points(x, y, width, height) -> tuple:
+    """矩形边框的四条线段（8 个顶点）"""
+    x1, y1 = x + width, y + height
+    return ((x, y), (x1, y), (x1, y), (x1, y1), (x1, y1), (x, y1), (x, y1), (x, y))
+
+
+class _ShelfPacker:
+    """货架式矩形打包：按行（货架）从左到右放置，放不下时在下方开新货架
+
+    不支持单独释放；空间用尽后整体 reset，由调用方重新上传仍在使用的条目。
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.reset()
+
+    def reset(self):
+        """清空所有货架"""
+        self._shelves = []  # [y, 高度, 已用宽度]
+        self._top = 0
+
+    def alloc(self, width: int, height: int):
+        """分配 width×height 的区域，返回左上角 (x, y)；空间不足时返回 None"""
+        if width > self.width:
+            return None
+        for shelf in self._shelves:
+            y, shelf_h, used = shelf
+            if height <= shelf_h and used + width <= self.width:
+                shelf[2] = used + width
+                return used, y
+        if self._top + height > self.height:
+            return None
+        y = self._top
+        self._shelves.append([y, height, width])
+        self._top += height
+        return 0, y
+
+
 class UIManager:
     """UI管理器类"""
     
@@ -42,6 +109,10 @@ class UIManager:
             'warning': (255, 100, 100, 255),
             'success': (100, 255, 100, 255)
         }
+        # 归一化到 0..1 的浮点颜色（批次顶点直接写入），与 colors 一一对应
+        self.colors_f = {name: _unit_rgba(color) for name, color in self.colors.items()}
+        # 0..255 颜色元组 -> 浮点颜色：预先放入命名颜色，其余颜色首次使用时换算
+        self._rgba_cache = {color: self.colors_f[name] for name, color in self.colors.items()}
         
         # 按钮状态
         self.buttons = {}
@@ -50,17 +121,65 @@ class UIManager:
         # 输入框
         self.text_inputs = {}
         self.active_input = None
-        # 文本纹理缓存: key -> (tex_id, width, height)
-        self._text_cache = {}
+        # 控制面板的按钮/滑块矩形与各面板包围盒只在布局失效（首次渲染、resize）时计算，渲染时只读
+        self._control_panel_rect = None
+        self._info_panel_rect = None
+        self._status_bar_rect = None
+        self._layout_dirty = True
+        # 文本纹理缓存（LRU）: key -> (tex_id, width, height, (u0, v0, u1, v1))
+        # 条目优先打包进同一张图集纹理，连续的文字四边形因此合并为一次绑定、一次绘制
+        self._text_cache = OrderedDict()
+        self._text_cache_size = 256
+        self._atlas_tex = None  # 首次放入文本时创建
+        self._atlas_packer = _ShelfPacker(TEXT_ATLAS_SIZE, TEXT_ATLAS_SIZE)
+        # 图集已满：本帧放不下的文本改用独立纹理，flush 之后再清空图集重新打包
+        self._atlas_full = False
+
+        # 纯色矩形/边框的批次缓冲：draw_rect/draw_border 只追加顶点，
+        # render 结束时由 flush_batch 一次上传并绘制
+        self._ui_vbo = None  # 首次绘制时创建
+        self._text_vbo = None  # 文字四边形顶点，同样首次绘制时创建
+        self._batches = {
+            GL_TRIANGLES: np.empty((64 * 6, UI_VERTEX_FLOATS), dtype=np.float32),
+            GL_LINES: np.empty((64 * 8, UI_VERTEX_FLOATS), dtype=np.float32),
+        }
+        self._batch_counts = {GL_TRIANGLES: 0, GL_LINES: 0}
+        # 排队的文字四边形 (tex_id, x, y, w, h, u0, v0, u1, v1)，在纯色几何之后绘制，保证文字在背景之上
+        self._text_queue = []
+        # 上一次 flush 记录的绘制区间 (几何区间, 文字段)，以及产生它的输入（见 _frame_key）
+        self._last_flush = ((), ())
+        self._last_frame_key = None
+        # LRU 淘汰的纹理推迟到 flush 之后删除（本帧队列中可能仍引用它们）
+        self._pending_texture_deletes = []
+        # 逐帧变化的文本（模拟时间、FPS、状态栏等）按槽位各占一张纹理：
+        # slot -> (text, tex_id, width, height)，文字变化时原地重新上传，不进入 LRU 缓存
+        self._slot_textures = {}
+        # 槽位文本的格式化结果：slot -> (按显示精度取整后的值, 字符串)，显示值不变时不再重新格式化
+        self._formatted = {}
 
         # 回调字典，用于与主程序交互（例如播放/暂停、重置、保存等）
         # 回调应该是 { 'play_pause': callable, 'reset': callable, ... }
         self.callbacks = {}
+        # 显示选项开关的当前状态，由主程序在状态变化时通过 on_toggle_changed 推送，渲染时直接读取
+        self._toggle_state = {'orbits': True, 'labels': True, 'grid': False}
 
     def set_callbacks(self, callbacks: dict):
-        """设置回调字典，用于在 UI 操作时调用主程序逻辑。"""
-        self.callbacks = callbacks or {}
+        """设置回调字典，用于在 UI 操作时调用主程序逻辑（注册时丢弃不可调用的条目）。"""
+        self.callbacks = {name: cb for name, cb in (callbacks or {}).items() if callable(cb)}
+
+    def on_toggle_changed(self, name: str, value: bool):
+        """主程序在显示选项（'orbits' / 'labels' / 'grid'）变化时调用，更新开关按钮的显示状态
+
+        开关状态是帧输入的一部分（见 _frame_key），变化后下一帧自动重建 UI，不变时继续重放。
+        """
+        self._toggle_state[name] = bool(value)
         
+    def handle_events_batch(self, events):
+        """处理一帧内收集的事件（由主循环每帧调用一次），跳过 UI 不关心的事件类型"""
+        for event in events:
+            if event.type in UI_EVENT_TYPES:
+                self.handle_event(event)
+
     def handle_event(self, event):
         """处理UI事件"""
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -71,6 +190,10 @@ class UIManager:
     def handle_mouse_click(self, pos: tuple, button: int):
         """处理鼠标点击"""
         x, y = pos
+        # 按钮与滑块都在控制面板内：面板隐藏或点击落在面板外时无需逐个检测
+        panel = self._control_panel_rect
+        if not self.show_control_panel or panel is None or not panel.collidepoint(x, y):
+            return
         
         # 检查按钮点击
         for button_id, button_rect in self.buttons.items():
@@ -138,8 +261,8 @@ class UIManager:
                 self.set_time_speed(time_speed)
             
     def render(self, bodies: list, selected_body, simulation_time: float, 
-               time_speed: float, fps: int, world_labels: list = None):
-        """渲染UI"""
+               time_speed: float, fps: int, world_labels: list = None, table=None):
+        """渲染UI；传入 SoA 表时信息面板直接读取其缓存的天体数与总质量"""
         # 切换到正交投影用于UI渲染
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
@@ -154,40 +277,33 @@ class UIManager:
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         
-        # 渲染控制面板
-        if self.show_control_panel:
-            self.render_control_panel(time_speed, fps)
-            
-        # 渲染信息面板
-        if self.show_info_panel:
-            self.render_info_panel(bodies, selected_body, simulation_time, fps)
+        # 输入与上一帧完全相同时（例如暂停且视角不动），GPU 上的顶点缓冲区仍是上一帧的内容，
+        # 直接按记录的区间重绘，跳过面板构建、文本查找与上传
+        frame_key = self._frame_key(bodies, selected_body, simulation_time, time_speed, fps,
+                                    world_labels, table)
+        if frame_key == self._last_frame_key:
+            self._draw_uploaded(*self._last_flush)
+        else:
+            # 渲染控制面板
+            if self.show_control_panel:
+                self.render_control_panel(time_speed, fps)
+                
+            # 渲染信息面板
+            if self.show_info_panel:
+                self.render_info_panel(bodies, selected_body, simulation_time, fps, table)
 
-        # 如果有来自世界坐标的标签，在 UI 正交投影下绘制它们
-        if world_labels:
-            try:
-                for text, sx, sy in world_labels:
-                    # 简单限制：只绘制在屏幕范围内的标签
-                    if sx < 0 or sx > self.width or sy < 0 or sy > self.height:
-                        continue
-                    # 在文字后绘制一个半透明背景以确保可读性
-                    # 先测量文本尺寸（粗略估计）
-                    try:
-                        surf = self.font_small.render(text, True, (255,255,255))
-                        w, h = surf.get_size()
-                    except Exception:
-                        w, h = (len(text) * 8, 16)
-                    # 背景矩形（半透明黑）
-                    self.draw_rect(sx + 4, sy + 4, w + 6, h + 4, (0, 0, 0, 160))
-                    # 使用小号字体绘制，向右下偏移一点以免覆盖天体中心
-                    self.draw_text(text, sx + 7, sy + 6, self.colors['text'], self.font_small)
-            except Exception:
-                pass
+            # 如果有来自世界坐标的标签，在 UI 正交投影下绘制它们
+            if world_labels:
+                self.render_world_labels(world_labels)
+                
+            # 渲染状态栏
+            self.render_status_bar(simulation_time, time_speed, fps)
             
-        # 渲染状态栏
-        self.render_status_bar(simulation_time, time_speed, fps)
-        
-        # 渲染工具提示
-        self.render_tooltips()
+            # 渲染工具提示
+            self.render_tooltips()
+
+            self.flush_batch()
+            self._last_frame_key = frame_key
         
         glDisable(GL_BLEND)
         glEnable(GL_DEPTH_TEST)
@@ -197,102 +313,114 @@ class UIManager:
         glMatrixMode(GL_MODELVIEW)
         glPopMatrix()
         
-    def render_control_panel(self, time_speed: float, fps: int):
-        """渲染控制面板"""
+    def _frame_key(self, bodies, selected_body, simulation_time: float, time_speed: float, fps: int,
+                   world_labels, table) -> tuple:
+        """汇总决定本帧 UI 内容的全部输入；与上一帧相同则 UI 输出也相同"""
+        body_count, total_mass = self._body_stats(bodies, table)
+        if selected_body is not None:
+            selected = (selected_body, selected_body.position.tobytes(), selected_body.velocity.tobytes(),
+                        selected_body.mass)
+        else:
+            selected = None
+        if self.show_control_panel:
+            state = self._toggle_state
+            toggles = (state['orbits'], state['labels'], state['grid'])
+        else:
+            toggles = None
+        # 模拟时间按显示精度（0.01 天）参与比较：运行中显示值不变的帧同样可以重放
+        return (self.width, self.height, self.show_control_panel, self.show_info_panel, self.is_simulation_paused,
+                round(simulation_time / 86400, 2), time_speed, fps, body_count, total_mass, selected, toggles, world_labels)
+
+    @staticmethod
+    def _body_stats(bodies, table) -> tuple:
+        """返回 (天体数, 总质量)：优先读取 SoA 表在成员变化时缓存的总质量，没有表时才逐个累加"""
+        if table is not None:
+            return len(table), table.total_mass
+        return len(bodies), sum(body.mass for body in bodies.values())
+
+    def _ensure_layout(self):
+        """布局失效（首次渲染、resize 之后）时重新计算"""
+        if self._layout_dirty:
+            self._relayout()
+            self._layout_dirty = False
+
+    def _relayout(self):
+        """计算控制面板的面板包围盒、按钮与滑块矩形（供渲染与点击检测共用），
+        并预先生成各面板固定不变的背景与边框顶点，渲染时整块复制进批次
+        """
+        # 信息面板贴右侧、状态栏贴底部，位置只随窗口尺寸变化
+        info = self._info_panel_rect = pygame.Rect(self.width - self.panel_width - 10, 10, self.panel_width, 300)
+        status = self._status_bar_rect = pygame.Rect(0, self.height - 30, self.width, 30)
+        self._chrome = {
+            'control': self._panel_vertices(10, 10, self.panel_width, 400),
+            'info': self._panel_vertices(info.x, info.y, info.width, info.height),
+            'status': (self._vertex_block(_rect_points(status.x, status.y, status.width, status.height),
+                                          (10, 20, 38, 200)), None),
+        }
         x = 10
         y = 10
         width = self.panel_width
         height = 400
+        self._control_panel_rect = pygame.Rect(x, y, width, height)
+
+        # 播放/暂停、重置、清空按钮
+        current_y = y + 40
+        for button_id in ('play_pause', 'reset', 'clear'):
+            self.buttons[button_id] = pygame.Rect(x + 10, current_y, 100, 30)
+            current_y += 40
+
+        # 时间速度滑块（位于“时间流速”标题之下）
+        current_y += 25
+        slider = self.sliders.setdefault('time_speed', {'value': 1.0})
+        slider['rect'] = pygame.Rect(x + 10, current_y, width - 20, 20)
+        current_y += 30
+
+        # 显示选项开关（位于“显示选项”标题之下）
+        current_y += 25
+        for button_id in ('show_orbits', 'show_labels', 'show_grid'):
+            self.buttons[button_id] = pygame.Rect(x + 10, current_y, 80, 25)
+            current_y += 35
+
+    def render_control_panel(self, time_speed: float, fps: int):
+        """渲染控制面板（按钮与滑块位置取自 _relayout 的布局）"""
+        self._ensure_layout()
+        panel = self._control_panel_rect
+        x = panel.x
         
-        # 面板背景
-        self.draw_panel(x, y, width, height)
+        # 面板背景（预生成的顶点）
+        self._append_chrome('control')
         
         # 标题
-        self.draw_text("控制面板", x + 10, y + 10, self.colors['highlight'], self.font_large)
-        
-        current_y = y + 40
+        self.draw_text("控制面板", x + 10, panel.y + 10, self.colors['highlight'], self.font_large)
         
-        # 播放/暂停按钮
-        button_rect = pygame.Rect(x + 10, current_y, 100, 30)
-        self.buttons['play_pause'] = button_rect
-        self.draw_button(button_rect, "暂停" if not self.is_simulation_paused else "继续", 
+        buttons = self.buttons
+        # 播放/暂停、重置、清空按钮
+        self.draw_button(buttons['play_pause'], "暂停" if not self.is_simulation_paused else "继续", 
                         self.colors['success'])
-        current_y += 40
-        
-        # 重置按钮
-        button_rect = pygame.Rect(x + 10, current_y, 100, 30)
-        self.buttons['reset'] = button_rect
-        self.draw_button(button_rect, "重置", self.colors['warning'])
-        current_y += 40
-        
-        # 清空按钮
-        button_rect = pygame.Rect(x + 10, current_y, 100, 30)
-        self.buttons['clear'] = button_rect
-        self.draw_button(button_rect, "清空", self.colors['warning'])
-        current_y += 40
+        self.draw_button(buttons['reset'], "重置", self.colors['warning'])
+        self.draw_button(buttons['clear'], "清空", self.colors['warning'])
         
         # 时间速度滑块
-        self.draw_text("时间流速", x + 10, current_y, self.colors['text'], self.font_normal)
-        current_y += 25
-        
-        slider_rect = pygame.Rect(x + 10, current_y, width - 20, 20)
-        self.sliders['time_speed'] = {'rect': slider_rect, 'value': time_speed}
+        slider = self.sliders['time_speed']
+        slider_rect = slider['rect']
+        self.draw_text("时间流速", x + 10, slider_rect.y - 25, self.colors['text'], self.font_normal)
+        slider['value'] = time_speed
         self.draw_slider(slider_rect, time_speed / 100.0)
-        current_y += 30
         
-        # 显示选项
-        self.draw_text("显示选项", x + 10, current_y, self.colors['text'], self.font_normal)
-        current_y += 25
+        # 显示选项（开关状态由主程序通过 on_toggle_changed 推送）
+        self.draw_text("显示选项", x + 10, buttons['show_orbits'].y - 25, self.colors['text'], self.font_normal)
+        state = self._toggle_state
+        self.draw_toggle_button(buttons['show_orbits'], "轨道", state['orbits'])
+        self.draw_toggle_button(buttons['show_labels'], "标签", state['labels'])
+        self.draw_toggle_button(buttons['show_grid'], "网格", state['grid'])
         
-        # 轨道开关
-        button_rect = pygame.Rect(x + 10, current_y, 80, 25)
-        self.buttons['show_orbits'] = button_rect
-        # 通过回调获取当前状态（优先使用 'get_show_orbits'）
-        try:
-            if 'get_show_orbits' in self.callbacks and callable(self.callbacks['get_show_orbits']):
-                active = bool(self.callbacks['get_show_orbits']())
-            else:
-                active = True
-        except Exception:
-            active = True
-        self.draw_toggle_button(button_rect, "轨道", active)
-        current_y += 35
-        
-        # 标签开关
-        button_rect = pygame.Rect(x + 10, current_y, 80, 25)
-        self.buttons['show_labels'] = button_rect
-        try:
-            if 'get_show_labels' in self.callbacks and callable(self.callbacks['get_show_labels']):
-                active = bool(self.callbacks['get_show_labels']())
-            else:
-                active = True
-        except Exception:
-            active = True
-        self.draw_toggle_button(button_rect, "标签", active)
-        current_y += 35
-        
-        # 网格开关
-        button_rect = pygame.Rect(x + 10, current_y, 80, 25)
-        self.buttons['show_grid'] = button_rect
-        try:
-            if 'get_show_grid' in self.callbacks and callable(self.callbacks['get_show_grid']):
-                active = bool(self.callbacks['get_show_grid']())
-            else:
-                active = False
-        except Exception:
-            active = False
-        self.draw_toggle_button(button_rect, "网格", active)
-        current_y += 35
-        
-    def render_info_panel(self, bodies: list, selected_body, simulation_time: float, fps: int):
+    def render_info_panel(self, bodies: list, selected_body, simulation_time: float, fps: int, table=None):
         """渲染信息面板"""
-        x = self.width - self.panel_width - 10
-        y = 10
-        width = self.panel_width
-        height = 300
+        self._ensure_layout()
+        x, y = self._info_panel_rect.topleft
         
-        # 面板背景
-        self.draw_panel(x, y, width, height)
+        # 面板背景（预生成的顶点）
+        self._append_chrome('info')
         
         # 标题
         self.draw_text("系统信息", x + 10, y + 10, self.colors['highlight'], self.font_large)
@@ -300,16 +428,18 @@ class UIManager:
         current_y = y + 40
         
         # 天体数量
-        self.draw_text(f"天体数量: {len(bodies)}", x + 10, current_y, self.colors['text'], self.font_normal)
+        body_count, total_mass = self._body_stats(bodies, table)
+        self.draw_text(f"天体数量: {body_count}", x + 10, current_y, self.colors['text'], self.font_normal)
         current_y += 25
         
         # 模拟时间
-        days = simulation_time / 86400
-        self.draw_text(f"模拟时间: {days:.2f} 天", x + 10, current_y, self.colors['text'], self.font_normal)
+        days = self._slot_string('sim_time', round(simulation_time / 86400, 2), "{:.2f} 天")
+        self.draw_labeled_slot('sim_time', "模拟时间: ", days, x + 10, current_y, self.colors['text'], self.font_normal)
         current_y += 25
         
         # FPS
-        self.draw_text(f"FPS: {fps}", x + 10, current_y, self.colors['text'], self.font_normal)
+        fps_text = self._slot_string('fps', fps, "{}")
+        self.draw_labeled_slot('fps', "FPS: ", fps_text, x + 10, current_y, self.colors['text'], self.font_normal)
         current_y += 25
         
         # 选中天体信息
@@ -323,37 +453,74 @@ class UIManager:
             self.draw_text(f"质量: {selected_body.mass:.2e} kg", x + 10, current_y, self.colors['text'], self.font_small)
             current_y += 20
             
-            position = np.linalg.norm(selected_body.position)
-            self.draw_text(f"距离: {position:.0f} km", x + 10, current_y, self.colors['text'], self.font_small)
+            # 3 分量的长度直接用标量 hypot，省去 np.linalg.norm 对小向量的调度开销
+            position = math.hypot(*selected_body.position.tolist())
+            distance = self._slot_string('distance', round(position), "{:.0f} km")
+            self.draw_labeled_slot('distance', "距离: ", distance, x + 10, current_y, self.colors['text'], self.font_small)
             current_y += 20
             
-            velocity = np.linalg.norm(selected_body.velocity)
-            self.draw_text(f"速度: {velocity:.2f} km/s", x + 10, current_y, self.colors['text'], self.font_small)
+            velocity = math.hypot(*selected_body.velocity.tolist())
+            speed = self._slot_string('speed', round(velocity, 2), "{:.2f} km/s")
+            self.draw_labeled_slot('speed', "速度: ", speed, x + 10, current_y, self.colors['text'], self.font_small)
             current_y += 20
             
         # 系统能量
-        if bodies:
-            total_mass = sum(body.mass for body_key, body in bodies.items())  
+        if body_count:
             self.draw_text(f"总质量: {total_mass:.2e} kg", x + 10, current_y, self.colors['text'], self.font_small)
             current_y += 20
             
+    def render_world_labels(self, world_labels: list):
+        """绘制天体标签 [(名称, x, y)]：半透明背景整体追加到矩形批次，文字直接排队
+
+        每个标签只查一次纹理缓存（同时得到尺寸），背景矩形的顶点一次性生成。
+        模拟器在投影时已用向量化掩码剔除屏幕外的标签，这里只对整批坐标再做一次数组比较兜底，
+        不在逐标签循环中判断。
+        """
+        if not world_labels:
+            return
+        font = self.font_small
+        rgb = tuple(self.colors['text'][:3])
+        text_texture = self._text_texture
+        entries = [(tex_id, sx, sy, w, h) + uv
+                   for text, sx, sy in world_labels
+                   for tex_id, w, h, uv in (text_texture(text, font, rgb),)]
+        labels = np.array(entries, dtype=np.float64)
+        # 只绘制在屏幕范围内的标签
+        x, y = labels[:, 1], labels[:, 2]
+        on_screen = (x >= 0) & (x <= self.width) & (y >= 0) & (y <= self.height)
+        if not on_screen.all():
+            rows = np.flatnonzero(on_screen)
+            if not len(rows):
+                return
+            labels = labels[rows]
+            entries = [entries[i] for i in rows.tolist()]
+        # 背景矩形（半透明黑）比文字四周各大几个像素，以确保可读性
+        self._append_rects(labels[:, 1] + 4, labels[:, 2] + 4, labels[:, 3] + 6, labels[:, 4] + 4, (0, 0, 0, 160))
+        # 文字向右下偏移一点以免覆盖天体中心
+        self._text_queue.extend((entry[0], entry[1] + 7, entry[2] + 6) + entry[3:] for entry in entries)
+
     def render_status_bar(self, simulation_time: float, time_speed: float, fps: int):
         """渲染状态栏"""
-        x = 0
-        y = self.height - 30
-        width = self.width
-        height = 30
+        self._ensure_layout()
+        x, y = self._status_bar_rect.topleft
         
-        # 背景
-        self.draw_rect(x, y, width, height, (10, 20, 38, 200))
+        # 背景（预生成的顶点）
+        self._append_chrome('status')
         
         # 状态信息
-        status_text = f"状态: {'运行中' if not self.is_simulation_paused else '已暂停'} | "
-        status_text += f"时间加速: {time_speed:.1f}x | "
-        status_text += f"FPS: {fps}"
-        
-        self.draw_text(status_text, x + 10, y + 5, self.colors['text'], self.font_normal)
-        
+        key = ('运行中' if not self.is_simulation_paused else '已暂停', round(time_speed, 1), fps)
+        status_text = self._slot_string('status', key, "状态: {} | 时间加速: {:.1f}x | FPS: {}")
+        
+        self.draw_slot_text('status', status_text, x + 10, y + 5, self.colors['text'], self.font_normal)
+        
+    def _slot_string(self, slot: str, value, template: str) -> str:
+        """返回槽位文本：value 为按显示精度取整后的值（多个值时为元组），与上次相同则直接复用字符串"""
+        cached = self._formatted.get(slot)
+        if cached is None or cached[0] != value:
+            text = template.format(*value) if isinstance(value, tuple) else template.format(value)
+            cached = self._formatted[slot] = (value, text)
+        return cached[1]
+
     def render_tooltips(self):
         """渲染工具提示"""
         # 这里可以添加鼠标悬停提示
@@ -365,25 +532,167 @@ class UIManager:
         self.draw_border(x, y, width, height, self.colors['border'])
         
     def draw_rect(self, x: int, y: int, width: int, height: int, color: tuple):
-        """绘制矩形"""
-        glColor4f(color[0]/255, color[1]/255, color[2]/255, color[3]/255)
-        glBegin(GL_QUADS)
-        glVertex2f(x, y)
-        glVertex2f(x + width, y)
-        glVertex2f(x + width, y + height)
-        glVertex2f(x, y + height)
-        glEnd()
+        """绘制矩形（两个三角形，追加到本帧批次）"""
+        self._append_batch(GL_TRIANGLES, _rect_points(x, y, width, height), color)
         
     def draw_border(self, x: int, y: int, width: int, height: int, color: tuple):
-        """绘制边框"""
-        glColor4f(color[0]/255, color[1]/255, color[2]/255, color[3]/255)
-        glLineWidth(1.0)
-        glBegin(GL_LINE_LOOP)
-        glVertex2f(x, y)
-        glVertex2f(x + width, y)
-        glVertex2f(x + width, y + height)
-        glVertex2f(x, y + height)
-        glEnd()
+        """绘制边框（四条线段，追加到本帧批次）"""
+        self._append_batch(GL_LINES, _border_points(x, y, width, height), color)
+
+    @staticmethod
+    def _vertex_block(points, color: tuple) -> np.ndarray:
+        """生成与 _append_batch 写入内容相同的顶点块 [M, UI_VERTEX_FLOATS]"""
+        block = np.empty((len(points), UI_VERTEX_FLOATS), dtype=np.float32)
+        block[:, :2] = points
+        block[:, 2:] = _unit_rgba(color)
+        return block
+
+    def _panel_vertices(self, x: int, y: int, width: int, height: int) -> tuple:
+        """面板背景与边框的顶点块（与 draw_panel 追加的内容相同）"""
+        return (self._vertex_block(_rect_points(x, y, width, height), self.colors['background']),
+                self._vertex_block(_border_points(x, y, width, height), self.colors['border']))
+
+    def _append_chrome(self, name: str):
+        """把 _relayout 预生成的面板顶点块复制进本帧批次"""
+        fill, border = self._chrome[name]
+        self._append_vertices(GL_TRIANGLES, fill)
+        if border is not None:
+            self._append_vertices(GL_LINES, border)
+
+    def _reserve_batch(self, mode, m: int) -> tuple:
+        """为 mode 对应的批次预留 m 个顶点（容量不足时翻倍），返回 (缓冲区, 起始下标)"""
+        buf = self._batches[mode]
+        n = self._batch_counts[mode]
+        if n + m > len(buf):
+            grown = np.empty((max(2 * len(buf), n + m), UI_VERTEX_FLOATS), dtype=np.float32)
+            grown[:n] = buf[:n]
+            self._batches[mode] = buf = grown
+        self._batch_counts[mode] = n + m
+        return buf, n
+
+    def _append_vertices(self, mode, block: np.ndarray):
+        """把现成的顶点块整块追加到 mode 对应的批次"""
+        buf, n = self._reserve_batch(mode, len(block))
+        buf[n:n + len(block)] = block
+
+    def _append_rects(self, x: np.ndarray, y: np.ndarray, width: np.ndarray, height: np.ndarray, color: tuple):
+        """把一组同色矩形（数组形式的左上角与宽高）一次追加到三角形批次"""
+        corners = np.empty((len(x), 6, 2), dtype=np.float32)
+        corners[:, :, 0] = x[:, None] + _QUAD_CORNERS[None, :, 0] * width[:, None]
+        corners[:, :, 1] = y[:, None] + _QUAD_CORNERS[None, :, 1] * height[:, None]
+        self._append_batch(GL_TRIANGLES, corners.reshape(-1, 2), color)
+
+    def _append_batch(self, mode, points, color: tuple):
+        """把一组像素坐标顶点与统一颜色追加到 mode 对应的批次缓冲"""
+        m = len(points)
+        buf, n = self._reserve_batch(mode, m)
+        buf[n:n + m, :2] = points
+        buf[n:n + m, 2:] = self._rgba(color)
+
+    def _rgba(self, color: tuple) -> tuple:
+        """返回颜色对应的浮点元组（按颜色元组缓存，UI 只使用少量固定颜色）"""
+        try:
+            return self._rgba_cache[color]
+        except KeyError:
+            rgba = self._rgba_cache[color] = _unit_rgba(color)
+            return rgba
+        except TypeError:
+            # 列表等不可哈希的颜色不缓存
+            return _unit_rgba(color)
+
+    def flush_batch(self):
+        """上传并输出本帧排队的 UI：纯色矩形与边框共用一次上传，随后绘制文字纹理
+
+        上传后记录各段的绘制区间，供下一帧输入不变时直接重绘。
+        """
+        geometry = self._upload_geometry_batch() if any(self._batch_counts.values()) else ()
+        text_runs = self._upload_text_queue() if self._text_queue else ()
+        self._last_flush = (geometry, text_runs)
+        self._draw_uploaded(geometry, text_runs)
+        if self._atlas_full:
+            self._reset_atlas()
+        if self._pending_texture_deletes:
+            try:
+                glDeleteTextures(self._pending_texture_deletes)
+            except Exception:
+                pass
+            self._pending_texture_deletes = []
+
+    def _upload_geometry_batch(self) -> tuple:
+        """把积累的矩形与边框一次上传到 UI VBO 并清空批次，返回 ((图元, 起点, 顶点数), ...)"""
+        if self._ui_vbo is None:
+            self._ui_vbo = glGenBuffers(1)
+
+        # 先画填充再画边框，与逐个绘制时边框压在背景之上的效果一致
+        ranges = []
+        first = 0
+        for mode in (GL_TRIANGLES, GL_LINES):
+            count = self._batch_counts[mode]
+            if count:
+                ranges.append((mode, first, count))
+                first += count
+        data = np.concatenate([self._batches[mode][:count] for mode, _, count in ranges])
+        for mode, _, _ in ranges:
+            self._batch_counts[mode] = 0
+        glBindBuffer(GL_ARRAY_BUFFER, self._ui_vbo)
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STREAM_DRAW)
+        return tuple(ranges)
+
+    def _upload_text_queue(self) -> tuple:
+        """把排队的文字四边形一次上传到文字 VBO 并清空队列，返回 ((纹理, 起点, 顶点数), ...)
+
+        连续使用同一纹理的四边形合并为一段，绘制时只需一次 glBindTexture 与一次 glDrawArrays。
+        """
+        if self._text_vbo is None:
+            self._text_vbo = glGenBuffers(1)
+
+        queue = np.array(self._text_queue, dtype=np.float64)
+        self._text_queue.clear()
+        tex_ids = queue[:, 0].astype(np.int64)
+        # 顶点 = 左上角 + 单位四边形角点 × (w, h)；Pygame 的坐标系与 gluOrtho2D(0,width,height,0) 配合，y 向下
+        vertices = np.empty((len(queue), 6, 4), dtype=np.float32)
+        vertices[:, :, :2] = queue[:, None, 1:3] + _QUAD_CORNERS[None] * queue[:, None, 3:5]
+        # 纹理坐标 = (u0, v0) + 角点 × (u1 - u0, v1 - v0)：图集条目只采样自己的子区域
+        vertices[:, :, 2:] = queue[:, None, 5:7] + _QUAD_CORNERS[None] * (queue[:, None, 7:9] - queue[:, None, 5:7])
+        glBindBuffer(GL_ARRAY_BUFFER, self._text_vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+
+        # 按纹理切分为连续段，保持排队顺序（后排队的文字画在上面）
+        starts = np.flatnonzero(np.diff(tex_ids, prepend=-1))
+        ends = np.append(starts[1:], len(tex_ids))
+        return tuple((int(tex_ids[start]), 6 * start, 6 * (end - start))
+                     for start, end in zip(starts.tolist(), ends.tolist()))
+
+    def _draw_uploaded(self, geometry: tuple, text_runs: tuple):
+        """按记录的区间绘制已上传的 UI 顶点（当前正交投影应已启用），顶点数组状态只启用一次"""
+        if not geometry and not text_runs:
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        if geometry:
+            glBindBuffer(GL_ARRAY_BUFFER, self._ui_vbo)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glVertexPointer(2, GL_FLOAT, UI_VERTEX_STRIDE, None)
+            glColorPointer(4, GL_FLOAT, UI_VERTEX_STRIDE, ctypes.c_void_p(8))
+            glLineWidth(1.0)
+            for mode, first, count in geometry:
+                glDrawArrays(mode, first, count)
+            glDisableClientState(GL_COLOR_ARRAY)
+        if text_runs:
+            glBindBuffer(GL_ARRAY_BUFFER, self._text_vbo)
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glVertexPointer(2, GL_FLOAT, TEXT_VERTEX_STRIDE, None)
+            glTexCoordPointer(2, GL_FLOAT, TEXT_VERTEX_STRIDE, ctypes.c_void_p(8))
+            glEnable(GL_TEXTURE_2D)
+            glColor4f(1.0, 1.0, 1.0, 1.0)
+            for tex_id, first, count in text_runs:
+                glBindTexture(GL_TEXTURE_2D, tex_id)
+                glDrawArrays(GL_TRIANGLES, first, count)
+            glBindTexture(GL_TEXTURE_2D, 0)
+            glDisable(GL_TEXTURE_2D)
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
     def draw_button(self, rect: pygame.Rect, text: str, color: tuple):
         """绘制按钮"""
@@ -393,16 +702,11 @@ class UIManager:
         # 按钮边框
         self.draw_border(rect.x, rect.y, rect.width, rect.height, self.colors['border'])
         
-        # 按钮文字：使用字体表面渲染为纹理并居中绘制
-        # 使用 draw_text（带缓存）来绘制文字并居中
-        # color for button text is black
-        text_color = (0, 0, 0)
-        # 先测量文本尺寸
-        text_surface = self.font_normal.render(text, True, text_color)
-        w, h = text_surface.get_size()
+        # 按钮文字（黑色）居中绘制：一次缓存查找同时得到纹理与尺寸，不再先测量再绘制
+        tex_id, w, h, uv = self._text_texture(text, self.font_normal, (0, 0, 0))
         text_x = rect.x + (rect.width - w) // 2
         text_y = rect.y + (rect.height - h) // 2
-        self.draw_text(text, text_x, text_y, (*text_color, 255), self.font_normal)
+        self._text_queue.append((tex_id, text_x, text_y, w, h) + uv)
         
     def draw_toggle_button(self, rect: pygame.Rect, text: str, active: bool):
         """绘制开关按钮"""
@@ -421,107 +725,226 @@ class UIManager:
         # 滑块边框
         self.draw_border(rect.x, rect.y, rect.width, rect.height, self.colors['border'])
         
-    def draw_text(self, text: str, x: int, y: int, color: tuple, font):
-        """兼容旧接口：使用指定 font 和 color 渲染文本并绘制。
-
-        使用缓存 key=(text, id(font), color) 来复用纹理。此函数会在当前
-        OpenGL 正交投影下直接绘制像素坐标为 (x,y) 的左上角。"""
-        if len(color) >= 3:
-            rgb = (int(color[0]), int(color[1]), int(color[2]))
-        else:
-            rgb = (255, 255, 255)
+    def _upload_surface(self, surface, tex_id: int = None, old_size: tuple = None) -> int:
+        """将 Pygame 表面上传为 OpenGL 纹理，返回纹理 ID
 
-        key = (text, id(font), rgb)
-        cached = self._text_cache.get(key)
-        if cached:
-            tex_id, w, h = cached
-        else:
-            surf = font.render(text, True, rgb)
-            w, h = surf.get_size()
-            pixel_data = pygame.image.tostring(surf, 'RGBA', False)
+        给出 tex_id 时覆盖该纹理的内容；尺寸与原纹理相同（old_size）时只用 glTexSubImage2D 更新像素，
+        不重新分配存储，也不重复设置过滤参数。
+        像素按 'RGBA' 导出：pygame 对该格式有快速路径，而 'BGRA' 走逐像素转换，反而慢一个数量级。
+        """
+        w, h = surface.get_size()
+        pixel_data = pygame.image.tobytes(surface, 'RGBA', False)
 
-            tex_id = glGenTextures(1)
+        if tex_id is not None and old_size == (w, h):
             glBindTexture(GL_TEXTURE_2D, tex_id)
             glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixel_data)
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, w, h, GL_RGBA, GL_UNSIGNED_BYTE, pixel_data)
             glBindTexture(GL_TEXTURE_2D, 0)
+            return tex_id
 
-            self._text_cache[key] = (tex_id, w, h)
-
-        # 绘制纹理
-        glEnable(GL_TEXTURE_2D)
+        if tex_id is None:
+            tex_id = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, tex_id)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixel_data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return tex_id
+
+    def _cache_get(self, key):
+        """LRU 查找：命中时移到队尾"""
+        cached = self._text_cache.get(key)
+        if cached is not None:
+            self._text_cache.move_to_end(key)
+        return cached
 
-        glBegin(GL_QUADS)
-        glTexCoord2f(0.0, 0.0); glVertex2f(x, y)
-        glTexCoord2f(1.0, 0.0); glVertex2f(x + w, y)
-        glTexCoord2f(1.0, 1.0); glVertex2f(x + w, y + h)
-        glTexCoord2f(0.0, 1.0); glVertex2f(x, y + h)
-        glEnd()
+    def _cache_put(self, key, entry):
+        """LRU 插入：超出容量时淘汰最久未用的条目
 
+        独立纹理在下次 flush 后释放显存；图集中的区域不单独回收，随图集整体重置。
+        """
+        self._text_cache[key] = entry
+        while len(self._text_cache) > self._text_cache_size:
+            _, (old_tex, _, _, _) = self._text_cache.popitem(last=False)
+            if old_tex != self._atlas_tex:
+                self._pending_texture_deletes.append(old_tex)
+
+    def _cache_surface(self, surface):
+        """把新表面放入图集，返回缓存条目 (tex_id, w, h, uv)；图集已满时退回独立纹理"""
+        w, h = surface.get_size()
+        entry = self._atlas_insert(surface, w, h)
+        if entry is None:
+            entry = (self._upload_surface(surface), w, h, _FULL_UV)
+        return entry
+
+    def _atlas_insert(self, surface, w: int, h: int):
+        """把表面写入图集的一块空闲区域，返回 (atlas_tex, w, h, uv)；放不下时返回 None
+
+        每个条目四周留 1 像素透明边，线性过滤不会采样到相邻条目的像素。
+        """
+        if self._atlas_full:
+            return None
+        pos = self._atlas_packer.alloc(w + 2, h + 2)
+        if pos is None:
+            self._atlas_full = True
+            return None
+        if self._atlas_tex is None:
+            self._atlas_tex = self._create_atlas_texture()
+
+        # 直接在像素数组上补边：blit 到透明表面会把半透明边缘的颜色混向黑色
+        pixels = np.frombuffer(pygame.image.tobytes(surface, 'RGBA', False), dtype=np.uint8).reshape(h, w, 4)
+        padded = np.pad(pixels, ((1, 1), (1, 1), (0, 0)))
+        x, y = pos
+        glBindTexture(GL_TEXTURE_2D, self._atlas_tex)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, w + 2, h + 2, GL_RGBA, GL_UNSIGNED_BYTE, padded)
         glBindTexture(GL_TEXTURE_2D, 0)
-        glDisable(GL_TEXTURE_2D)
+        size = float(TEXT_ATLAS_SIZE)
+        uv = ((x + 1) / size, (y + 1) / size, (x + 1 + w) / size, (y + 1 + h) / size)
+        return self._atlas_tex, w, h, uv
 
-    def draw_text_from_surface(self, surface: 'pygame.Surface', x: int, y: int):
-        """将 Pygame 表面转换为 OpenGL 纹理并在屏幕上绘制（左上角坐标 x,y）。
+    def _create_atlas_texture(self) -> int:
+        """分配透明的图集纹理"""
+        tex_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, tex_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, TEXT_ATLAS_SIZE, TEXT_ATLAS_SIZE, 0, GL_RGBA, GL_UNSIGNED_BYTE,
+                     bytes(4 * TEXT_ATLAS_SIZE * TEXT_ATLAS_SIZE))
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return tex_id
 
-        该函数会缓存相同 surface 的纹理以提高性能。
+    def _reset_atlas(self):
+        """清空图集：丢弃其中的缓存条目，之后用到时重新渲染并打包
+
+        只在 flush 之后调用，此时已没有排队的四边形引用旧区域。
         """
-        if surface is None:
-            return
+        atlas_tex = self._atlas_tex
+        self._text_cache = OrderedDict(
+            (key, entry) for key, entry in self._text_cache.items() if entry[0] != atlas_tex)
+        self._atlas_packer.reset()
+        self._atlas_full = False
+        self._last_frame_key = None
 
-        # 使用 surface 的字符串描述作为缓存 key（包含大小与像素数据）
-        key = (surface.get_bytesize(), surface.get_size(), surface.get_buffer().raw if hasattr(surface, 'get_buffer') else None)
+    def _text_texture(self, text: str, font, rgb: tuple):
+        """返回 (tex_id, width, height, uv)；同一 (font, text, color) 只调用一次 font.render
 
-        cached = self._text_cache.get(key)
-        if cached:
-            tex_id, w, h = cached
+        键中直接保存字体对象（按对象身份哈希）而不是 id(font)：条目存在期间字体不会被回收，
+        也就不会有新字体复用同一 id 而错误命中旧纹理。
+        """
+        key = (font, text, rgb)
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = self._cache_surface(font.render(text, True, rgb))
+            self._cache_put(key, cached)
+        return cached
+
+    def draw_text(self, text: str, x: int, y: int, color: tuple, font):
+        """兼容旧接口：使用指定 font 和 color 渲染文本并绘制。
+
+        使用 LRU 缓存 key=(font, text, color) 来复用纹理。此函数会在当前
+        OpenGL 正交投影下以像素坐标 (x,y) 为左上角排队绘制，由 flush_batch 输出。"""
+        if len(color) >= 3:
+            rgb = (int(color[0]), int(color[1]), int(color[2]))
         else:
-            # 创建纹理
-            w, h = surface.get_size()
-            pixel_data = pygame.image.tostring(surface, 'RGBA', False)
+            rgb = (255, 255, 255)
 
-            tex_id = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, tex_id)
-            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixel_data)
-            glBindTexture(GL_TEXTURE_2D, 0)
+        tex_id, w, h, uv = self._text_texture(text, font, rgb)
+        self._text_queue.append((tex_id, x, y, w, h) + uv)
 
-            self._text_cache[key] = (tex_id, w, h)
+    def draw_slot_text(self, slot: str, text: str, x: int, y: int, color: tuple, font):
+        """绘制逐帧变化的文本：每个槽位复用同一张纹理，仅在显示的字符串变化时重新渲染上传
 
-        # 绘制纹理四边形（当前正交投影应已启用）
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, tex_id)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
+        这类字符串（如模拟时间）几乎每帧都不同，若走 LRU 缓存会不断创建一次性纹理，
+        并把按钮、标题等稳定文本挤出缓存。
+        """
+        rgb = (int(color[0]), int(color[1]), int(color[2]))
+        entry = self._slot_textures.get(slot)
+        if entry is None or entry[0] != (text, font, rgb):
+            surf = font.render(text, True, rgb)
+            w, h = surf.get_size()
+            if entry is not None:
+                tex_id = self._upload_surface(surf, entry[1], entry[2:])
+            else:
+                tex_id = self._upload_surface(surf)
+            entry = ((text, font, rgb), tex_id, w, h)
+            self._slot_textures[slot] = entry
+        _, tex_id, w, h = entry
+        self._text_queue.append((tex_id, x, y, w, h) + _FULL_UV)
 
-        # Pygame 的坐标系这里与 gluOrtho2D(0,width,height,0) 配合，y 向下
-        glBegin(GL_QUADS)
-        glTexCoord2f(0.0, 0.0); glVertex2f(x, y)
-        glTexCoord2f(1.0, 0.0); glVertex2f(x + w, y)
-        glTexCoord2f(1.0, 1.0); glVertex2f(x + w, y + h)
-        glTexCoord2f(0.0, 1.0); glVertex2f(x, y + h)
-        glEnd()
+    def draw_labeled_slot(self, slot: str, label: str, value: str, x: int, y: int, color: tuple, font):
+        """绘制“标签: 数值”形式的一行：固定的标签部分走 LRU 图集缓存，只有数值部分占用槽位纹理
 
-        glBindTexture(GL_TEXTURE_2D, 0)
-        glDisable(GL_TEXTURE_2D)
+        数值变化时只重新渲染数值部分，标签部分的纹理始终命中缓存。
+        """
+        rgb = (int(color[0]), int(color[1]), int(color[2]))
+        tex_id, w, h, uv = self._text_texture(label, font, rgb)
+        self._text_queue.append((tex_id, x, y, w, h) + uv)
+        self.draw_slot_text(slot, value, x + w, y, color, font)
+
+    def draw_text_from_surface(self, surface: 'pygame.Surface', x: int, y: int, version=None):
+        """将 Pygame 表面转换为 OpenGL 纹理并在屏幕上绘制（左上角坐标 x,y）。
+
+        该函数会缓存相同 surface 的纹理以提高性能；绘制同样由 flush_batch 输出。
+        缓存按表面对象本身识别，不读取像素：调用方在原表面上重绘内容后需传入新的 version。
+        """
+        if surface is None:
+            return
+
+        # 键中保存表面对象（按对象身份哈希）与尺寸、版本号，查找是 O(1) 的；
+        # 与字体同理，不用 id(surface)，避免被回收后新表面复用同一 id 而命中旧纹理
+        key = (surface, surface.get_size(), version)
+
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = self._cache_surface(surface)
+            self._cache_put(key, cached)
+        tex_id, w, h, uv = cached
+        self._text_queue.append((tex_id, x, y, w, h) + uv)
         
     def resize(self, width: int, height: int):
         """调整UI大小"""
         self.width = width
         self.height = height
-        # 清理文本纹理缓存（纹理大小依赖窗口/字体，resize 后需要重建）
-        if hasattr(self, '_text_cache') and self._text_cache:
-            for tex_id, _, _ in self._text_cache.values():
-                try:
-                    glDeleteTextures([tex_id])
-                except Exception:
-                    pass
-            self._text_cache.clear()
+        self._layout_dirty = True
+        self._last_frame_key = None
+        # 清理文本纹理缓存（纹理大小依赖窗口/字体，resize 后需要重建）；图集纹理保留，只清空打包状态
+        self._release_text_textures(include_atlas=False)
+
+    def release_gl_resources(self):
+        """释放 UI 占用的全部纹理与顶点缓冲；须在 OpenGL 上下文销毁（pygame.quit）之前调用"""
+        self._release_text_textures(include_atlas=True)
+        buffers = [vbo for vbo in (self._ui_vbo, self._text_vbo) if vbo is not None]
+        self._ui_vbo = self._text_vbo = None
+        self._last_flush = ((), ())
+        self._last_frame_key = None
+        if buffers:
+            try:
+                glDeleteBuffers(len(buffers), buffers)
+            except Exception:
+                pass
+
+    def _release_text_textures(self, include_atlas: bool):
+        """用一次 glDeleteTextures 删除缓存、槽位与尚未释放的 LRU 淘汰纹理，并清空相应记录"""
+        atlas_tex = self._atlas_tex
+        stale = [entry[0] for entry in self._text_cache.values() if entry[0] != atlas_tex]
+        stale.extend(entry[1] for entry in self._slot_textures.values())
+        stale.extend(self._pending_texture_deletes)
+        if include_atlas and atlas_tex is not None:
+            stale.append(atlas_tex)
+            self._atlas_tex = None
+        self._text_cache.clear()
+        self._atlas_packer.reset()
+        self._atlas_full = False
+        self._slot_textures.clear()
+        self._pending_texture_deletes = []
+        if stale:
+            try:
+                glDeleteTextures(np.array(stale, dtype=np.uint32))
+            except Exception:
+                pass
         
     def toggle_simulation(self):
         """切换模拟暂停/继续"""